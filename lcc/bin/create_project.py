@@ -39,7 +39,10 @@ def main():
              "FILTERS = os.path.join(project_dir, 'filters')",
              "RESULTS = os.path.join(project_dir, 'query_results')",
              "\n",
-             "# Output locations"]
+             "# Output locations",
+             "\n",
+             "# Cache of computed features (set to None to disable it)",
+             "FEATURE_CACHE = os.path.join(project_dir, 'feature_cache.sqlite')"]
 
     logging.info("Creating project {} in the {}".format(proj_name, path))
     with open(os.path.join(path, proj_name, "project_settings.py"), "w") as f:
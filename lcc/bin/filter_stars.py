@@ -11,6 +11,7 @@ from lcc.data_manager.status_resolver import StatusResolver
 from lcc.db_tier.stars_provider import StarsProvider
 from lcc.entities.exceptions import QueryInputError
 from lcc.stars_processing.systematic_search.stars_searcher import StarsSearcher
+from lcc.stars_processing.utilities.feature_cache import FeatureCache
 
 __all__ = []
 __version__ = 0.3
@@ -192,6 +193,11 @@ def main(project_settings, argv=None):
         star_filters = [FiltersSerializer(
             filt_name, project_settings.FILTERS).loadFilter() for filt_name in opts.filt]
 
+        if getattr(project_settings, "FEATURE_CACHE", None):
+            feature_cache = FeatureCache(project_settings.FEATURE_CACHE)
+            for star_filter in star_filters:
+                star_filter.feature_cache = feature_cache
+
         if not star_filters:
             filt_txt = ""
         else:
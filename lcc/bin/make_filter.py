@@ -22,6 +22,7 @@ from lcc.stars_processing.tools.params_estim import ParamsEstimator
 from lcc.stars_processing.tools.visualization import plotHist
 from lcc.stars_processing.tools.visualization import plotProbabSpace
 from lcc.stars_processing.utilities.compare import ComparativeBase
+from lcc.stars_processing.utilities.feature_cache import FeatureCache
 
 __all__ = []
 __version__ = 0.3
@@ -342,18 +343,26 @@ def main(project_settings, argv=None):
             raise ValueError(
                 "Ratios have to be numbers separated by ':'. Got:\n%s" % opts.split_ratio)
 
+        feature_cache = None
+        if getattr(project_settings, "FEATURE_CACHE", None):
+            feature_cache = FeatureCache(project_settings.FEATURE_CACHE)
+
         es = ParamsEstimator(searched=searched,
                              others=others,
                              descriptors=descriptors,
                              deciders=deciders,
                              tuned_params=tuned_params,
                              static_params=static_params,
-                             split_ratio=ratios[0] / sum(ratios[:2]))
+                             split_ratio=ratios[0] / sum(ratios[:2]),
+                             feature_cache=feature_cache)
 
         print("\nTuning is about to start. There are %i combinations to try" % len(tuned_params))
 
         star_filter, _, _ = es.fit(_getPrecision, save_params=save_params)
 
+        if feature_cache is not None:
+            print("Feature cache: %s" % feature_cache.getStatistics())
+
         FiltersSerializer(
             filt_name + ".filter", filter_path).saveFilter(star_filter)
 
@@ -5,6 +5,7 @@ import astropy.units as u
 import numpy as np
 
 from lcc.entities.exceptions import QueryInputError
+from lcc.entities.star_index import StarIndex
 
 
 class StarsCatalogue(abc.ABC):
@@ -62,23 +63,22 @@ class StarsCatalogue(abc.ABC):
             if not isinstance(delta_deg, u.quantity.Quantity):
                 delta_deg = float(delta_deg) * u.deg
 
-            distances = []
-            passed_stars = []
-            for star in stars:
-                if star.coo:
-                    dist = coo.separation(star.coo)
-                    if dist < delta_deg:
-                        passed_stars.append(star)
-                        distances.append(dist.degree)
-                else:
-                    passed_stars.append(star)
-                    distances.append(np.inf)
+            center = coo.icrs
+            ra, dec = center.ra.degree, center.dec.degree
 
         except AttributeError:
             raise QueryInputError("Invalid query coordinates")
 
-        if distances and (nearest or str(nearest).capitalize() == "True"):
-            return [passed_stars[np.argmin(distances)]]
+        index = StarIndex(stars)
+        in_cone, in_cone_dist = index.queryRadius(ra, dec, delta_deg.to(u.deg).value,
+                                                  with_distances=True)
+
+        # Stars without coordinates pass as well
+        distances = dict(zip([id(st) for st in in_cone], in_cone_dist))
+        passed_stars = [st for st in stars if st.ra is None or id(st) in distances]
+
+        if passed_stars and (nearest or str(nearest).capitalize() == "True"):
+            return [passed_stars[np.argmin([distances.get(id(st), np.inf) for st in passed_stars])]]
 
         return passed_stars
 
@@ -316,26 +316,10 @@ class FileManager(LightCurvesDb):
 
     @classmethod
     def _createLcFromFits(self, fits):
-        time = []
-        mag = []
-        err = []
-        for line in fits.data:
-            if len(line) == 3:
-                t, m, e = line
-            elif len(line) == 2:
-                t,m =line
-                e = 0
-            else:
-                if hasattr(line, "__iter__"):
-                    n = len(line)
-                else:
-                    n = None
-                raise InvalidFile(
-                    "Light curve binary extension of the fitst couldn't be parsed\nbecause of line {1}\n type: {0}, lenght: {2}".format(type(line), line, n))
-
-            time.append(t)
-            mag.append(m)
-            err.append(e)
+        n_cols = len(fits.columns)
+        if n_cols not in (2, 3):
+            raise InvalidFile(
+                "Light curve binary extension of the fits couldn't be parsed\nbecause it has {0} columns".format(n_cols))
 
         meta = {"xlabel": fits.header.get("TTYPE1", None),
                 "xlabel_unit": fits.header.get("TUNIT1", None),
@@ -345,7 +329,7 @@ class FileManager(LightCurvesDb):
                 "origin": fits.header.get(self.DB_ORIGIN, None)
                 }
 
-        return LightCurve([time, mag, err], meta)
+        return LightCurve(fits.data, meta)
 
     @classmethod
     def writeToFITS(self, file_name, star, clobber=True):
@@ -353,16 +337,13 @@ class FileManager(LightCurvesDb):
 
         prim_hdu.header["IDENT"] = star.name
 
-        try:
-            prim_hdu.header[self.FITS_RA] = star.coo.ra.degree
+        if star.ra is not None:
+            prim_hdu.header[self.FITS_RA] = star.ra
             prim_hdu.header[self.FITS_RA_UNIT] = "deg"
-            prim_hdu.header[self.FITS_DEC] = star.coo.dec.degree
+            prim_hdu.header[self.FITS_DEC] = star.dec
             prim_hdu.header[self.FITS_DEC_UNIT] = "deg"
             prim_hdu.header[self.FITS_CLASS] = star.starClass
 
-        except AttributeError:
-            pass
-
         for db, ident in star.ident.items():
             prim_hdu.header["HIERARCH " + db + "_name"] = ident["name"]
 
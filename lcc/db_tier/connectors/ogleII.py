@@ -250,7 +250,7 @@ class OgleII(LightCurvesDb):
         # [u'No', u'Field', u'StarID', u'RA', u'Decl', u'I']
 
         cols_map = self._parseHeader(header)
-        stars = []
+        ras, decs, idents, names, mores, db_idents = [], [], [], [], [], []
         for row in rows:
             field = str(row[cols_map.get("field")])
             starid = int(row[cols_map.get("starid")])
@@ -267,20 +267,26 @@ class OgleII(LightCurvesDb):
                         pass
 
             name = field + "_" + str(starid)
-            coo = (ra * 15, dec, "deg")
 
             ident = {"OgleII": {"name": name,
                                 "db_ident": {"field": field,
                                              "starid": starid}}}
 
-            st = Star(ident, name, coo, more)
+            ras.append(ra * 15)
+            decs.append(dec)
+            idents.append(ident)
+            names.append(name)
+            mores.append(more)
+            db_idents.append((field, starid))
 
-            if lc_tmp:
+        stars = Star.createStars(ras, decs, idents=idents, names=names, mores=mores)
+
+        if lc_tmp:
+            for st, (field, starid) in zip(stars, db_idents):
                 lc = self._getLc(field, starid, lc_tmp)
                 if lc and len(lc) != 0:
                     st.putLightCurve(np.array(lc), meta=self.LC_META)
 
-            stars.append(st)
         return stars
 
     def _parseHeader(self, header):
@@ -227,9 +227,12 @@ class VizierTapBase(TapClient):
         list
             List of Star objects
         """
-        stars = []
-        for _, _raw_star in df.iterrows():
-            raw_star_dict = _raw_star.to_dict()
+        if df.empty:
+            return []
+
+        raw_stars = df.to_dict("records")
+        idents, names, mores = [], [], []
+        for raw_star_dict in raw_stars:
 
             ident = {}
             for key, value in self.IDENT_MAP.items():
@@ -251,18 +254,19 @@ class VizierTapBase(TapClient):
                 more_item = raw_star_dict.get(key)
                 more[value] = more_item
 
-            star = Star(name=self.get_name(raw_star_dict),
-                        coo=(raw_star_dict[self.RA],
-                             raw_star_dict[self.DEC]),
-                        ident=ident,
-                        more=more)
+            idents.append(ident)
+            names.append(self.get_name(raw_star_dict))
+            mores.append(more)
+
+        stars = Star.createStars(df[self.RA].values, df[self.DEC].values,
+                                 idents=idents, names=names, mores=mores)
 
-            if lc_opt:
+        if lc_opt:
+            for star, raw_star_dict in zip(stars, raw_stars):
                 star.putLightCurve(self._getLightCurve(star=star,
                                                        file_name=raw_star_dict.get(
                                                            self.LC_FILE, None),
                                                        **kwargs))
-            stars.append(star)
         return stars
 
     def _getLightCurve(self, star, do_per=False, period_key="period",
@@ -1,18 +1,63 @@
+import collections
+import functools
+import inspect
+import pickle
+import types
+
 from lcc.entities.exceptions import StarAttributeError
 from lcc.utils.data_analysis import compute_bins
-from lcc.utils.data_analysis import histogram, variogram, to_ekvi_PAA,\
+from lcc.utils.data_analysis import values_histogram, variogram, to_ekvi_PAA,\
     abbe
 import matplotlib.pyplot as plt
 import numpy as np
 
 
+def _cached(method):
+    """
+    Decorator of `LightCurve` methods which stores results in the cache
+    of the light curve. Results are keyed by the method name and values
+    of all its arguments (including default ones). Returned arrays are
+    read-only because they are shared by all callers.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(bound.arguments.items())[1:]
+
+        try:
+            result = self._cache[key]
+            self._cache.move_to_end(key)
+            return result
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable arguments
+            return method(self, *args, **kwargs)
+
+        result = method(self, *args, **kwargs)
+        for res in (result if isinstance(result, tuple) else (result,)):
+            if isinstance(res, np.ndarray):
+                res.setflags(write=False)
+
+        self._cache[key] = result
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+    return wrapper
+
+
 # TODO move descriptors method to descriptors
 class LightCurve():
     """
     Attributes
     ----------
     meta : dict
-        Optional metadata of the light curve. Recommended are
+        Optional metadata of the light curve. Light curves created
+        without metadata share read-only `DEFAULT_META` until they are
+        modified by `updateMeta` (copy-on-write). Recommended are
         these keys:
 
             xlabel - name of the first array
@@ -30,8 +75,25 @@ class LightCurve():
             invert_yaxis - True/False if y axis is inverted
     BAD_VALUES : iterable
         List of banned values in the light curve
+
+    TIME_DECIMALS : int
+        Number of decimal places of times after rounding
+
+    MAG_DECIMALS : int
+        Number of decimal places of magnitudes and errors after rounding
+
+    CACHE_SIZE : int
+        Maximal number of derived products (histograms, variograms, etc.)
+        kept in the cache of the light curve. The cache is invalidated
+        whenever time, mag or err is set
+
+    FLOAT32 : bool
+        Default storage mode of magnitudes and errors. If True they are
+        kept as float32 arrays (times are always float64)
     """
 
+    __slots__ = ("_time", "_mag", "_err", "_meta", "_cache")
+
     DEFAULT_META = {"xlabel": "HJD",
                     "xlabel_unit": "days",
                     "ylabel": "Magnitudes",
@@ -41,7 +103,14 @@ class LightCurve():
 
     BAD_VALUES = (np.NaN, np.nan, None, "", "-99", "-99.0")
 
-    def __init__(self, param, meta=None):
+    TIME_DECIMALS = 5
+    MAG_DECIMALS = 3
+
+    CACHE_SIZE = 16
+
+    FLOAT32 = False
+
+    def __init__(self, param, meta=None, round_values=True, float32=None):
         """
         Parameters
         -----------
@@ -54,6 +123,11 @@ class LightCurve():
                 Option II:
                     List (numpy array) of N lists (time, mag  and err)
                     one per obs
+
+                Option III:
+                    Structured (record) numpy array, e.g. data of FITS
+                    binary table. First three fields are taken as time,
+                    mag and err
         meta : dict
             Optional metadata of the light curve. Recommended are
             these keys:
@@ -71,26 +145,23 @@ class LightCurve():
                 origin - db name
 
                 invert_yaxis - True/False if y axis is inverted
+
+        round_values : bool
+            If True times are rounded to `TIME_DECIMALS` and magnitudes
+            and errors to `MAG_DECIMALS` decimal places
+
+        float32 : bool, NoneType
+            If True magnitudes and errors are stored as float32 arrays.
+            If None `FLOAT32` is used
         """
 
         if isinstance(param, (list, tuple)):
             param = np.array(param)
 
         if isinstance(param, np.ndarray):
-            # Transpose if there are list of tuples (time, mag,err)
-            if len(param) > 3:
-                param = param.transpose()
-
-            param[0] = np.array(param[0])
-            param[1] = np.array(param[1])
-
-            if len(param) == 2:
-                param = np.concatenate([param, [np.zeros(len(param[0]))]])
-            else:
-                param[2] = np.array(param[2])
-
-            self.time, self.mag, self.err = self._cleanLC(param[0],
-                                                          param[1], param[2])
+            time, mag, err = self._splitColumns(param)
+            time, mag, err = self._cleanLC(time, mag, err, round_values)
+            self.time, self.mag, self.err = (time,) + self._toStorage(mag, err, float32)
         else:
             raise Exception(
                 "Wrong object parameters\nLightCurve object is not created")
@@ -99,14 +170,160 @@ class LightCurve():
             raise StarAttributeError("""Invalid light curve. Size of time, mag
             and err lists have to be the some. Got %i, %i, %i""" %
                                      (len(self.time), len(self.mag),  len(self.err)))
-        # Set default meta values
+        self.meta = meta
+
+    @classmethod
+    def fromArrays(cls, time, mag, err, meta=None, float32=None):
+        """
+        Create light curve from already cleaned arrays. The arrays are not
+        copied, so the light curve can be a view into a larger array.
+
+        Parameters
+        -----------
+        time : numpy.ndarray
+            Times of observations
+
+        mag : numpy.ndarray
+            Magnitudes
+
+        err : numpy.ndarray
+            Errors of magnitudes
+
+        meta : dict
+            Optional metadata of the light curve
+
+        float32 : bool, NoneType
+            If True magnitudes and errors are stored as float32 arrays
+            (they are copied if they are not float32 already). If None
+            `FLOAT32` is used
+
+        Returns
+        --------
+        LightCurve
+            Light curve object
+        """
+        if not (len(time) == len(mag) == len(err)):
+            raise StarAttributeError("""Invalid light curve. Size of time, mag
+            and err lists have to be the some. Got %i, %i, %i""" %
+                                     (len(time), len(mag), len(err)))
+        lc = cls.__new__(cls)
+        lc.time, lc.mag, lc.err = (time,) + lc._toStorage(mag, err, float32)
+        lc.meta = meta
+        return lc
+
+    def _toStorage(self, mag, err, float32=None):
+        """Convert magnitudes and errors into the storage dtype"""
+        if float32 is None:
+            float32 = self.FLOAT32
+        if float32:
+            mag = np.asarray(mag, dtype=np.float32)
+            err = np.asarray(err, dtype=np.float32)
+        return mag, err
+
+    def _fillMeta(self, meta):
+        """Set default meta values"""
+        if not meta:
+            return _SHARED_DEFAULT_META
         for key in self.DEFAULT_META:
-            if not meta:
-                meta = dict()
             if not meta.get(key):
                 meta[key] = self.DEFAULT_META[key]
+        return meta
 
-        self.meta = meta
+    @property
+    def meta(self):
+        return self._meta
+
+    @meta.setter
+    def meta(self, meta):
+        self._meta = self._fillMeta(meta)
+
+    def updateMeta(self, meta=None, **kwargs):
+        """
+        Update metadata of the light curve. Shared default metadata
+        are copied before the first modification.
+
+        Parameters
+        -----------
+        meta : dict, NoneType
+            Metadata to update
+
+        kwargs : dict
+            Metadata to update given as keyword arguments
+
+        Returns
+        --------
+        NoneType
+            None
+        """
+        if not self.hasOwnMeta():
+            self._meta = dict(self._meta)
+        self._meta.update(meta or {}, **kwargs)
+
+    def hasOwnMeta(self):
+        """
+        Check whether the light curve keeps its own metadata or it still
+        shares the default ones
+
+        Returns
+        --------
+        bool
+            False if metadata are the shared defaults
+        """
+        return self._meta is not _SHARED_DEFAULT_META
+
+    @property
+    def time(self):
+        return self._time
+
+    @time.setter
+    def time(self, time):
+        self._time = time
+        self.invalidateCache()
+
+    @property
+    def mag(self):
+        return self._mag
+
+    @mag.setter
+    def mag(self, mag):
+        self._mag = mag
+        self.invalidateCache()
+
+    @property
+    def err(self):
+        return self._err
+
+    @err.setter
+    def err(self, err):
+        self._err = err
+        self.invalidateCache()
+
+    def invalidateCache(self):
+        """
+        Drop all cached derived products. It has to be called manually
+        after in-place modification of time, mag or err arrays.
+        """
+        self._cache = collections.OrderedDict()
+
+    def __reduce_ex__(self, protocol):
+        """
+        Light curve is pickled as raw buffers of its arrays and its own
+        metadata (shared default metadata are not stored). With protocol 5
+        the buffers can be transferred out-of-band.
+        """
+        meta = self._meta if self.hasOwnMeta() else None
+        arrays = [_packArray(arr, protocol) for arr in (self._time, self._mag, self._err)]
+        return _restoreLightCurve, tuple(arrays) + (meta,)
+
+    def __setstate__(self, state):
+        # Light curves pickled before __reduce_ex__ was implemented
+        # and before time, mag and err became properties
+        for key in ("time", "mag", "err"):
+            if key in state:
+                state["_" + key] = state.pop(key)
+        self._time, self._mag, self._err = state["_time"], state["_mag"], state["_err"]
+        self.meta = state.get("meta")
+        self.invalidateCache()
 
     def __str__(self):
         txt = "Time\tMag\tErr\n"
@@ -130,6 +347,7 @@ class LightCurve():
         """Get standard deviation of magnitudes"""
         return np.std(self.mag)
 
+    @_cached
     def getHistogram(self, bins=10, centred=True, normed=True):
         """
         Distribution of magnitudes of light curve
@@ -151,8 +369,11 @@ class LightCurve():
             Tuple of counts and bins (ranges) or None if
             there are no light curve
         """
-        return histogram(self.time, self.mag, bins, centred, normed)
+        # Equidistant PAA of the full dimension fixes non-equidistant
+        # time steps between observations
+        return values_histogram(self.getEkviPAA()[1], bins, centred, normed)
 
+    @_cached
     def getVariogram(self, bins=10, days_per_bin=None, log_opt=True):
         """
         Variogram is function which shows variability of time series
@@ -173,6 +394,7 @@ class LightCurve():
 
         return variogram(self.time, self.mag, bins=bins, log_opt=log_opt)
 
+    @_cached
     def getAbbe(self, bins=None):
         """
         Compute Abbe value of the light curve
@@ -188,21 +410,121 @@ class LightCurve():
             Abbe value of the light curve
         """
         if bins:
-            x = to_ekvi_PAA(self.time, self.mag, bins)[1]
+            x = self.getEkviPAA(bins)[1]
         else:
             x = self.mag
         return abbe(x, len(self.time))
 
-    def _cleanLC(self, time, mag, err):
-        cl_time, cl_mag, cl_err = [], [], []
-        for t, m, e in zip(time, mag, err):
-            mind_me = [t in self.BAD_VALUES, m in self.BAD_VALUES, e in self.BAD_VALUES, not np.isfinite(t), not np.isfinite(m), not np.isfinite(e)]
-            if not True in mind_me:
-                cl_time.append(round(t, 5))
-                cl_mag.append(round(m, 3))
-                cl_err.append(round(e, 3))
-        return np.array(cl_time), np.array(cl_mag), np.array(cl_err)
-
-    def selfClean(self):
-        self.time, self.mag, self.err = self._cleanLC(self.time, self.mag, self.err)
+    def getEkviPAA(self, bins=None):
+        """
+        Equidistant PAA of the light curve (see
+        `lcc.utils.data_analysis.to_ekvi_PAA`). It is computed once for
+        each dimension and shared by all descriptors which need it.
+
+        Parameters
+        -----------
+        bins : int, float, NoneType
+            Dimension of reduced light curve, also can be percentage
+            number (0, 1). It is limited by length of the light curve.
+            If it is None, dimension of the light curve is kept
+
+        Returns
+        --------
+        numpy.ndarray
+            Reduced times (read-only)
+
+        numpy.ndarray
+            Reduced magnitudes (read-only)
+        """
+        n = len(self.time)
+        if bins and 0 < bins <= 1:
+            bins = int(n * bins)
+        if not bins or bins > n:
+            bins = n
+        return self._getEkviPAA(int(bins))
+
+    @_cached
+    def _getEkviPAA(self, bins):
+        return to_ekvi_PAA(self.time, self.mag, bins)
+
+    def _splitColumns(self, param):
+        """
+        Get time, mag and err columns of the given array without copying
+        the data if possible
+        """
+        if param.dtype.names:
+            columns = [param[name] for name in param.dtype.names[:3]]
+        else:
+            # Transpose if there are list of tuples (time, mag,err)
+            if len(param) > 3:
+                param = param.transpose()
+            columns = list(param[:3])
+
+        if len(columns) == 2:
+            columns.append(np.zeros(len(columns[0])))
+        return columns
+
+    def _toFloatArray(self, values):
+        """
+        Convert column into float array. Float arrays are returned as they
+        are, banned values in columns of other types are replaced by NaNs.
+        """
+        values = np.asanyarray(values)
+        if values.dtype.kind == "f":
+            return values
+
+        elif values.dtype.kind in "iub":
+            return values.astype(float)
+
+        bad_values = [v for v in self.BAD_VALUES if isinstance(v, str)]
+        return np.array([np.nan if v is None or (isinstance(v, str) and v in bad_values)
+                         else float(v) for v in values.ravel()])
+
+    def _cleanLC(self, time, mag, err, round_values=True):
+        time = self._toFloatArray(time)
+        mag = self._toFloatArray(mag)
+        err = self._toFloatArray(err)
+
+        if len(time) == len(mag) == len(err):
+            good = np.isfinite(time) & np.isfinite(mag) & np.isfinite(err)
+            if not good.all():
+                time, mag, err = time[good], mag[good], err[good]
+
+        if round_values:
+            time = np.round(time, self.TIME_DECIMALS)
+            mag = np.round(mag, self.MAG_DECIMALS)
+            err = np.round(err, self.MAG_DECIMALS)
+
+        return time, mag, err
+
+    def selfClean(self, round_values=True):
+        float32 = self.mag.dtype == np.float32
+        time, mag, err = self._cleanLC(self.time, self.mag, self.err, round_values)
+        self.time, self.mag, self.err = (time,) + self._toStorage(mag, err, float32)
+        self.invalidateCache()
         return True
+
+
+_SHARED_DEFAULT_META = types.MappingProxyType(dict(LightCurve.DEFAULT_META))
+
+
+def _packArray(arr, protocol):
+    """
+    Get array for pickling. For protocol 5 and higher it is dtype and
+    `pickle.PickleBuffer` of the array, for older protocols the array
+    itself is pickled by numpy.
+    """
+    if protocol >= 5:
+        arr = np.ascontiguousarray(arr)
+        return arr.dtype.str, pickle.PickleBuffer(arr)
+    return arr
+
+
+def _restoreLightCurve(time, mag, err, meta):
+    """Unpickle light curve from the output of `LightCurve.__reduce_ex__`"""
+    lc = LightCurve.__new__(LightCurve)
+    lc._time, lc._mag, lc._err = [arr if isinstance(arr, np.ndarray) else np.frombuffer(arr[1], dtype=arr[0])
+                                  for arr in (time, mag, err)]
+    lc._meta = meta if meta is not None else _SHARED_DEFAULT_META
+    lc.invalidateCache()
+    return lc
@@ -0,0 +1,586 @@
+import numpy as np
+
+from lcc.entities.exceptions import StarAttributeError
+from lcc.entities.light_curve import LightCurve
+from lcc.entities.star import Star
+from lcc.utils.data_analysis import fix_missing
+
+
+class LightCurveBatch(object):
+    """
+    Columnar container of many light curves. Times, magnitudes and errors
+    of all curves are stored in three concatenated arrays and the i-th
+    curve occupies `offsets[i]:offsets[i + 1]` part of them. Statistics
+    of the whole batch are computed as segment reductions without
+    iterating over curves in Python.
+
+    Attributes
+    ----------
+    time : numpy.ndarray
+        Concatenated times of all light curves
+
+    mag : numpy.ndarray
+        Concatenated magnitudes of all light curves
+
+    err : numpy.ndarray
+        Concatenated errors of all light curves
+
+    offsets : numpy.ndarray
+        Start indices of light curves followed by the total number
+        of points (N + 1 values for N light curves)
+
+    metas : list
+        Meta dictionaries of the light curves. None means that there
+        is no light curve on the position
+
+    stars : list, NoneType
+        `Star` objects the light curves belong to
+    """
+
+    def __init__(self, time, mag, err, offsets, metas=None, stars=None):
+        """
+        Parameters
+        ----------
+        time : numpy.ndarray
+            Concatenated times of all light curves
+
+        mag : numpy.ndarray
+            Concatenated magnitudes of all light curves
+
+        err : numpy.ndarray
+            Concatenated errors of all light curves
+
+        offsets : list, numpy.ndarray
+            Start indices of light curves followed by the total number
+            of points
+
+        metas : list, NoneType
+            Meta dictionaries of the light curves
+
+        stars : list, NoneType
+            `Star` objects the light curves belong to
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+
+        if not (len(time) == len(mag) == len(err)):
+            raise StarAttributeError("Size of time, mag and err arrays have to be the same. Got %i, %i, %i" %
+                                     (len(time), len(mag), len(err)))
+
+        if (len(offsets) < 1 or offsets[0] != 0 or offsets[-1] != len(time) or
+                (np.diff(offsets) < 0).any()):
+            raise StarAttributeError("Invalid offsets of the light curves batch")
+
+        n = len(offsets) - 1
+        if metas is None:
+            metas = [{} for _ in range(n)]
+
+        if len(metas) != n or (stars is not None and len(stars) != n):
+            raise StarAttributeError("Number of metas/stars doesn't match number of light curves")
+
+        self.time = time
+        self.mag = mag
+        self.err = err
+        self.offsets = offsets
+        self.metas = metas
+        self.stars = stars
+
+        self._seg_ids = None
+        self._ekvi_PAA = {}
+
+    @classmethod
+    def fromLightCurves(cls, light_curves, stars=None):
+        """
+        Create batch from light curves
+
+        Parameters
+        ----------
+        light_curves : list
+            `LightCurve` objects. None values are allowed for missing
+            light curves
+
+        stars : list, NoneType
+            `Star` objects the light curves belong to
+
+        Returns
+        -------
+        LightCurveBatch
+            Batch of the light curves
+        """
+        present = [lc for lc in light_curves if lc is not None]
+        lengths = [len(lc.time) if lc is not None else 0 for lc in light_curves]
+
+        offsets = np.zeros(len(light_curves) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        if present:
+            time = np.concatenate([lc.time for lc in present])
+            mag = np.concatenate([lc.mag for lc in present])
+            err = np.concatenate([lc.err for lc in present])
+        else:
+            time, mag, err = np.zeros(0), np.zeros(0), np.zeros(0)
+
+        # Default metas are shared, not copied (see `LightCurve.meta`)
+        metas = [None if lc is None else lc.meta for lc in light_curves]
+        return cls(time, mag, err, offsets, metas, stars)
+
+    @classmethod
+    def fromStars(cls, stars):
+        """
+        Create batch from the first light curves of stars
+
+        Parameters
+        ----------
+        stars : list
+            `Star` objects
+
+        Returns
+        -------
+        LightCurveBatch
+            Batch of the light curves
+        """
+        return cls.fromLightCurves([st.lightCurve for st in stars], stars=list(stars))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            indices = range(len(self))[key]
+            if indices.step == 1:
+                return self._sliceView(indices.start, indices.stop)
+            return self.take(list(indices))
+
+        return self.getLightCurve(key)
+
+    @property
+    def lengths(self):
+        """Number of points of each light curve"""
+        return np.diff(self.offsets)
+
+    def getLightCurve(self, i):
+        """
+        Get light curve as view into the batch arrays
+
+        Parameters
+        ----------
+        i : int
+            Position of the light curve
+
+        Returns
+        -------
+        LightCurve, NoneType
+            Light curve or None if there is no light curve on the position
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Light curve index out of range")
+
+        if self.metas[i] is None:
+            return None
+
+        fr, to = self.offsets[i], self.offsets[i + 1]
+        return LightCurve.fromArrays(self.time[fr:to], self.mag[fr:to],
+                                     self.err[fr:to], self.metas[i])
+
+    def getStar(self, i):
+        """
+        Get star with light curve which is view into the batch arrays
+
+        Parameters
+        ----------
+        i : int
+            Position of the star
+
+        Returns
+        -------
+        Star
+            Star object
+        """
+        lc = self.getLightCurve(i)
+        if self.stars is not None:
+            orig = self.stars[i]
+            coo = orig._coo if orig._coo is not None else (orig.ra, orig.dec)
+            star = Star(ident=orig.ident, name=orig._name, coo=coo,
+                        more=orig.more, starClass=orig.starClass)
+        else:
+            star = Star()
+
+        if lc is not None:
+            star.light_curves = [lc]
+        return star
+
+    def toStars(self):
+        """
+        Returns
+        -------
+        list
+            `Star` objects with light curves which are views into the batch
+        """
+        return [self.getStar(i) for i in range(len(self))]
+
+    def take(self, indices):
+        """
+        Get new batch of light curves on given positions (data are copied)
+
+        Parameters
+        ----------
+        indices : list, numpy.ndarray
+            Positions of the light curves
+
+        Returns
+        -------
+        LightCurveBatch
+            New batch
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.lengths[indices]
+
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        points = np.repeat(self.offsets[:-1][indices] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        stars = [self.stars[i] for i in indices] if self.stars is not None else None
+        return LightCurveBatch(self.time[points], self.mag[points], self.err[points], offsets,
+                               [self.metas[i] for i in indices], stars)
+
+    def getMeanMag(self):
+        """
+        Returns
+        -------
+        numpy.ndarray
+            Mean magnitudes of the light curves (NaN for missing ones)
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._segmentSum(self.mag) / self.lengths
+
+    def getStdMag(self):
+        """
+        Returns
+        -------
+        numpy.ndarray
+            Standard deviations of magnitudes of the light curves
+            (NaN for missing ones)
+        """
+        seg_ids = self._segmentIds()
+        dev = self.mag - self.getMeanMag()[seg_ids]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self._segmentSum(dev ** 2) / self.lengths)
+
+    def getAbbe(self, bins=None):
+        """
+        Compute Abbe values of the light curves
+
+        Parameters
+        -----------
+        bins : int
+            Number of bins from original dimension
+
+        Returns
+        --------
+        numpy.ndarray
+            Abbe values of the light curves (NaN for missing ones)
+        """
+        if bins:
+            x, seg_ids = self._ekviPAA(bins)[1:3]
+        else:
+            x, seg_ids = self.mag, self._segmentIds()
+
+        valid = ~np.isnan(x)
+        x, seg_ids = x[valid], seg_ids[valid]
+
+        same_seg = seg_ids[1:] == seg_ids[:-1]
+        sum1 = self._segmentSum(((x[1:] - x[:-1]) ** 2)[same_seg], seg_ids[1:][same_seg])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self._segmentSum(x, seg_ids) / self._segmentSum(np.ones(len(x)), seg_ids)
+            sum2 = self._segmentSum((x - means[seg_ids]) ** 2, seg_ids)
+
+            n = self.lengths.astype(float)
+            return n / (2 * (n - 1.0)) * sum1 / sum2
+
+    def getSkewness(self, bins=None):
+        """
+        Compute skewness of magnitudes of the light curves (as
+        `scipy.stats.skew` does)
+
+        Parameters
+        -----------
+        bins : int, NoneType
+            Dimension of reduced light curves (see `getEkviPAA`).
+            If it is None original magnitudes are taken
+
+        Returns
+        --------
+        numpy.ndarray
+            Skewness of the light curves (NaN for missing ones)
+        """
+        m2, m3, _, flat = self._centralMoments(bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(flat, np.nan, m3 / m2 ** 1.5)
+
+    def getKurtosis(self, bins=None):
+        """
+        Compute (Fisher) kurtosis of magnitudes of the light curves (as
+        `scipy.stats.kurtosis` does)
+
+        Parameters
+        -----------
+        bins : int, NoneType
+            Dimension of reduced light curves (see `getEkviPAA`).
+            If it is None original magnitudes are taken
+
+        Returns
+        --------
+        numpy.ndarray
+            Kurtosis of the light curves (NaN for missing ones)
+        """
+        m2, _, m4, flat = self._centralMoments(bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(flat, np.nan, m4 / m2 ** 2 - 3)
+
+    def getEkviPAA(self, bins=None):
+        """
+        Equidistant PAA (see `lcc.utils.data_analysis.to_ekvi_PAA`) of all
+        light curves. If `bins` is None, dimension of light curves is kept.
+        Results are computed once for each dimension and shared by all
+        statistics of the batch.
+
+        Parameters
+        -----------
+        bins : int, float, NoneType
+            Dimension of reduced light curves, also can be percentage
+            number (0, 1). It is limited by length of each light curve
+
+        Returns
+        -------
+        numpy.ndarray
+            Reduced times (concatenated for all light curves, read-only)
+
+        numpy.ndarray
+            Reduced magnitudes (read-only)
+
+        numpy.ndarray
+            Light curve index for each reduced value (read-only)
+        """
+        return self._ekviPAA(bins)
+
+    def getHistogram(self, bins=10, centred=True, normed=True):
+        """
+        Distribution of magnitudes of the light curves. Results correspond
+        to `LightCurve.getHistogram` up to values lying on bin borders,
+        which can fall into the neighbouring bin because of floating point
+        rounding of means.
+
+        Parameters
+        -----------
+        bins : int
+            Number of values in histogram
+
+        centred : bool
+            If True values will be shifted (mean value into the zero)
+
+        normed : bool
+            If True values will be normed (according to standard deviation)
+
+        Returns
+        --------
+        numpy.ndarray
+            Counts (N x (bins - 1) array)
+
+        numpy.ndarray
+            Ranges (N x bins array)
+        """
+        n = len(self)
+        _, x, seg_ids = self._ekviPAA()
+
+        valid = ~np.isnan(x)
+        x, seg_ids = x[valid], seg_ids[valid]
+        counts = np.bincount(seg_ids, minlength=n)
+
+        # Values are centred before binning (as `LightCurve.getHistogram`
+        # does), so edges are computed from the centred values
+        if centred:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = self._segmentSum(x, seg_ids) / counts
+            x = x - means[seg_ids]
+
+        x_min, x_max = self._segmentMinMax(x, seg_ids, counts)
+        bin_ids = self._binIndices(x, seg_ids, x_min, x_max, np.repeat(bins - 1, n),
+                                   close_last=True)
+        hist = np.bincount(seg_ids * (bins - 1) + bin_ids,
+                           minlength=n * (bins - 1)).reshape(n, bins - 1).astype(float)
+        edges = np.linspace(x_min, x_max, bins, axis=1)
+
+        if normed:
+            std = hist.std(axis=1, keepdims=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                hist = np.where(std < 1e-6, 0., (hist - hist.mean(axis=1, keepdims=True)) / std)
+
+        hist[counts == 0] = np.nan
+        return hist, edges
+
+    def _centralMoments(self, bins=None):
+        """
+        Second, third and fourth central moments of magnitudes of each
+        light curve and mask of light curves with (numerically) constant
+        or missing magnitudes
+        """
+        if bins:
+            x, seg_ids = self._ekviPAA(bins)[1:3]
+        else:
+            x, seg_ids = self.mag, self._segmentIds()
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            counts = self._segmentSum(np.ones(len(x)), seg_ids)
+            means = self._segmentSum(x, seg_ids) / counts
+            dev = x - means[seg_ids]
+            m2, m3, m4 = [self._segmentSum(dev ** k, seg_ids) / counts for k in (2, 3, 4)]
+
+        flat = ~(m2 > (np.finfo(float).resolution * means) ** 2)
+        return m2, m3, m4, flat
+
+    def _sliceView(self, start, stop):
+        offsets = self.offsets[start:stop + 1] - self.offsets[start]
+        fr, to = self.offsets[start], self.offsets[stop]
+        stars = self.stars[start:stop] if self.stars is not None else None
+        return LightCurveBatch(self.time[fr:to], self.mag[fr:to], self.err[fr:to],
+                               offsets, self.metas[start:stop], stars)
+
+    def _segmentIds(self):
+        """Index of the light curve for each point of the batch"""
+        if self._seg_ids is None:
+            self._seg_ids = np.repeat(np.arange(len(self)), self.lengths)
+        return self._seg_ids
+
+    def _segmentSum(self, values, seg_ids=None):
+        if seg_ids is None:
+            seg_ids = self._segmentIds()
+        return np.bincount(seg_ids, weights=values, minlength=len(self))
+
+    def _segmentMinMax(self, values, seg_ids, counts):
+        """Minimum and maximum of each segment of grouped values"""
+        x_min = np.full(len(self), np.nan)
+        x_max = np.full(len(self), np.nan)
+
+        starts = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        nonempty = counts > 0
+        if nonempty.any():
+            x_min[nonempty] = np.minimum.reduceat(values, starts[nonempty])
+            x_max[nonempty] = np.maximum.reduceat(values, starts[nonempty])
+        return x_min, x_max
+
+    def _binIndices(self, x, seg_ids, start, stop, nbins, close_last=False):
+        """
+        Get indices of equidistant bins (borders as `numpy.linspace(start,
+        stop, nbins + 1)` per segment) for each value. Values out of
+        borders get -1. Value equal to the last border belongs to the last
+        bin if `close_last` is True.
+        """
+        step = ((stop - start) / nbins)[seg_ids]
+        start, stop, nbins = start[seg_ids], stop[seg_ids], nbins[seg_ids]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            k = np.floor((x - start) / step)
+        k = np.clip(np.nan_to_num(k), 0, nbins - 1).astype(np.int64)
+
+        # Correct rounding errors against borders computed as linspace does
+        k -= (x < k * step + start) & (k > 0)
+        upper = np.where(k + 1 == nbins, stop, (k + 1) * step + start)
+        k += (x >= upper) & (k + 1 < nbins)
+
+        upper = np.where(k + 1 == nbins, stop, (k + 1) * step + start)
+        inside = (x >= k * step + start) & ((x < upper) | (close_last & (k + 1 == nbins) & (x <= stop)))
+
+        if close_last:
+            # All borders are equal - everything falls into the last bin
+            degenerate = step == 0
+            k[degenerate] = nbins[degenerate] - 1
+            inside |= degenerate
+
+        k[~inside] = -1
+        return k
+
+    def _ekviPAA(self, bins=None):
+        """
+        Equidistant PAA of all light curves cached for each dimension
+        (see `getEkviPAA`)
+        """
+        # Dimension which is not lower than any light curve length
+        # keeps all light curves as they are
+        if bins and bins > 1 and int(bins) >= self.lengths.max(initial=0):
+            bins = None
+        key = bins or None
+
+        if key not in self._ekvi_PAA:
+            result = self._computeEkviPAA(bins)
+            for arr in result:
+                arr.setflags(write=False)
+            self._ekvi_PAA[key] = result
+        return self._ekvi_PAA[key]
+
+    def _computeEkviPAA(self, bins=None):
+        """
+        Equidistant PAA (see `lcc.utils.data_analysis.to_ekvi_PAA`) of all
+        light curves. If `bins` is None, dimension of light curves is kept.
+
+        Returns
+        -------
+        numpy.ndarray
+            Reduced times
+
+        numpy.ndarray
+            Reduced magnitudes
+
+        numpy.ndarray
+            Light curve index for each reduced value
+        """
+        n = len(self)
+        lengths = self.lengths
+        if not bins:
+            nbins = lengths.copy()
+        elif 0 < bins <= 1:
+            nbins = (lengths * bins).astype(np.int64)
+        else:
+            nbins = np.minimum(int(bins), lengths)
+
+        seg_ids = self._segmentIds()
+        nonempty = lengths > 0
+        x_min, x_max = self._segmentMinMax(self.time, seg_ids, lengths)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            half_step = (x_max - x_min) / nbins / 2.
+        start, stop = x_min - half_step, x_max + half_step
+
+        k = self._binIndices(self.time, seg_ids, start, stop, np.maximum(nbins, 1))
+
+        res_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(nbins, out=res_offsets[1:])
+        total = res_offsets[-1]
+        res_seg_ids = np.repeat(np.arange(n), nbins)
+
+        inside = (k >= 0) & (nbins[seg_ids] > 0)
+        bin_ids = res_offsets[:-1][seg_ids[inside]] + k[inside]
+        counts = np.bincount(bin_ids, minlength=total)
+
+        # Centres of bins for empty ones
+        kk = np.arange(total) - res_offsets[:-1][res_seg_ids]
+        step = ((stop - start) / np.maximum(nbins, 1))[res_seg_ids]
+        lower = kk * step + start[res_seg_ids]
+        upper = np.where(kk + 1 == nbins[res_seg_ids], stop[res_seg_ids], (kk + 1) * step + start[res_seg_ids])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_res = np.bincount(bin_ids, weights=self.time[inside], minlength=total) / counts
+            y_res = np.bincount(bin_ids, weights=self.mag[inside], minlength=total) / counts
+
+        empty = counts == 0
+        x_res[empty] = ((upper + lower) / 2)[empty]
+        y_res[empty] = np.nan
+
+        for i in np.unique(res_seg_ids[empty]):
+            if nonempty[i]:
+                fr, to = res_offsets[i], res_offsets[i + 1]
+                x_res[fr:to], y_res[fr:to] = fix_missing(x_res[fr:to], y_res[fr:to])
+
+        return x_res, y_res, res_seg_ids
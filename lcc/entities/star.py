@@ -7,6 +7,53 @@ from astropy.coordinates.sky_coordinate import SkyCoord
 from lcc.entities.light_curve import LightCurve
 
 
+def _isDegrees(unit):
+    """Check whether unit (or tuple of units) means degrees"""
+    if isinstance(unit, str) and unit in ("deg", "degree", "degrees"):
+        return True
+    if isinstance(unit, (tuple, list)):
+        return all(_isDegrees(un) for un in unit)
+    try:
+        return u.Unit(unit) == u.deg
+    except (TypeError, ValueError):
+        return False
+
+
+def _toFloatArray(values):
+    """Convert values into float array or return None if it is not possible"""
+    try:
+        return numpy.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return None
+
+
+def _toDegrees(ra, dec, unit):
+    """
+    Convert right ascension and declination of one coordinate into degrees.
+    Numbers in degrees are only converted into floats, other values
+    (e.g. sexagesimal strings) are converted by `SkyCoord`
+    """
+    if _isDegrees(unit):
+        try:
+            return float(ra), float(dec)
+        except (TypeError, ValueError):
+            pass
+    coo = SkyCoord(ra, dec, unit=unit)
+    return float(coo.ra.degree), float(coo.dec.degree)
+
+
+def _normalizeDegrees(ra, dec):
+    """
+    Wrap right ascensions (in degrees) into [0, 360) and replace coordinates
+    with declination out of [-90, 90] by NaN
+    """
+    with numpy.errstate(invalid="ignore"):
+        ra = numpy.mod(numpy.asarray(ra, dtype=float), 360.)
+        dec = numpy.asarray(dec, dtype=float)
+        invalid = ~(numpy.abs(dec) <= 90)
+    return numpy.where(invalid, numpy.nan, ra), numpy.where(invalid, numpy.nan, dec)
+
+
 class Star():
     """
     Star is base object in astronomy. This class is responsible for keeping
@@ -35,7 +82,14 @@ class Star():
         Optional name of the star across the all databases
         
     coo : astropy.coordinates.sky_coordinate.SkyCoord
-        Coordinate of the star
+        Coordinate of the star. It is constructed from `ra` and `dec`
+        when it is accessed for the first time
+
+    ra : float, NoneType
+        Right ascension of the star in degrees
+
+    dec : float, NoneType
+        Declination of the star in degrees
         
     more : dict
         Additional informations about the star in dictionary. This
@@ -56,6 +110,9 @@ class Star():
 
     EPS = 0.000138
 
+    __slots__ = ("ident", "more", "light_curves", "starClass", "_name",
+                 "_ra", "_dec", "_coo")
+
     def __init__(self, ident={}, name=None, coo=None, more={},
                  starClass=None):
         """
@@ -82,8 +139,10 @@ class Star():
         name : str
             Optional name of the star across the all databases
             
-        coo : SkyCoord object
-            Coordinate of the star
+        coo : SkyCoord object, tuple
+            Coordinate of the star. It can be also given as tuple of
+            right ascension and declination (in degrees) optionally
+            followed by unit, e.g. (10.5, -30.2, "deg")
             
         more : dict
             Additional informations about the star in dictionary. This
@@ -118,6 +177,33 @@ class Star():
                         return True
         return self.getInRange(other, self.EPS)
 
+    def __reduce_ex__(self, protocol):
+        """
+        Star is pickled with coordinates as floats in degrees (`SkyCoord`
+        is not stored) and identifiers and additional informations
+        flattened into tuples
+        """
+        ident = tuple((db_key, tuple(db_ident.items()))
+                      for db_key, db_ident in self.ident.items())
+        more = tuple(self.more.items())
+        return _restoreStar, (ident, self._name, self._ra, self._dec, more,
+                              self.starClass, self.light_curves)
+
+    def __setstate__(self, state):
+        # Stars pickled before __reduce_ex__ was implemented
+        state = dict(state)
+        self.ident = state.pop("ident", {})
+        self.more = state.pop("more", {})
+        self.light_curves = state.pop("light_curves", [])
+        self.starClass = state.pop("starClass", None)
+        self._name = state.pop("_name", None)
+
+        # Stars pickled before coordinates were kept in degrees
+        if "_ra" not in state:
+            self.coo = state.get("_coo")
+        else:
+            self._ra, self._dec, self._coo = state["_ra"], state["_dec"], state.get("_coo")
+
     def __str__(self):
         star_text = ""
         for db_key in self.ident:
@@ -126,33 +212,130 @@ class Star():
                 star_text += "%s: %s\t" % (key, self.ident[db_key][key])
             star_text += "\n"
 
-        if self.coo:
+        if self.ra is not None:
             star_text += "\tCoordinate: %s" % self.coo.to_string("hmsdms")
         return star_text
 
+    @classmethod
+    def createStars(cls, ra, dec, unit="deg", idents=None, names=None,
+                    mores=None, star_classes=None):
+        """
+        Create stars from arrays of coordinates. Coordinates are converted
+        into degrees at once for all stars.
+
+        Parameters
+        -----------
+        ra : list, numpy.ndarray
+            Right ascensions of the stars
+
+        dec : list, numpy.ndarray
+            Declinations of the stars
+
+        unit : str, tuple, astropy.units.Unit
+            Unit of the coordinates (see `SkyCoord`)
+
+        idents : list, NoneType
+            Identifiers of the stars
+
+        names : list, NoneType
+            Names of the stars
+
+        mores : list, NoneType
+            Additional informations about the stars
+
+        star_classes : list, NoneType
+            Categories of the stars
+
+        Returns
+        --------
+        list
+            `Star` objects
+        """
+        n = len(ra)
+        if _isDegrees(unit):
+            ra_deg, dec_deg = _toFloatArray(ra), _toFloatArray(dec)
+        else:
+            ra_deg, dec_deg = None, None
+
+        if ra_deg is None or dec_deg is None:
+            try:
+                coo = SkyCoord(ra, dec, unit=unit)
+                ra_deg, dec_deg = coo.ra.degree, coo.dec.degree
+            except Exception:
+                # Coordinates are converted one by one, so only the invalid
+                # ones are dropped
+                warnings.warn("""Invalid values for
+                                            constructing coordinate objects""")
+                ra_deg, dec_deg = numpy.full(n, numpy.nan), numpy.full(n, numpy.nan)
+                for i in range(n):
+                    try:
+                        ra_deg[i], dec_deg[i] = _toDegrees(ra[i], dec[i], unit)
+                    except Exception:
+                        pass
+
+        with numpy.errstate(invalid="ignore"):
+            if (numpy.abs(dec_deg) > 90).any():
+                warnings.warn("""Invalid values for
+                                            constructing coordinate objects""")
+        ra_deg, dec_deg = _normalizeDegrees(ra_deg, dec_deg)
+
+        stars = []
+        for i in range(n):
+            star = cls(ident=idents[i] if idents is not None else {},
+                       name=names[i] if names is not None else None,
+                       more=mores[i] if mores is not None else {},
+                       starClass=star_classes[i] if star_classes is not None else None)
+            if numpy.isfinite(ra_deg[i]) and numpy.isfinite(dec_deg[i]):
+                star._ra, star._dec = float(ra_deg[i]), float(dec_deg[i])
+            stars.append(star)
+        return stars
+
     @property
     def coo(self):
+        if self._coo is None and self._ra is not None:
+            self._coo = SkyCoord(self._ra, self._dec, unit="deg")
         return self._coo
 
     @coo.setter
     def coo(self, given_coo):
-        if given_coo and given_coo.__class__.__name__ != "SkyCoord":
-            if None not in [it for it in given_coo]:
-                try:
-                    if len(given_coo) == 3:
-                        unit = given_coo[2]
-                    else:
-                        unit = "deg"
-                    given_coo = SkyCoord(given_coo[0], given_coo[1], unit=unit)
-
-                except:
-                    warnings.warn("""Invalid values for
-                                            constructing coordinate object""")
-                    given_coo = None
+        ra, dec = None, None
+        if isinstance(given_coo, SkyCoord):
+            icrs = given_coo.icrs
+            ra, dec = float(icrs.ra.degree), float(icrs.dec.degree)
+
+        elif given_coo and None not in [it for it in given_coo]:
+            if len(given_coo) == 3:
+                unit = given_coo[2]
             else:
-                given_coo = None
+                unit = "deg"
+
+            try:
+                ra, dec = _toDegrees(given_coo[0], given_coo[1], unit)
+                ra, dec = _normalizeDegrees(ra, dec)
+                ra, dec = float(ra), float(dec)
+                if not (numpy.isfinite(ra) and numpy.isfinite(dec)):
+                    raise ValueError()
+
+            except:
+                warnings.warn("""Invalid values for
+                                            constructing coordinate object""")
+                ra, dec = None, None
+            given_coo = None
+
+        else:
+            given_coo = None
+
+        self._ra, self._dec = ra, dec
         self._coo = given_coo
 
+    @property
+    def ra(self):
+        return self._ra
+
+    @property
+    def dec(self):
+        return self._dec
+
     @property
     def lightCurve(self):
         if self.light_curves:
@@ -193,7 +376,7 @@ class Star():
         if not isinstance(eps, u.quantity.Quantity):
             eps = eps * u.deg
 
-        if self.coo is None:
+        if self.ra is None:
             warn("Star {0} has no coordinates".format(
                 self.name))
 
@@ -268,3 +451,15 @@ class Star():
 
         elif lc:
             self.light_curves.append(lc)
+
+
+def _restoreStar(ident, name, ra, dec, more, star_class, light_curves):
+    """Unpickle star from the output of `Star.__reduce_ex__`"""
+    star = Star.__new__(Star)
+    star.ident = {db_key: dict(db_ident) for db_key, db_ident in ident}
+    star.more = dict(more)
+    star.light_curves = light_curves
+    star.starClass = star_class
+    star._name = name
+    star._ra, star._dec, star._coo = ra, dec, None
+    return star
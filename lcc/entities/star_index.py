@@ -0,0 +1,209 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from lcc.entities.star import Star
+
+
+class StarIndex(object):
+    """
+    Spatial index over list of stars. Positions of stars are stored as unit
+    vectors in KD-tree, so cone searches, nearest neighbour queries and
+    crossmatching are tree queries instead of computing separations
+    star by star. All angles are in degrees.
+
+    Attributes
+    ----------
+    stars : list
+        Indexed `Star` objects (including stars without coordinates)
+
+    tree : scipy.spatial.cKDTree
+        KD-tree of unit vectors of stars which have coordinates
+    """
+
+    def __init__(self, stars):
+        """
+        Parameters
+        ----------
+        stars : list
+            `Star` objects
+        """
+        self.stars = list(stars)
+
+        with_coo = [i for i, st in enumerate(self.stars) if st.ra is not None]
+        self._positions = np.array(with_coo, dtype=np.int64)
+        self._without_coo = sorted(set(range(len(self.stars))) - set(with_coo))
+
+        ra = np.array([self.stars[i].ra for i in with_coo], dtype=float)
+        dec = np.array([self.stars[i].dec for i in with_coo], dtype=float)
+        self.tree = cKDTree(_toUnitVectors(ra, dec).reshape(-1, 3))
+
+    def __len__(self):
+        return len(self.stars)
+
+    def queryRadius(self, ra, dec, radius, with_distances=False):
+        """
+        Find stars within the radius from the given position
+
+        Parameters
+        ----------
+        ra : float
+            Right ascension of the center in degrees
+
+        dec : float
+            Declination of the center in degrees
+
+        radius : float
+            Radius of the cone in degrees
+
+        with_distances : bool
+            If True distances of found stars are returned as well
+
+        Returns
+        -------
+        list
+            Stars closer than `radius` in order of the indexed list
+
+        numpy.ndarray
+            Distances of found stars in degrees (if `with_distances`)
+        """
+        center = _toUnitVectors(np.array([ra]), np.array([dec]))[0]
+
+        # Query is slightly wider to not lose stars on the border because
+        # of rounding, exact condition is checked on angular distances
+        candidates = np.array(sorted(self.tree.query_ball_point(
+            center, _toChord(radius) * (1 + 1e-9) + 1e-15)), dtype=np.int64)
+
+        distances = _toAngle(np.linalg.norm(self.tree.data[candidates] - center, axis=1))
+        passed = distances < radius
+        stars = [self.stars[i] for i in self._positions[candidates[passed]]]
+
+        if with_distances:
+            return stars, distances[passed]
+        return stars
+
+    def queryNearest(self, ra, dec, k=1, max_distance=None):
+        """
+        Find nearest stars to the given position
+
+        Parameters
+        ----------
+        ra : float
+            Right ascension in degrees
+
+        dec : float
+            Declination in degrees
+
+        k : int
+            Number of nearest stars
+
+        max_distance : float, NoneType
+            Maximal distance of stars in degrees
+
+        Returns
+        -------
+        list
+            Up to `k` nearest stars sorted by distance
+
+        numpy.ndarray
+            Distances of the stars in degrees
+        """
+        if not self.tree.n:
+            return [], np.zeros(0)
+
+        center = _toUnitVectors(np.array([ra]), np.array([dec]))[0]
+        bound = _toChord(max_distance) if max_distance is not None else np.inf
+        chords, indices = self.tree.query(center, k=[i + 1 for i in range(k)],
+                                          distance_upper_bound=bound)
+
+        found = np.isfinite(chords)
+        stars = [self.stars[i] for i in self._positions[indices[found]]]
+        return stars, _toAngle(chords[found])
+
+    def crossmatch(self, other_stars, eps=Star.EPS):
+        """
+        Match stars of another catalogue with the nearest indexed star
+
+        Parameters
+        ----------
+        other_stars : list, StarIndex
+            `Star` objects of the other catalogue
+
+        eps : float
+            Maximal distance in degrees to consider two stars equal
+
+        Returns
+        -------
+        list
+            Tuples of the indexed star, the star of the other catalogue
+            and their distance in degrees
+        """
+        if not isinstance(other_stars, StarIndex):
+            other_stars = StarIndex(other_stars)
+
+        if not self.tree.n or not other_stars.tree.n:
+            return []
+
+        chords, indices = self.tree.query(other_stars.tree.data, k=1,
+                                          distance_upper_bound=_toChord(eps) * (1 + 1e-9))
+        distances = _toAngle(chords)
+
+        matches = []
+        for j in np.flatnonzero(distances < eps):
+            matches.append((self.stars[self._positions[indices[j]]],
+                            other_stars.stars[other_stars._positions[j]],
+                            distances[j]))
+        return matches
+
+    def removeDuplicates(self, eps=Star.EPS):
+        """
+        Get stars without duplicates. Stars closer than `eps` (also
+        transitively) are considered as one star and the first of them
+        is kept. Stars without coordinates are kept.
+
+        Parameters
+        ----------
+        eps : float
+            Maximal distance in degrees to consider two stars equal
+
+        Returns
+        -------
+        list
+            Unique stars in order of the indexed list
+        """
+        n = self.tree.n
+        parents = np.arange(n)
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        pairs = self.tree.query_pairs(_toChord(eps) * (1 + 1e-9), output_type="ndarray")
+        if len(pairs):
+            distances = _toAngle(np.linalg.norm(self.tree.data[pairs[:, 0]] - self.tree.data[pairs[:, 1]],
+                                                axis=1))
+            for i, j in pairs[distances < eps]:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parents[max(root_i, root_j)] = min(root_i, root_j)
+
+        keep = [self._positions[i] for i in range(n) if find(i) == i]
+        return [self.stars[i] for i in sorted(keep + self._without_coo)]
+
+
+def _toUnitVectors(ra, dec):
+    """Convert coordinates in degrees into unit vectors (N x 3 array)"""
+    ra, dec = np.radians(ra), np.radians(dec)
+    cos_dec = np.cos(dec)
+    return np.column_stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)])
+
+
+def _toChord(angle):
+    """Length of chord of unit sphere for given angle in degrees"""
+    return 2 * np.sin(np.radians(min(float(angle), 180.)) / 2)
+
+
+def _toAngle(chord):
+    """Angle in degrees for given length of chord of unit sphere"""
+    return np.degrees(2 * np.arcsin(np.clip(chord / 2, 0, 1)))
@@ -1,3 +1,5 @@
+import numpy as np
+
 from lcc.stars_processing.utilities.base_decider import BaseDecider
 from lcc.entities.exceptions import QueryInputError
 
@@ -49,33 +51,33 @@ class CustomDecider(BaseDecider):
 
         Returns
         --------
-        list of lists
+        numpy.ndarray
             Probability that inspected star belongs to the searched
-            group of objects
+            group of objects (1 if all coordinates lie strictly inside
+            of boundaries, otherwise 0)
         """
-        self._checkDimensions(star_coords)
-
-        probabilities = []
-        for one_star in star_coords:
-            passed = not False in [self._evaluateOne(
-                one_star[i], self.boundaries[i]) for i in range(len(self.boundaries))]
-            if passed:
-                probabilities.append(1)
-            else:
-                probabilities.append(0)
-        return probabilities
-
-    def _evaluateOne(self, coo, coo_ranges):
-        lower = coo_ranges[0]
-        higher = coo_ranges[1]
-        coo = float(coo)
-        if lower and higher:
-            return coo > lower and coo < higher
-        elif lower:
-            return coo > lower
-        elif higher:
-            return coo < higher
-        return True
+        coords = np.asarray(star_coords, dtype=float)
+        self._checkDimensions(coords)
+
+        lower, upper = self._getBounds()
+        has_lower, has_upper = self._getLimited()
+        with np.errstate(invalid="ignore"):
+            # Coordinates without limits are not compared at all
+            passed = (((coords > lower) | ~has_lower) &
+                      ((coords < upper) | ~has_upper)).all(axis=1)
+        return passed.astype(int)
+
+    def _getBounds(self):
+        """Lower and upper bounds of coordinates (infinite if there is no limit)"""
+        lower = np.array([low if low else -np.inf for low, _ in self.boundaries], dtype=float)
+        upper = np.array([high if high else np.inf for _, high in self.boundaries], dtype=float)
+        return lower, upper
+
+    def _getLimited(self):
+        """Masks of coordinates which have lower and upper limit"""
+        has_lower = np.array([bool(low) for low, _ in self.boundaries])
+        has_upper = np.array([bool(high) for _, high in self.boundaries])
+        return has_lower, has_upper
 
     def learn(self, right_coords=[], wrong_coords=[]):
         """
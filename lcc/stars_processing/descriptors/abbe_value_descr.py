@@ -1,3 +1,6 @@
+import numpy as np
+
+from lcc.entities.light_curve_batch import LightCurveBatch
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 
 
@@ -26,6 +29,15 @@ class AbbeValueDescr(BaseDescriptor):
         """
         self.bins = bins
 
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Reduced light curve (in full dimension if `bins` is not specified)
+        """
+        return [("getEkviPAA", self.bins)]
+
     def getFeatures(self, star):
         """
         Get  Abbe value
@@ -47,3 +59,28 @@ class AbbeValueDescr(BaseDescriptor):
 
         return star.lightCurve.getAbbe(bins=bins)
 
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get Abbe values of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (it is created if it is None)
+
+        Returns
+        -------
+        list
+            Abbe value of each star (None for stars without light curve)
+        """
+        if batch is None:
+            batch = LightCurveBatch.fromStars(stars)
+
+        # Light curves are not shortened if bins are not specified
+        bins = self.bins or int(batch.lengths.max(initial=0))
+        missing = np.array([not star.lightCurve for star in stars], dtype=bool)
+        return self._toSpaceCoords(batch.getAbbe(bins=bins), missing)
+
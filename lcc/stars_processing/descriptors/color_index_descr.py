@@ -1,3 +1,5 @@
+import numpy as np
+
 from lcc.entities.exceptions import QueryInputError
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 
@@ -96,3 +98,43 @@ class ColorIndexDescr(BaseDescriptor):
             else:
                 this_coords.append(star.more.get(col))
         return this_coords
+
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get color indexes of all stars at once. Indexes are computed
+        color by color for whole sample.
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (not used)
+
+        Returns
+        -------
+        list
+            Color indexes of each star
+        """
+        columns = []
+        for col in self.colors:
+            if hasattr(col, "__iter__"):
+                if len(col) != 2:
+                    raise QueryInputError(
+                        "Colors have to be list of tuples of the length of two (second - first magnitude)")
+                mags1 = [star.more.get(col[0]) for star in stars]
+                mags2 = [star.more.get(col[1]) for star in stars]
+                present = np.array([bool(mag1 and mag2) for mag1, mag2 in zip(mags1, mags2)], dtype=bool)
+
+                indexes = np.zeros(len(stars))
+                if present.any():
+                    indexes[present] = (np.array([mags2[i] for i in np.flatnonzero(present)], dtype=float) -
+                                        np.array([mags1[i] for i in np.flatnonzero(present)], dtype=float))
+                column = indexes.tolist()
+                for i in np.flatnonzero(~present):
+                    column[i] = None
+                columns.append(column)
+            else:
+                columns.append([star.more.get(col) for star in stars])
+        return [list(row) for row in zip(*columns)] if columns else [[] for _ in stars]
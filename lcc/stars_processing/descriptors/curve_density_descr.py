@@ -1,6 +1,6 @@
+import numpy as np
 
-
-from lcc.utils.data_analysis import to_ekvi_PAA
+from lcc.entities.light_curve_batch import LightCurveBatch
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 
 
@@ -17,6 +17,15 @@ class CurveDensityDescr(BaseDescriptor):
     LABEL = "Curve density [points per time lag]"
     LC_NEEDED = True
 
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Equidistant PAA of light curves in their full dimension
+        """
+        return [("getEkviPAA", None)]
+
     def getFeatures(self, star):
         """
         Get density of the star's light curve
@@ -31,7 +40,41 @@ class CurveDensityDescr(BaseDescriptor):
         list, iterable, int, float
             Density (points per time lag) of the investigated star
         """
-        x, _ = to_ekvi_PAA(star.lightCurve.time, star.lightCurve.mag)
+        x, _ = star.lightCurve.getEkviPAA()
         ren = x.max() - x.min()
         return len(x) / ren
 
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get densities of light curves of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (it is created if it is None)
+
+        Returns
+        -------
+        list
+            Density of each star (None for stars without light curve)
+        """
+        if batch is None:
+            batch = LightCurveBatch.fromStars(stars)
+        x, _, seg_ids = batch.getEkviPAA()
+
+        # Reduced times of each light curve are increasing
+        counts = np.bincount(seg_ids, minlength=len(batch))
+        ends = np.cumsum(counts)
+        nonempty = counts > 0
+        ren = np.full(len(batch), np.nan)
+        ren[nonempty] = x[ends[nonempty] - 1] - x[ends[nonempty] - counts[nonempty]]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            density = counts / ren
+
+        missing = np.array([not star.lightCurve for star in stars], dtype=bool)
+        return self._toSpaceCoords(density, missing)
+
@@ -5,7 +5,7 @@ import numpy as np
 
 from lcc.entities.exceptions import QueryInputError
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
-from lcc.utils.data_analysis import to_ekvi_PAA, to_PAA
+from lcc.utils.data_analysis import to_PAA
 from sklearn import decomposition
 
 
@@ -21,6 +21,9 @@ class CurveDescr(BaseDescriptor):
 
     red_dim : int, NoneType
         If not None dimension is reduced by PCA into given size
+
+    pca : sklearn.decomposition.PCA, NoneType
+        PCA fitted by `fit` (if `red_dim` is not None)
     """
     LABEL = "Light curve points"
 
@@ -29,27 +32,75 @@ class CurveDescr(BaseDescriptor):
         Parameters
         ----------
         bins : int
-            Dimension of reduced light curve
+            Dimension of reduced light curve. If it is None, it is set
+            to the length of the shortest light curve by `fit`
 
         height : int
             Range of points in magnitude axis
 
         red_dim : int, NoneType
             If not None dimension is reduced by PCA into given size
+            (PCA is fitted by `fit`)
         """
         self.bins = bins
         self.height = height
         self.pca = None
         self.red_dim = red_dim
+        self._auto_bins = not bins
 
         if red_dim:
             self.LABEL = ["" for i in range(red_dim)]
         elif bins:
             self.LABEL = ["" for i in range(bins)]
 
+    def fit(self, stars):
+        """
+        Set the number of bins (if it was not specified) and fit PCA
+        (if `red_dim` is specified) on the sample of stars
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Training sample of stars
+
+        Returns
+        -------
+        CurveDescr
+            Fitted descriptor
+        """
+        if getattr(self, "_auto_bins", not self.bins):
+            bins = np.min([len(st.lightCurve.mag) for st in stars if st.lightCurve])
+            logging.info("Setting bins as min: {}".format(bins))
+            if not self.red_dim:
+                self.LABEL = ["Light curve point " + str(i + 1) for i in range(bins)]
+            self.bins = bins
+
+        if self.red_dim:
+            coords = [self._getCurve(star, self.bins) for star in stars if star.lightCurve]
+            if not coords or len(coords[0]) <= self.red_dim:
+                raise QueryInputError("Number of samples have to be greater then reduced dimension")
+            try:
+                pca = decomposition.PCA(n_components=self.red_dim)
+                pca.fit(coords)
+            except ValueError as e:
+                logging.debug("Data: {0}".format(str(coords)))
+                raise QueryInputError(str(e))
+            self.pca = pca
+        return self
+
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Equidistant PAA of light curves in their full dimension
+        """
+        return [("getEkviPAA", None)]
+
     def getSpaceCoords(self, stars):
         """
-        Get reduced light curve as coordinates
+        Get reduced light curve as coordinates. Descriptor which was not
+        fitted yet is fitted on given stars at first.
 
         Parameters
         -----------
@@ -61,61 +112,41 @@ class CurveDescr(BaseDescriptor):
         list
             List of list of floats
         """
-        if not self.bins:
-            self.bins = np.min([len(st.lightCurve.mag) for st in stars if st.lightCurve])
-            self.LABEL = ["Light curve point " + str(i+1) for i in range(self.bins)]
-            logging.info("Setting bins as min: ".format(self.bins))
+        if not self.bins or (self.red_dim and self.pca is None):
+            self.fit(stars)
 
         coords = []
         for star in stars:
             if star.lightCurve:
-                x, y = to_ekvi_PAA(
-                    star.lightCurve.time, star.lightCurve.mag)
-
-                if len(y) > self.bins:
-                    y, _ = to_PAA(y, self.bins)
-                else:
-                    y, _ = to_PAA(star.lightCurve.mag, self.bins)
-                y = np.array(y)
-
-                if self.height:
-                    y = self.height * y / (y.max() - y.min())
-                    y = np.array([round(q) for q in y])
-                else:
-                    y = y / (y.max() - y.min())
-
-                y -= y.mean()
-                coords.append(y.tolist())
+                coords.append(self._getCurve(star, self.bins).tolist())
             else:
-                coords.append([None for _ in self.LABEL])
+                coords.append(None)
 
         if self.red_dim:
-            _coords = [c for c in coords if None not in c]
-
-            if len(_coords[0]) > self.red_dim:
-                _coords = self._reduceDimension(_coords)
-            else:
-                QueryInputError("Number of samples have to be greater then reduced dimension")
-            
-
-            k = 0
-            red_coo = []
-            for c in coords:
-                if None not in c:
-                    red_coo.append(_coords[k])
-                    k += 1
-                else:
-                    red_coo.append([np.NaN for _ in range(self.red_dim)])
-            coords = red_coo
-
-        return coords
-
-    def _reduceDimension(self, data):
-        try:
-            if not self.pca:
-                self.pca = decomposition.PCA(n_components=self.red_dim)
-                self.pca.fit(data)
-            return self.pca.transform(data).tolist()
-        except ValueError as e:
-            logging.debug("Data: {0}".format(str(data)))
-            raise QueryInputError(str(e))
+            rows = [i for i, c in enumerate(coords) if c is not None]
+            red_coo = [[np.nan for _ in range(self.red_dim)] for _ in coords]
+            if rows:
+                reduced = self.pca.transform([coords[i] for i in rows]).tolist()
+                for i, c in zip(rows, reduced):
+                    red_coo[i] = c
+            return red_coo
+
+        return [c if c is not None else [None for _ in range(self.bins)] for c in coords]
+
+    def _getCurve(self, star, bins):
+        """Get the light curve of the star reduced into `bins` points"""
+        x, y = star.lightCurve.getEkviPAA()
+
+        if len(y) > bins:
+            y, _ = to_PAA(y, bins)
+        else:
+            y, _ = to_PAA(star.lightCurve.mag, bins)
+        y = np.array(y)
+
+        if self.height:
+            y = self.height * y / (y.max() - y.min())
+            y = np.array([round(q) for q in y])
+        else:
+            y = y / (y.max() - y.min())
+
+        return y - y.mean()
@@ -3,6 +3,7 @@ import numpy as np
 
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 from lcc.stars_processing.utilities.compare import ComparativeBase
+from lcc.stars_processing.utilities.sax import SAX
 from lcc.stars_processing.utilities.symbolic_representation import SymbolicRepresentation
 from lcc.utils.data_analysis import compute_bins
 
@@ -39,10 +40,11 @@ class CurvesShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
 
     LABEL = ["Dissimilarity of the curve from the template"]
     LC_NEEDED = True
-    MAX_ITER = 500
+    MAX_ITER = None
+    WORD_PARAMS = ("days_per_bin", "alphabet_size", "slide")
 
     def __init__(self, comp_stars, days_per_bin, alphabet_size,
-                 slide=0.25, meth="average"):
+                 slide=0.25, meth="average", use_index=False):
         """
         Parameters
         -----------
@@ -69,15 +71,21 @@ class CurvesShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
                           object coordinate
             best'n'   : take best n scores of match, it can be integer or percentage float (0-1).
                     for example best10 takes 10 best matches, best0.5 takes 50 % best matches of the total
+
+        use_index : bool
+            If True, 'closest' and 'best' coordinates are computed
+            by searching the index of template words, which skips
+            templates that can not be among the best ones
         """
 
-        self.comp_stars = comp_stars
         self.days_per_bin = days_per_bin
         self.alphabet_size = alphabet_size
         self.slide = slide
         self.meth = meth
+        self.use_index = use_index
+        self.loadCompStars(comp_stars)
 
-    def getWord(self, star):
+    def getScaledWord(self, star):
         """
         Parameters
         -----------
@@ -85,7 +93,11 @@ class CurvesShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
 
         Returns
         --------
-        String representation of light curve
+        numpy.ndarray
+            Integer-coded SAX word of light curve
+
+        float
+            Scaling factor of the word
         """
         word_size = compute_bins(star.lightCurve.time, self.days_per_bin)
         logging.debug("Curve Shape Descr word size: {}".format(word_size))
@@ -104,8 +116,11 @@ class CurvesShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
 
         Returns
         --------
-        list
-            String representations of light curve
+        numpy.ndarray
+            Integer-coded SAX word of the shorter light curve
+
+        numpy.ndarray
+            Integer-coded SAX words of windows of the longer light curve
         """
         word_size1 = compute_bins(star1.lightCurve.time, self.days_per_bin)
         word_size2 = compute_bins(star2.lightCurve.time, self.days_per_bin)
@@ -124,27 +139,68 @@ class CurvesShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
         longer_word = _words[max_arg]
         shorter_word = _words[min_arg]
 
-        window_size = len(longer_star.lightCurve.time) * \
-            shorter_word / float(longer_word)
-        overlay_len = self.slide * window_size
+        words = self._getWindowWords(longer_star.lightCurve.mag, longer_word, shorter_word)
+        return self._getWord(shorter_star.lightCurve.mag, shorter_word, self.alphabet_size)[0], words
 
-        words = []
-        from_i = 0
-        to_i = 0
-        i = 0
-        while i < self.MAX_ITER:
+    def _getWindowWords(self, mag, word_size, window_word_size):
+        """
+        Get words of overlapping windows of the light curve
 
-            to_i = int(from_i + window_size)
+        Parameters
+        -----------
+        mag : numpy.ndarray
+            Magnitudes of the longer light curve
 
-            if to_i > len(longer_star.lightCurve.mag):
-                break
+        word_size : int
+            Word size of the whole light curve
 
-            lc_slice = longer_star.lightCurve.mag[from_i: to_i]
-            words.append(
-                self._getWord(lc_slice, shorter_word, self.alphabet_size))
+        window_word_size : int
+            Word size of each window
 
-            from_i += int(window_size - overlay_len)
+        Returns
+        --------
+        numpy.ndarray
+            Integer-coded SAX words of windows (one word per row)
+        """
+        window_size = len(mag) * window_word_size / float(word_size)
+        window_len = int(window_size)
+        stride = int(window_size - self.slide * window_size)
+
+        # Windows start at multiples of the stride as long as whole window fits
+        if stride > 0:
+            starts = np.arange(0, len(mag) - window_len + 1, stride)
+        else:
+            starts = np.arange(min(len(mag) - window_len + 1, 1))
+        if self.MAX_ITER is not None:
+            starts = starts[:self.MAX_ITER]
+
+        return SAX(window_word_size, self.alphabet_size).to_int_windows(mag, starts, window_len)
+
+    def _getTemplateWordSize(self, comp_star):
+        return self._getCachedWord(comp_star, ("word_size",),
+                                   lambda: compute_bins(comp_star.lightCurve.time, self.days_per_bin))
 
-            i += 1
+    def _getSlideWords(self, comp_star, star):
+        """
+        The same as `getWords` for the template and the inspected star,
+        but words of the template (also words of its windows) are taken
+        from the cache
+        """
+        comp_word_size = self._getTemplateWordSize(comp_star)
+        word_size = compute_bins(star.lightCurve.time, self.days_per_bin)
 
-        return self._getWord(shorter_star.lightCurve.mag, shorter_word, self.alphabet_size), words
+        if comp_word_size == word_size:
+            comp_word = self._getTemplateWord(comp_star)[0]
+            word, scaling_factor = self.getScaledWord(star)
+            return comp_word, [word], scaling_factor
+
+        elif word_size < comp_word_size:
+            words = self._getCachedWord(
+                comp_star, ("windows", word_size),
+                lambda: self._getWindowWords(comp_star.lightCurve.mag, comp_word_size, word_size))
+            word, scaling_factor = self._getWord(star.lightCurve.mag, word_size, self.alphabet_size)
+            return word, words, scaling_factor
+
+        words = self._getWindowWords(star.lightCurve.mag, word_size, comp_word_size)
+        comp_word, scaling_factor = self._getTemplateWord(comp_star)
+        return comp_word, words, scaling_factor
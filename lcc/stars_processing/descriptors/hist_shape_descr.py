@@ -39,8 +39,9 @@ class HistShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
     """
 
     LABEL = ["Dissimilarity of the light curves histogram from the template"]
+    WORD_PARAMS = ("bins", "alphabet_size")
 
-    def __init__(self, comp_stars, bins, alphabet_size, slide=False, meth="average"):
+    def __init__(self, comp_stars, bins, alphabet_size, slide=False, meth="average", use_index=False):
         """
         Parameters
         -----------
@@ -66,14 +67,30 @@ class HistShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
                           object coordinate
             best'n'   : take best n scores of match, it can be integer or percentage float (0-1).
                         for example best10 takes 10 best matches, best0.5 takes 50 % best matches of the total
+
+        use_index : bool
+            If True, 'closest' and 'best' coordinates are computed
+            by searching the index of template words, which skips
+            templates that can not be among the best ones
         """
-        self.comp_stars = comp_stars
         self.bins = bins
         self.alphabet_size = alphabet_size
         self.slide = slide
         self.meth = meth
+        self.use_index = use_index
+        self.loadCompStars(comp_stars)
 
-    def getWord(self, star):
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Equidistant PAA of light curves in their full dimension
+            (histograms are computed from it)
+        """
+        return [("getEkviPAA", None)]
+
+    def getScaledWord(self, star):
         """
         Parameters
         -----------
@@ -81,7 +98,10 @@ class HistShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
 
         Returns
         -------
-        str
-            String representation of light curve's histogram
+        numpy.ndarray
+            Integer-coded SAX word of light curve's histogram
+
+        float
+            Scaling factor of the word
         """
         return self._getWord(star.lightCurve.getHistogram(bins=self.bins)[0], self.bins, self.alphabet_size)
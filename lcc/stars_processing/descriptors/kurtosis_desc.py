@@ -1,8 +1,8 @@
 import numpy as np
 from scipy.stats import kurtosis
 
+from lcc.entities.light_curve_batch import LightCurveBatch
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
-from lcc.utils.data_analysis import to_ekvi_PAA
 
 
 class KurtosisDescr(BaseDescriptor):
@@ -34,6 +34,17 @@ class KurtosisDescr(BaseDescriptor):
         self.bins = bins
         self.absolute = absolute
 
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Reduced light curve if `bins` is specified
+        """
+        if self.bins:
+            return [("getEkviPAA", self.bins)]
+        return []
+
     def getFeatures(self, star):
         """
         Get  skewness
@@ -50,7 +61,7 @@ class KurtosisDescr(BaseDescriptor):
         """
         lc = star.lightCurve
         if self.bins:
-            _, mags = to_ekvi_PAA(lc.time, lc.mag, self.bins)
+            _, mags = lc.getEkviPAA(self.bins)
         else:
             mags = lc.mag
         kurt = kurtosis(mags)
@@ -59,3 +70,30 @@ class KurtosisDescr(BaseDescriptor):
             kurt = abs(kurt)
 
         return kurt
+
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get kurtosis of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (it is created if it is None)
+
+        Returns
+        -------
+        list
+            Kurtosis of each star (None for stars without light curve)
+        """
+        if batch is None:
+            batch = LightCurveBatch.fromStars(stars)
+        values = batch.getKurtosis(bins=self.bins)
+
+        if self.absolute:
+            values = np.abs(values)
+
+        missing = np.array([not star.lightCurve for star in stars], dtype=bool)
+        return self._toSpaceCoords(values, missing)
@@ -1,3 +1,5 @@
+import numpy as np
+
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 
 
@@ -23,8 +25,29 @@ class PositionDescriptor(BaseDescriptor):
         list
             Abbe value of the investigated star
         """
-        if star.coo:
-            return [star.coo.ra.degree, star.coo.dec.degree]
+        if star.ra is not None:
+            return [star.ra, star.dec]
         else:
             return [None, None]
 
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get coordinates of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (not used)
+
+        Returns
+        -------
+        list
+            Coordinates of each star
+        """
+        coords = np.array([(star.ra, star.dec) for star in stars], dtype=float).reshape(len(stars), 2)
+        missing = np.array([star.ra is None for star in stars], dtype=bool)
+        return self._toSpaceCoords(coords, missing)
+
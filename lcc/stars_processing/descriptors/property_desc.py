@@ -1,3 +1,5 @@
+import numpy as np
+
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
 
 
@@ -68,3 +70,31 @@ class PropertyDescr(BaseDescriptor):
                     "Attributes of stars for PropertyDescriptors have to be numbers.\nGot: %s" % coo)
 
         return coo
+
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get desired attributes of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (not used)
+
+        Returns
+        -------
+        list
+            Desired more attributes of each star
+        """
+        values = [[star.more.get(attribute_name, self.ifnot)
+                   for attribute_name in self.attribute_names] for star in stars]
+        try:
+            if any(None in row for row in values):
+                raise ValueError
+            coords = np.array(values, dtype=float).reshape(len(stars), len(self.attribute_names))
+        except (ValueError, TypeError):
+            # Stars are processed one by one to raise the same error
+            return [self.getFeatures(star) for star in stars]
+        return coords.tolist()
@@ -1,8 +1,8 @@
 import numpy as np
 from scipy.stats import skew
 
+from lcc.entities.light_curve_batch import LightCurveBatch
 from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
-from lcc.utils.data_analysis import to_ekvi_PAA
 
 
 class SkewnessDescr(BaseDescriptor):
@@ -34,6 +34,17 @@ class SkewnessDescr(BaseDescriptor):
         self.bins = bins
         self.absolute = absolute
 
+    def getIntermediates(self):
+        """
+        Returns
+        -------
+        list
+            Reduced light curve if `bins` is specified
+        """
+        if self.bins:
+            return [("getEkviPAA", self.bins)]
+        return []
+
     def getFeatures(self, star):
         """
         Get skewness
@@ -50,7 +61,7 @@ class SkewnessDescr(BaseDescriptor):
         """
         lc = star.lightCurve
         if self.bins:
-            _, mags = to_ekvi_PAA(lc.time, lc.mag, self.bins)
+            _, mags = lc.getEkviPAA(self.bins)
         else:
             mags = lc.mag
         sk = skew(mags)
@@ -59,4 +70,29 @@ class SkewnessDescr(BaseDescriptor):
             sk = abs(sk)
         return sk
 
+    def getFeaturesBatch(self, stars, batch=None):
+        """
+        Get skewness of all stars at once
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
+
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars (it is created if it is None)
+
+        Returns
+        -------
+        list
+            Skewness of each star (None for stars without light curve)
+        """
+        if batch is None:
+            batch = LightCurveBatch.fromStars(stars)
+        values = batch.getSkewness(bins=self.bins)
+
+        if self.absolute:
+            values = np.abs(values)
 
+        missing = np.array([not star.lightCurve for star in stars], dtype=bool)
+        return self._toSpaceCoords(values, missing)
@@ -35,8 +35,9 @@ class VariogramShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescripto
     """
 
     LABEL = ["Dissimilarity of the light curve's variogram from the template"]
+    WORD_PARAMS = ("bins", "alphabet_size")
 
-    def __init__(self, comp_stars, bins, alphabet_size, slide=False, meth="average"):
+    def __init__(self, comp_stars, bins, alphabet_size, slide=False, meth="average", use_index=False):
         """
         Parameters
         -----------
@@ -62,14 +63,20 @@ class VariogramShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescripto
                           object coordinate
             best'n'   : take best n scores of match, it can be integer or percentage float (0-1).
                         for example best10 takes 10 best matches, best0.5 takes 50 % best matches of the total
+
+        use_index : bool
+            If True, 'closest' and 'best' coordinates are computed
+            by searching the index of template words, which skips
+            templates that can not be among the best ones
         """
-        self.comp_stars = comp_stars
         self.bins = bins
         self.alphabet_size = alphabet_size
         self.slide = slide
         self.meth = meth
+        self.use_index = use_index
+        self.loadCompStars(comp_stars)
 
-    def getWord(self, star):
+    def getScaledWord(self, star):
         """
         Parameters
         -----------
@@ -77,8 +84,11 @@ class VariogramShapeDescr(SymbolicRepresentation, ComparativeBase, BaseDescripto
 
         Returns
         --------
-        str
-            String representation of light curve's variogram
+        numpy.ndarray
+            Integer-coded SAX word of light curve's variogram
+
+        float
+            Scaling factor of the word
         """
         return self._getWord(star.lightCurve.getVariogram(bins=self.bins)[1],
                              self.bins, self.alphabet_size)
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from lcc.entities.exceptions import QueryInputError
+
+
+class FiltersCascade(object):
+    """
+    Cascade of learned `StarsFilter` objects. A star passes thru the cascade
+    if it passes thru all filters, so each filter (stage of the cascade)
+    inspects only stars which passed thru the previous stages. Stars rejected
+    by a cheap filter (e.g. `CustomDecider` on `PropertyDescr`) are never
+    described by expensive (e.g. comparative) descriptors of following
+    filters.
+
+    Stages are ordered by their measured costs. Cost of a stage is its mean
+    time per inspected star divided by the rate of stars it rejects, so
+    stages which reject most stars in the shortest time go first. Stages
+    which were not measured yet keep their order and go first (they are
+    measured by the next filtering).
+
+    Attributes
+    ----------
+    stars_filters : list
+        `StarsFilter` objects (stages of the cascade)
+
+    reorder : bool
+        If True stages are ordered by their measured costs, otherwise
+        they are applied in the given order
+
+    stats : list
+        Numbers of inspected ("inspected") and passed ("passed") stars
+        and total time in seconds ("time") of each stage
+    """
+
+    def __init__(self, stars_filters, reorder=True):
+        """
+        Parameters
+        ----------
+        stars_filters : list
+            Learned `StarsFilter` objects
+
+        reorder : bool
+            If True stages are ordered by their measured costs, otherwise
+            they are applied in the given order
+        """
+        if not stars_filters:
+            raise QueryInputError("There are no filters for the cascade")
+
+        self.stars_filters = list(stars_filters)
+        self.reorder = reorder
+        self.resetStatistics()
+
+    def filterStars(self, stars, pass_method="all"):
+        """
+        Filter stars by all stages of the cascade
+
+        Parameters
+        ----------
+        stars : list, iterable
+            Star objects to be filtered
+
+        pass_method : str
+            Method of filtering used by each filter (see
+            `StarsFilter.filterStars`). Star has to pass thru all filters.
+
+        Returns
+        -------
+        list of `Star`s
+            Stars which passed thru all filters
+        """
+        remaining = list(stars)
+        for i in self.getOrder():
+            if not remaining:
+                break
+
+            start = time.time()
+            passed = self.stars_filters[i].filterStars(remaining, pass_method)
+
+            stats = self.stats[i]
+            stats["time"] += time.time() - start
+            stats["inspected"] += len(remaining)
+            stats["passed"] += len(passed)
+
+            remaining = passed
+        return remaining
+
+    def getOrder(self):
+        """
+        Returns
+        -------
+        list
+            Indices of filters in order in which they are applied
+        """
+        order = list(range(len(self.stars_filters)))
+        if self.reorder:
+            order.sort(key=self._getCost)
+        return order
+
+    def getStatistics(self):
+        """
+        Get statistics of stages in order in which they are applied
+
+        Returns
+        -------
+        pandas.DataFrame
+            Descriptors of the filter, numbers of inspected and passed
+            stars, pass rate, total time and time per inspected star
+            (in seconds) for each stage
+        """
+        rows = []
+        for i in self.getOrder():
+            stats = self.stats[i]
+            inspected = stats["inspected"]
+            rows.append([", ".join(desc.__class__.__name__ for desc in self.stars_filters[i].descriptors),
+                         inspected, stats["passed"],
+                         stats["passed"] / inspected if inspected else np.nan,
+                         stats["time"],
+                         stats["time"] / inspected if inspected else np.nan])
+
+        return pd.DataFrame(rows, columns=["descriptors", "inspected", "passed", "pass_rate",
+                                           "time", "time_per_star"])
+
+    def resetStatistics(self):
+        """Forget measured costs of all stages"""
+        self.stats = [{"inspected": 0, "passed": 0, "time": 0.}
+                      for _ in self.stars_filters]
+
+    def _getCost(self, i):
+        stats = self.stats[i]
+        if not stats["inspected"]:
+            return 0.
+
+        rejected = 1 - stats["passed"] / stats["inspected"]
+        if not rejected:
+            return np.inf
+        return stats["time"] / stats["inspected"] / rejected
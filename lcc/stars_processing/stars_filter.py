@@ -1,11 +1,15 @@
 
 
+import collections
+import time
 import warnings
 
 import numpy as np
 import pandas as pd
 
 from lcc.entities.exceptions import QueryInputError
+from lcc.entities.light_curve_batch import LightCurveBatch
+from lcc.stars_processing.utilities.base_decider import getThresholdStatistics
 from lcc.utils.commons import check_attribute
 from lcc.utils.helpers import getMeanDict
 
@@ -15,6 +19,10 @@ class StarsFilter(object):
     This class is responsible for filtering stars according to given filters
     (their own implementation of filtering)
 
+    Coordinates are processed as (N x D) float arrays with NaN values for
+    missing features (see `getSpaceCoordinatesArray`). Stars with any missing
+    coordinate are skipped and pandas objects are created only for results.
+
     Attributes
     ----------
     descriptors : list
@@ -33,9 +41,19 @@ class StarsFilter(object):
     others_coords : list
         Parameters space coordinates (got from descriptors) of contamination
         objects
+
+    feature_cache : FeatureCache, NoneType
+        Persistent cache of features computed by descriptors. It is not
+        saved with the filter
+
+    timings : collections.OrderedDict
+        Durations (in seconds) of stages of the last computation of space
+        coordinates. Intermediate products of light curves shared by
+        descriptors (see `BaseDescriptor.getIntermediates`) are computed
+        in their own stages before descriptors
     """
 
-    def __init__(self, descriptors, deciders):
+    def __init__(self, descriptors, deciders, feature_cache=None):
         """
         Parameters
         ----------
@@ -44,6 +62,9 @@ class StarsFilter(object):
 
         decider :list
             Decider objects
+
+        feature_cache : FeatureCache, NoneType
+            Persistent cache of features computed by descriptors
         """
 
         self.descriptors = descriptors
@@ -60,6 +81,13 @@ class StarsFilter(object):
         self.learned = False
         self.searched_coords = []
         self.others_coords = []
+        self.feature_cache = feature_cache
+        self.timings = collections.OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["feature_cache"] = None
+        return state
 
     def __str__(self, *args, **kwargs):
         txt = "Descriptors: " + \
@@ -98,7 +126,8 @@ class StarsFilter(object):
         list of `Star`s
             Stars which passed thru filtering
         """
-        stars_coords = self.getSpaceCoordinates(stars)
+        stars_coords, valid = self.getSpaceCoordinatesArray(stars)
+        stars_coords = stars_coords[valid]
 
         threshold = np.mean([dec.threshold for dec in self.deciders])
 
@@ -114,7 +143,8 @@ class StarsFilter(object):
         else:
             raise QueryInputError("Invalid filtering method")
 
-        return [stars[i] for i, probab in enumerate(probabilities) if probab >= threshold]
+        passed = np.flatnonzero(valid)[probabilities >= threshold]
+        return [stars[i] for i in passed]
 
     def learnOnCoords(self, searched_coords, others_coords):
         """
@@ -149,7 +179,7 @@ class StarsFilter(object):
 
     def learn(self, searched, others):
         """
-        Train deciders on given sample of `Star` objects
+        Fit descriptors and train deciders on given sample of `Star` objects
 
         Parameters
         ----------
@@ -164,8 +194,16 @@ class StarsFilter(object):
         -------
             None
         """
-        coords = self.getSpaceCoordinates(searched+others)
-        self.learnOnCoords(coords[:len(searched)], coords[len(searched):])
+        for descriptor in self.descriptors:
+            if hasattr(descriptor, "fit"):
+                descriptor.fit(searched + others)
+
+        searched, others = list(searched), list(others)
+        coords, valid = self.getSpaceCoordinatesArray(searched + others)
+
+        n = len(searched)
+        self.learnOnCoords(self._toDataFrame(coords[:n][valid[:n]], searched, valid[:n]),
+                           self._toDataFrame(coords[n:][valid[n:]], others, valid[n:]))
 
     def getSpaceCoordinates(self, stars):
         """
@@ -179,30 +217,47 @@ class StarsFilter(object):
         Returns
         -------
         pandas.DataFrame
-            Coordinates of the stars as pandas DataFrame
+            Coordinates of the stars as pandas DataFrame (stars with
+            missing coordinates are dropped)
         """
-        space_coordinates = self._getSpaceCoordinates(stars)
-        if isinstance(space_coordinates, np.ndarray):
-            space_coordinates = space_coordinates.tolist()
-        labels = [st.name for st in stars]
+        coords, valid = self.getSpaceCoordinatesArray(stars)
+        return self._toDataFrame(coords[valid], stars, valid)
+
+    def getSpaceCoordinatesArray(self, stars):
+        """
+        Get params space coordinates according to descriptors as numpy array
+
+        Parameters
+        ----------
+        stars : list, tuple
+            List of `Star` objects
 
-        assert len(space_coordinates) == len(labels)
+        Returns
+        -------
+        numpy.ndarray
+            Coordinates of the stars (N x D float array, one star per row).
+            Missing features are NaN
 
+        numpy.ndarray
+            Mask of stars which have all coordinates
+        """
+        coords = self._getSpaceCoordinates(stars)
+        return coords, ~np.isnan(coords).any(axis=1)
+
+    def getLabels(self):
+        """
+        Returns
+        -------
+        list
+            Labels of coordinates (columns of `getSpaceCoordinates`)
+        """
         desc_labels = []
         for desc in self.descriptors:
             if not isinstance(desc.LABEL, str) and hasattr(desc.LABEL, "__iter__"):
                 desc_labels += desc.LABEL
             else:
                 desc_labels.append(desc.LABEL)
-
-        df_coords = pd.DataFrame(
-            space_coordinates, columns=desc_labels, index=labels)
-
-        # TODO: Is it safe?
-        # df_coords.fillna(np.NaN)
-        df_coords.dropna(inplace=True)
-
-        return df_coords
+        return desc_labels
 
     def evaluateStars(self, stars, meth="mean"):
         """
@@ -226,9 +281,9 @@ class StarsFilter(object):
         list
             Probabilities of membership according to selected the method
         """
-        stars_coords_df = self.getSpaceCoordinates(stars)
-        pred = self.evaluateCoordinates(stars_coords_df.values, meth)
-        return pd.Series(pred, index=stars_coords_df.index)
+        stars_coords, valid = self.getSpaceCoordinatesArray(stars)
+        pred = self.evaluateCoordinates(stars_coords[valid], meth)
+        return pd.Series(pred, index=self._getIndex(stars, valid))
 
     def getEvaluations(self, stars):
         """
@@ -252,40 +307,35 @@ class StarsFilter(object):
         list
             Probabilities of membership according to selected the method
         """
-        stars_coords_df = self.getSpaceCoordinates(stars)
+        stars_coords, valid = self.getSpaceCoordinatesArray(stars)
+        decisions = self._evaluateDeciders(stars_coords[valid])
 
-        decisions = []
-        for decider in self.deciders:
-            decisions.append(decider.evaluate(stars_coords_df.values))
-
-        return pd.DataFrame(np.transpose(decisions), index=stars_coords_df.index,
+        return pd.DataFrame(decisions.T, index=self._getIndex(stars, valid),
                             columns=[dec.__class__.__name__ for dec in self.deciders])
 
     def getAllPredictions(self, stars, with_features=False, check_passing=False):
         """
         Get probability of membership calculated from all deciders
         """
-        stars_coords_df = self.getSpaceCoordinates(stars)
-
-        decisions = []
-        if stars:
-            for decider in self.deciders:
-                decisions.append(decider.evaluate(stars_coords_df.values))
-            decisions = np.transpose(decisions)
-
-        df = pd.DataFrame(decisions, index=stars_coords_df.index,
-                          columns=[d.__class__.__name__ for d in self.deciders])
+        stars_coords, valid = self.getSpaceCoordinatesArray(stars)
+        stars_coords = stars_coords[valid]
+        decisions = self._evaluateDeciders(stars_coords).T
 
+        names = [d.__class__.__name__ for d in self.deciders]
+        data = collections.OrderedDict()
         if with_features:
-            df = pd.merge(stars_coords_df, df, left_index=True, right_index=True)
+            for label, column in zip(self.getLabels(), stars_coords.T):
+                data[label] = column
+        for name, column in zip(names, decisions.T):
+            data[name] = column
 
         if check_passing:
-            for decider in self.deciders:
-                df["passed_{}".format(decider.__class__.__name__)] = df[decider.__class__.__name__] > decider.threshold
+            passed = decisions > np.array([decider.threshold for decider in self.deciders])
+            for name, column in zip(names, passed.T):
+                data["passed_{}".format(name)] = column
+            data["passed"] = passed.all(axis=1)
 
-            df["passed"] = df[[c for c in df.columns if c.startswith("passed_")]].all(axis=1)
-
-        return df
+        return pd.DataFrame(data, index=self._getIndex(stars, valid), columns=list(data))
 
     @check_attribute("learned", True, "raise")
     def evaluateCoordinates(self, stars_coords, meth="mean"):
@@ -307,25 +357,24 @@ class StarsFilter(object):
 
         Returns
         -------
-        list
+        numpy.ndarray
             Probabilities of membership according to selected method
         """
-        decisions = []
-        for decider in self.deciders:
-            decisions.append(decider.evaluate(stars_coords))
         if meth == "mean":
-            return [round(np.mean(coo), 2) for coo in np.array(decisions).T]
+            reduce = np.mean
 
         elif meth == "highest":
-            return [round(np.max(coo), 2) for coo in np.array(decisions).T]
+            reduce = np.max
 
         elif meth == "lowest":
-            return [round(np.min(coo), 2) for coo in np.array(decisions).T]
+            reduce = np.min
 
         else:
             raise QueryInputError(
                 "Invalid method for calculating membership probability")
 
+        return np.round(reduce(self._evaluateDeciders(stars_coords), axis=0), 2)
+
     @check_attribute("learned", True, "raise")
     def getStatistic(self, s_stars, c_stars, threshold=None):
         """
@@ -361,29 +410,206 @@ class StarsFilter(object):
                 Proportion of negatives that are incorrectly identified
                 as positives
         """
-        searched_stars_coords = self.getSpaceCoordinates(s_stars).values
-        contamination_stars_coords = self.getSpaceCoordinates(c_stars).values
+        searched_stars_coords, valid = self.getSpaceCoordinatesArray(s_stars)
+        searched_stars_coords = searched_stars_coords[valid]
+        contamination_stars_coords, valid = self.getSpaceCoordinatesArray(c_stars)
+        contamination_stars_coords = contamination_stars_coords[valid]
 
         return getMeanDict([decider.getStatistic(searched_stars_coords,
                                                  contamination_stars_coords, threshold) for decider in self.deciders])
 
+    @check_attribute("learned", True, "raise")
+    def getThresholdCurve(self, s_stars, c_stars, thresholds=None):
+        """
+        Get statistics of filtering (see `getStatistic`) for many thresholds.
+        Coordinates of both samples are computed once and each decider
+        evaluates them once, so ROC and precision-recall curves are
+        obtained for the price of one filtering.
+
+        Parameters
+        ----------
+        s_stars : list of `Star` objects
+            Searched stars
+
+        c_stars : list of `Star` objects
+            Contamination stars
+
+        thresholds : list, numpy.ndarray, NoneType
+            Treshold values for filtering. If it is None, all distinct
+            probabilities given by deciders are taken
+
+        Returns
+        -------
+        pandas.DataFrame
+            Statistical values (keys of `getStatistic`) and numbers of
+            true/false positives/negatives ("true_pos", "false_pos",
+            "true_neg", "false_neg") for each threshold ("threshold").
+            Values are averaged over deciders
+        """
+        searched_coords, valid = self.getSpaceCoordinatesArray(s_stars)
+        searched_probabilities = self._evaluateDeciders(searched_coords[valid])
+        contamination_coords, valid = self.getSpaceCoordinatesArray(c_stars)
+        contamination_probabilities = self._evaluateDeciders(contamination_coords[valid])
+
+        if thresholds is None:
+            thresholds = np.concatenate([searched_probabilities.ravel(),
+                                         contamination_probabilities.ravel()])
+            thresholds = np.unique(thresholds[~np.isnan(thresholds)])
+
+        stats = [getThresholdStatistics(s_prob, c_prob, thresholds)
+                 for s_prob, c_prob in zip(searched_probabilities, contamination_probabilities)]
+
+        return pd.DataFrame(collections.OrderedDict(
+            (key, np.mean([stat[key] for stat in stats], axis=0)) for key in stats[0]))
+
     def getROC(self, s_stars, c_stars, n=30):
-        tp, fp = [], []
-        for thr in np.linspace(0.01, 0.99, n):
-            stat = self.getStatistic(s_stars, c_stars, thr)
-            tp.append(stat["true_positive_rate"])
-            fp.append(stat["false_positive_rate"])
-        return fp, tp
+        """
+        Get ROC curve for evenly spaced thresholds (see `getThresholdCurve`)
+
+        Parameters
+        ----------
+        s_stars : list of `Star` objects
+            Searched stars
+
+        c_stars : list of `Star` objects
+            Contamination stars
+
+        n : int
+            Number of thresholds between 0.01 and 0.99
+
+        Returns
+        -------
+        list
+            False positive rates
+
+        list
+            True positive rates
+        """
+        curve = self.getThresholdCurve(s_stars, c_stars, np.linspace(0.01, 0.99, n))
+        return curve["false_positive_rate"].tolist(), curve["true_positive_rate"].tolist()
 
     def _getSpaceCoordinates(self, stars):
-        space_coordinate = []
+        """
+        Get coordinates of the stars as (N x D) float array. Blocks of
+        columns of descriptors are copied into preallocated array.
+        """
+        feature_cache = getattr(self, "feature_cache", None)
+        self.timings = collections.OrderedDict()
+        if not len(stars):
+            return np.empty((0, len(self.getLabels())))
+
+        # Cached features don't need intermediates, so they are computed
+        # (and shared by light curves cache) only for missing ones
+        batch = None
+        if feature_cache is None:
+            batch = self._computeIntermediates(stars)
+
+        blocks = []
         for descriptor in self.descriptors:
-            coo = descriptor.getSpaceCoords(stars)
-            if coo and not hasattr(coo[0], "__iter__"):
-                coo = [[c] for c in coo]
-
-            if not space_coordinate:
-                space_coordinate = coo
+            start = time.time()
+            if feature_cache is not None:
+                coo = feature_cache.getSpaceCoords(descriptor, stars)
+            elif hasattr(descriptor, "getFeaturesBatch"):
+                coo = descriptor.getSpaceCoords(stars, batch=batch)
             else:
-                space_coordinate = [list(a)+list(b) for a, b in zip(space_coordinate, coo)]
-        return space_coordinate
+                coo = descriptor.getSpaceCoords(stars)
+            self._addTiming(descriptor.__class__.__name__, start)
+            blocks.append(self._toBlock(coo, len(stars)))
+
+        space_coordinates = np.empty((len(stars), sum(block.shape[1] for block in blocks)))
+        col = 0
+        for block in blocks:
+            space_coordinates[:, col:col + block.shape[1]] = block
+            col += block.shape[1]
+        return space_coordinates
+
+    @staticmethod
+    def _toBlock(coords, n):
+        """
+        Convert coordinates of N stars obtained from a descriptor into
+        (N x d) float array. Missing or non-numeric values become NaN.
+        """
+        assert len(coords) == n
+        try:
+            return np.array(coords, dtype=float).reshape(n, -1)
+        except (TypeError, ValueError):
+            pass
+
+        rows = [coo if hasattr(coo, "__iter__") and not isinstance(coo, str) else [coo]
+                for coo in coords]
+        block = np.full((n, max(len(row) for row in rows)), np.nan)
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                try:
+                    block[i, j] = float(value)
+                except (TypeError, ValueError):
+                    pass
+        return block
+
+    def _evaluateDeciders(self, stars_coords):
+        """Probabilities of membership of all deciders (one row per decider)"""
+        decisions = np.empty((len(self.deciders), len(stars_coords)))
+        if len(stars_coords):
+            for i, decider in enumerate(self.deciders):
+                decisions[i] = np.ravel(decider.evaluate(stars_coords))
+        return decisions
+
+    def _toDataFrame(self, coords, stars, valid):
+        """DataFrame of coordinates of stars selected by `valid` mask"""
+        return pd.DataFrame(coords, columns=self.getLabels(), index=self._getIndex(stars, valid))
+
+    @staticmethod
+    def _getIndex(stars, valid):
+        return [star.name for star, ok in zip(stars, valid) if ok]
+
+    def _computeIntermediates(self, stars):
+        """
+        Compute each distinct intermediate product needed by descriptors
+        once. Products of descriptors processing the whole sample at once
+        are kept in the shared `LightCurveBatch`, the others in caches
+        of light curves.
+
+        Parameters
+        ----------
+        stars : list, tuple
+            List of `Star` objects
+
+        Returns
+        -------
+        LightCurveBatch, NoneType
+            Batch of light curves of the stars shared by descriptors
+            implementing `getFeaturesBatch` (None if there is no such)
+        """
+        batch_products, star_products = [], []
+        for descriptor in self.descriptors:
+            products = batch_products if hasattr(descriptor, "getFeaturesBatch") else star_products
+            for product in getattr(descriptor, "getIntermediates", list)():
+                if product not in products:
+                    products.append(product)
+
+        batch = None
+        if any(hasattr(descriptor, "getFeaturesBatch") for descriptor in self.descriptors):
+            start = time.time()
+            batch = LightCurveBatch.fromStars(stars)
+            self._addTiming("LightCurveBatch", start)
+
+        for product in batch_products:
+            start = time.time()
+            getattr(batch, product[0])(*product[1:])
+            self._addTiming("LightCurveBatch." + self._productName(product), start)
+
+        for product in star_products:
+            start = time.time()
+            for star in stars:
+                if star.lightCurve:
+                    getattr(star.lightCurve, product[0])(*product[1:])
+            self._addTiming("LightCurve." + self._productName(product), start)
+
+        return batch
+
+    def _addTiming(self, stage, start):
+        self.timings[stage] = self.timings.get(stage, 0) + time.time() - start
+
+    @staticmethod
+    def _productName(product):
+        return "%s(%s)" % (product[0], ", ".join(str(arg) for arg in product[1:]))
@@ -40,10 +40,13 @@ class ParamsEstimator(object):
     multiproc : bool, int
         If True task will be distributed into threads by using all cores. If it is number,
         just that number of cores are used
+
+    feature_cache : FeatureCache, NoneType
+        Persistent cache of features shared by all evaluated filters
     """
 
     def __init__(self, searched, others, descriptors, deciders, tuned_params,
-                 split_ratio=0.7, static_params={}, multiproc=True):
+                 split_ratio=0.7, static_params={}, multiproc=True, feature_cache=None):
         """
         Parameters
         ----------
@@ -75,6 +78,9 @@ class ParamsEstimator(object):
         multiproc : bool, int
             If True task will be distributed into threads by using all cores. If it is number,
             just that number of cores are used            
+
+        feature_cache : FeatureCache, NoneType
+            Persistent cache of features shared by all evaluated filters
         """
 
         random.shuffle(searched)
@@ -94,6 +100,7 @@ class ParamsEstimator(object):
         self.filters = []
 
         self.multiproc = multiproc
+        self.feature_cache = feature_cache
 
     def evaluateCombinations(self, tuned_params=None):
         """
@@ -122,7 +129,7 @@ class ParamsEstimator(object):
 
             pool = multiprocessing.Pool(n_cpu)
 
-            result = pool.map_async(self.evaluate, tuned_params)
+            result = pool.map_async(self._evaluateInWorker, tuned_params)
             pool.close()  # No more work
             n = len(tuned_params)
             while True:
@@ -133,6 +140,11 @@ class ParamsEstimator(object):
             result = result.get()
             sys.stderr.write('\rAll {0} combinations have been evaluated'.format(n))
 
+            if self.feature_cache is not None:
+                for _, _, counts in result:
+                    self.feature_cache.addStatistics(**counts)
+            result = [res[:2] for res in result]
+
             # result = pool.map(self.evaluate, tuned_params)
         else:
             result = [self.evaluate(tp) for tp in tuned_params]
@@ -253,12 +265,26 @@ class ParamsEstimator(object):
                 raise QueryInputError("Not enough parameters to construct constructor {0}\nGot: {1}".format(
                     des.__name__, params))
 
-        stars_filter = StarsFilter(descriptors, deciders)
+        stars_filter = StarsFilter(descriptors, deciders, self.feature_cache)
         stars_filter.learn(self.searched_train, self.others_train)
 
         stat = stars_filter.getStatistic(self.searched_test, self.others_test)
         return stars_filter, stat
 
+    def _evaluateInWorker(self, combination):
+        """
+        Evaluate the combination in a worker process. Usage of the feature
+        cache is counted by the worker's copy of the cache, so its counts
+        are returned with the result to be added to the cache of the parent
+        process.
+        """
+        cache = self.feature_cache
+        keys = ("hits", "misses", "evictions")
+        before = [getattr(cache, key, 0) for key in keys]
+        stars_filter, stat = self.evaluate(combination)
+        counts = {key: getattr(cache, key, 0) - prev for key, prev in zip(keys, before)}
+        return stars_filter, stat, counts
+
     def saveOutput(self, save_params):
         """
         Parameters
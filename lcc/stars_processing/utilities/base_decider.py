@@ -6,7 +6,6 @@ import warnings
 
 import numpy as np
 
-from lcc.utils.data_analysis import computePrecision
 from lcc.utils.helpers import check_depth
 
 
@@ -20,6 +19,10 @@ class BaseDecider(abc.ABC):
     need to implement several methods: "learn" and "evaluate". Also all of them
     have to have "threshold" attribute. To be explained read comments below.
 
+    Filtering and statistics evaluate whole samples of coordinates at once.
+    Statistics for many thresholds are derived from one evaluation of each
+    sample (see `getThresholdStatistics`).
+
     Attributes
     -----------
     threshold : float
@@ -30,6 +33,9 @@ class BaseDecider(abc.ABC):
     threshold = 0.8
     """
 
+    STATISTICS = ("precision", "accuracy", "f1_score", "true_positive_rate",
+                  "true_negative_rate", "false_positive_rate", "false_negative_rate")
+
     def learn(self, right_coords, wrong_coords):
         """
         After executing this method the decider object is capable to recognize
@@ -98,18 +104,9 @@ class BaseDecider(abc.ABC):
             warnings.warn(" There are no stars coordinates to inspect")
             return None
 
-        best_coo = None
-        best_prob = 0
-        for coords in stars_coords:
-            prob = self.evaluate([coords])[0]
-            if prob >= best_prob:
-                best_coo = coords
-                best_prob = prob
-
-        # TODO:
-        assert best_coo is not None
-
-        return best_coo
+        # The last of coordinates with the highest probability
+        probabilities = self._evaluateSample(stars_coords)
+        return stars_coords[len(probabilities) - 1 - int(np.argmax(probabilities[::-1]))]
 
     def filter(self, stars_coords, threshold=None):
         """
@@ -128,7 +125,7 @@ class BaseDecider(abc.ABC):
         if not threshold:
             threshold = self.threshold
         check_depth(stars_coords, 2)
-        return [self.evaluate([coo])[0] >= threshold for coo in stars_coords]
+        return (self._evaluateSample(stars_coords) >= threshold).tolist()
 
     def getStatistic(self, right_coords, wrong_coords, threshold=None):
         """
@@ -170,28 +167,105 @@ class BaseDecider(abc.ABC):
                 Proportion of negatives that are incorrectly identified
                 as positives
         """
+        if not threshold:
+            threshold = self.threshold
+
+        stats = self.getThresholdStatistics(right_coords, wrong_coords, [threshold])
+        return collections.OrderedDict((key, stats[key][0].item()) for key in self.STATISTICS)
+
+    def getThresholdStatistics(self, right_coords, wrong_coords, thresholds=None):
+        """
+        Get statistics (see `getStatistic`) for many thresholds at once.
+        Both samples are evaluated once and numbers of passed coordinates
+        are counted from sorted probabilities.
+
+        Parameters
+        ----------
+        right_coords : list
+            Parameter-space coordinates of searched objects
+
+        wrong_coords : list
+            Parameter-space coordinates of other objects
+
+        thresholds : list, numpy.ndarray, NoneType
+            Treshold values for filtering. If it is None, all distinct
+            probabilities of both samples are taken
+
+        Returns
+        -------
+        collections.OrderedDict
+            Arrays of statistical values (keys of `getStatistic`), numbers
+            of true/false positives/negatives ("true_pos", "false_pos",
+            "true_neg", "false_neg") and thresholds ("threshold")
+        """
         check_depth(right_coords, 2)
         check_depth(wrong_coords, 2)
 
-        right_num = len(right_coords)
-        wrong_num = len(wrong_coords)
+        return getThresholdStatistics(self._evaluateSample(right_coords),
+                                      self._evaluateSample(wrong_coords), thresholds)
+
+    def _evaluateSample(self, stars_coords):
+        """Probabilities of all coordinates evaluated at once (as float array)"""
+        if not len(stars_coords):
+            return np.zeros(0)
+        return np.asarray(self.evaluate(stars_coords), dtype=float).ravel()
+
+
+def getThresholdStatistics(right_probabilities, wrong_probabilities, thresholds=None):
+    """
+    Get statistics of filtering (see `BaseDecider.getStatistic`) for many
+    thresholds at once. Coordinates pass if their probability is greater
+    or equal then the threshold.
+
+    Parameters
+    ----------
+    right_probabilities : list, numpy.ndarray
+        Probabilities of membership of searched objects
+
+    wrong_probabilities : list, numpy.ndarray
+        Probabilities of membership of other objects
+
+    thresholds : list, numpy.ndarray, NoneType
+        Treshold values for filtering. If it is None, all distinct
+        probabilities are taken
+
+    Returns
+    -------
+    collections.OrderedDict
+        Arrays of statistical values for each threshold
+    """
+    right = np.asarray(right_probabilities, dtype=float)
+    wrong = np.asarray(wrong_probabilities, dtype=float)
+    right_num, wrong_num = len(right), len(wrong)
+
+    # NaN probabilities never pass
+    right = np.sort(right[~np.isnan(right)])
+    wrong = np.sort(wrong[~np.isnan(wrong)])
 
-        true_pos = sum(
-            [1 for guess in self.filter(right_coords, threshold) if guess])
-        false_neg = right_num - true_pos
+    if thresholds is None:
+        thresholds = np.unique(np.concatenate([right, wrong]))
+    thresholds = np.asarray(thresholds, dtype=float)
 
-        true_neg = sum(
-            [1 for guess in self.filter(wrong_coords, threshold) if not guess])
-        false_pos = wrong_num - true_neg
+    true_pos = len(right) - np.searchsorted(right, thresholds, side="left")
+    false_pos = len(wrong) - np.searchsorted(wrong, thresholds, side="left")
+    false_neg = right_num - true_pos
+    true_neg = wrong_num - false_pos
 
-        precision = round(computePrecision(true_pos, false_pos), 3)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        predicted = true_pos + false_pos
+        precision = np.where(predicted > 0, true_pos / np.maximum(predicted, 1), 0.)
 
-        stat = (("precision", precision),
+        stat = (("threshold", thresholds),
+                ("precision", np.round(precision, 3)),
                 ("accuracy", (true_pos + true_neg) / (right_num + wrong_num)),
                 ("f1_score", 2 * true_pos / (2 * true_pos + false_pos + false_neg)),
                 ("true_positive_rate", np.round(true_pos / right_num, 3)),
                 ("true_negative_rate", np.round(true_neg / wrong_num, 3)),
                 ("false_positive_rate", np.round(1 - (true_neg / wrong_num), 3)),
-                ("false_negative_rate", np.round(1 - (true_pos / right_num), 3)))
+                ("false_negative_rate", np.round(1 - (true_pos / right_num), 3)),
+                ("true_pos", true_pos),
+                ("false_pos", false_pos),
+                ("true_neg", true_neg),
+                ("false_neg", false_neg))
 
-        return collections.OrderedDict(stat)
+    return collections.OrderedDict(stat)
@@ -1,15 +1,63 @@
 import abc
 
+import numpy as np
+
 
 class BaseDescriptor(abc.ABC):
     """
     Base class for all filters. It is something like interface (check whether
     subclasses have certain methods
+
+    Features are computed without modifying the descriptor, so a descriptor
+    can be used from many threads at once. State learned from a sample
+    of stars is set by `fit` before features are computed.
+
+    Descriptors can implement `getFeaturesBatch(stars, batch=None)` which
+    computes features of the whole sample at once. It has to return the same
+    coordinates as `getSpaceCoords` computed star by star. `batch` is
+    `LightCurveBatch` of the stars shared with other descriptors (if it
+    is None, descriptor creates its own one).
+
+    Intermediate products of light curves which are needed by a descriptor
+    are listed by `getIntermediates`. `StarsFilter` computes each distinct
+    one once and all descriptors of the filter share it.
     """
 
     LABEL = ""
     NONE_VALUE = None
 
+    def fit(self, stars):
+        """
+        Fit the descriptor on the sample of stars. Descriptors which do not
+        learn anything from the sample leave it as it is.
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Training sample of stars
+
+        Returns
+        -------
+        BaseDescriptor
+            Fitted descriptor
+        """
+        return self
+
+    def getIntermediates(self):
+        """
+        Get intermediate products of light curves which the descriptor
+        needs to compute its features
+
+        Returns
+        -------
+        list
+            Tuples of name of `LightCurve` method (`LightCurveBatch`
+            method for descriptors implementing `getFeaturesBatch`)
+            which computes the product followed by its arguments,
+            for example ("getEkviPAA", 30)
+        """
+        return []
+
     def getFeatures(self, star):
         """
         Get feature from star object
@@ -26,43 +74,70 @@ class BaseDescriptor(abc.ABC):
         """
         raise NotImplementedError
 
-    def getSpaceCoords(self, stars):
+    def getSpaceCoords(self, stars, batch=None):
         """
         Get list of parameters coordinates according to descriptor
-        implementation
+        implementation. Whole sample is processed by `getFeaturesBatch`
+        if the descriptor implements it, otherwise stars are processed
+        one by one by `getFeatures`.
 
         Parameters
         -----------
         stars : list of Star objects
             Stars with color magnitudes in their 'more' attribute
 
+        batch : LightCurveBatch, NoneType
+            Light curves of the stars shared with other descriptors
+            (used by `getFeaturesBatch` only)
+
+        Returns
+        -------
+        list
+            List of coordinates
+        """
+        if hasattr(self, "getFeaturesBatch"):
+            if batch is not None:
+                return self.getFeaturesBatch(stars, batch=batch)
+            return self.getFeaturesBatch(stars)
+
+        if getattr(self, "LC_NEEDED", False):
+            return [self.getFeatures(star) if star.lightCurve else self._getNoneFeatures()
+                    for star in stars]
+        return [self.getFeatures(star) for star in stars]
+
+    def _getNoneFeatures(self):
+        """Get features of a star which can not be processed"""
+        if hasattr(self, "LABEL"):
+            if not isinstance(self.LABEL, str) and hasattr(self.LABEL, "__iter__"):
+                return [self.NONE_VALUE for _ in self.LABEL]
+            return self.NONE_VALUE
+        return self.NONE_VALUE
+
+    def _toSpaceCoords(self, features, missing=None):
+        """
+        Convert features computed for the whole sample into the list
+        of coordinates as `getSpaceCoords` returns
+
+        Parameters
+        -----------
+        features : numpy.ndarray
+            Feature of each star (1D array) or features of each star
+            (2D array, one star per row)
+
+        missing : numpy.ndarray, NoneType
+            Mask of stars which can not be processed. Their features
+            are replaced by `_getNoneFeatures`
+
         Returns
         -------
         list
             List of coordinates
         """
-        if hasattr(self, "LC_NEEDED"):
-            lc_needed = self.LC_NEEDED
-        else:
-            lc_needed = False
-
-        space_coords = []
-        for star in stars:
-            if lc_needed:
-                if star.lightCurve:
-                    features = self.getFeatures(star)
-                else:
-                    if hasattr(self, "LABEL"):
-                        if hasattr(self.LABEL, "__iter__"):
-                            features = [self.NONE_VALUE for _ in self.LABEL]
-                        else:
-                            features = self.NONE_VALUE
-                    else:
-                        features = self.NONE_VALUE
-                space_coords.append(features)
-            else:
-                space_coords.append(self.getFeatures(star))
-        return space_coords
+        coords = np.asarray(features).tolist()
+        if missing is not None:
+            for i in np.flatnonzero(missing):
+                coords[i] = self._getNoneFeatures()
+        return coords
 
     # TODO: Check whether these lists contains object of Star class type
 
@@ -16,8 +16,14 @@ class ComparativeBase(abc.ABC):
     -----------
     compar_stars : list, iterable
         List of Star objects which represent searched group of star objects
+
+    BLOCK_SIZE : int
+        Default number of inspected stars compared with all templates
+        at once by `getDissimilarityMatrix`
     """
 
+    BLOCK_SIZE = 256
+
     def compareTwoStars(self, *args, **kwargs):
         raise NotImplemented()
 
@@ -50,37 +56,170 @@ class ComparativeBase(abc.ABC):
         list
             Difference in symbolic space of the investigated star from the template
         """
-        if hasattr(self, "meth"):
-            meth = self.meth
-        else:
-            meth = "average"
-
         coords = [x for x in self._filtOneStar(star, search_opt="all") if x is not None]
         logging.debug("Coords: %s" % coords)
 
+        meth = self._getMeth()
         if meth == "closest":
             return np.min(coords)
 
         elif meth == "average":
             return np.mean(coords)
 
-        elif meth.startswith("best"):
-            n = convert_input_value(meth[4:])
+        return np.mean(np.sort(coords)[:self._getBestN(len(coords))])
 
-            if isinstance(n, float):
-                n = int(len(coords)*n)
-
-            if isinstance(n, str):
-                n = 1
+    def getSpaceCoords(self, stars, block_size=None):
+        """
+        Get list of parameters coordinates according to descriptor
+        implementation. Dissimilarities of all stars are computed as one
+        matrix (see `getDissimilarityMatrix`) and reduced by `meth`.
 
-            if not meth:
-                raise QueryInputError("""Unresolved coordinates calculation method. String 'best' has to
-                be followed by integer or float number""")
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to process
 
-            return np.mean(np.sort(coords)[:n])
+        block_size : int, NoneType
+            Number of stars compared with all templates at once.
+            If None `BLOCK_SIZE` is used
 
+        Returns
+        -------
+        list
+            List of coordinates
+        """
+        if getattr(self, "LC_NEEDED", False):
+            indices = [i for i, star in enumerate(stars) if star.lightCurve]
         else:
+            indices = list(range(len(stars)))
+
+        coords = self._getCoords([stars[i] for i in indices], block_size)
+
+        space_coords = [self._getNoneFeatures() for _ in stars]
+        for i, coord in zip(indices, coords):
+            space_coords[i] = coord
+        return space_coords
+
+    def _getCoords(self, stars, block_size=None):
+        """Get coordinates of stars reduced from the dissimilarity matrix"""
+        return self._reduceDissimilarities(self.getDissimilarityMatrix(stars, block_size))
+
+    def getDissimilarityMatrix(self, stars, block_size=None):
+        """
+        Calculate dissimilarities of inspected stars and all template stars.
+        Stars are processed in blocks, so only `block_size` x number
+        of templates dissimilarities are computed at once.
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to compare with the templates
+
+        block_size : int, NoneType
+            Number of stars compared with all templates at once.
+            If None `BLOCK_SIZE` is used
+
+        Returns
+        --------
+        numpy.ndarray
+            Dissimilarities as N x M array (N is number of stars and M
+            number of templates). Pairs which can not be compared
+            (e.g. without light curves) are NaNs.
+        """
+        block_size = block_size or self.BLOCK_SIZE
+        matrix = np.full((len(stars), len(self.comp_stars)), np.nan)
+        for start in range(0, len(stars), block_size):
+            block = stars[start:start + block_size]
+            matrix[start:start + len(block)] = self._getDissimilarityBlock(block)
+        return matrix
+
+    def _getDissimilarityBlock(self, stars):
+        """
+        Calculate dissimilarities of the block of stars and all template stars
+
+        Parameters
+        -----------
+        stars : list of Star objects
+            Stars to compare with the templates
+
+        Returns
+        --------
+        numpy.ndarray
+            Dissimilarities as N x M array
+        """
+        block = np.full((len(stars), len(self.comp_stars)), np.nan)
+        for i, star in enumerate(stars):
+            for j, coord in enumerate(self._filtOneStar(star)):
+                if coord is not None:
+                    block[i, j] = coord
+        return block
+
+    def _reduceDissimilarities(self, matrix):
+        """
+        Reduce rows of dissimilarity matrix into coordinates by `meth`.
+        NaNs are ignored.
+
+        Parameters
+        -----------
+        matrix : numpy.ndarray
+            N x M dissimilarities
+
+        Returns
+        --------
+        numpy.ndarray
+            Coordinate for each row (NaN if there is no dissimilarity
+            in the row)
+        """
+        meth = self._getMeth()
+        valid = ~np.isnan(matrix)
+        counts = valid.sum(axis=1)
+        coords = np.full(len(matrix), np.nan)
+
+        if meth == "closest":
+            coords[counts > 0] = np.where(valid, matrix, np.inf).min(axis=1)[counts > 0]
+            return coords
+
+        elif meth == "average":
+            coords[counts > 0] = np.where(valid, matrix, 0).sum(axis=1)[counts > 0] / counts[counts > 0]
+            return coords
+
+        # Rows with the same number of dissimilarities take the same number of best ones
+        for count in np.unique(counts):
+            n = self._getBestN(count)
+            if n <= 0:
+                continue
+            rows = counts == count
+            values = np.where(valid[rows], matrix[rows], np.inf)
+            if n < values.shape[1]:
+                values = np.partition(values, n - 1, axis=1)[:, :n]
+            coords[rows] = np.sort(values, axis=1)[:, :n].mean(axis=1)
+        return coords
+
+    def _getMeth(self):
+        """Get validated method of reduction of dissimilarities"""
+        meth = getattr(self, "meth", "average")
+        if meth not in ("closest", "average") and not meth.startswith("best"):
             raise QueryInputError("Unresolved coordinates calculation method")
+        return meth
+
+    def _getBestN(self, n_coords):
+        """Get number of the best dissimilarities for 'best' method"""
+        n = convert_input_value(self._getMeth()[4:])
+
+        if isinstance(n, float):
+            n = int(n_coords * n)
+
+        if isinstance(n, str):
+            n = 1
+
+        if n is None:
+            n = n_coords
+
+        # Slicing semantics of the sorted dissimilarities
+        n = int(n)
+        if n < 0:
+            n += n_coords
+        return max(min(n, n_coords), 0)
 
     def _filtOneStar(self, star, *args, **kwargs):
         """
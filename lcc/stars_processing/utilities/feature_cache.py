@@ -0,0 +1,284 @@
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from lcc.entities.star import Star
+from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
+
+
+class FeatureCache(object):
+    """
+    Persistent cache of features of stars computed by descriptors. Features
+    are stored in SQLite database and they are keyed by the content hash
+    of the star (light curves, coordinates and `more` attributes) and
+    by the descriptor class with its constructor parameters. So features
+    are reused whenever the same descriptor is applied on unchanged star.
+
+    Descriptors which are fitted on a sample of stars (they override `fit`)
+    are not cached, because their features depend on the training sample.
+
+    When the size of cached features exceeds `max_size`, least recently
+    used features are evicted.
+
+    Attributes
+    ----------
+    path : str
+        Path to the database file
+
+    max_size : int
+        Maximal size of cached features in bytes
+
+    hits : int
+        Number of features found in the cache
+
+    misses : int
+        Number of features which had to be computed
+
+    evictions : int
+        Number of evicted features
+    """
+
+    DEFAULT_MAX_SIZE = 512 * 1024 ** 2
+
+    # Maximal number of keys in one SQL statement
+    CHUNK = 500
+
+    def __init__(self, path, max_size=None):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the database file. It is created if it doesn't exist
+
+        max_size : int, NoneType
+            Maximal size of cached features in bytes. If None
+            `DEFAULT_MAX_SIZE` is used
+        """
+        self.path = path
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_conn"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def getSpaceCoords(self, descriptor, stars):
+        """
+        Get coordinates of stars as `descriptor.getSpaceCoords` does. Only
+        features of stars which are not cached are computed by the descriptor.
+
+        Parameters
+        ----------
+        descriptor : descriptor object
+            Descriptor to compute features
+
+        stars : list of `Star` objects
+            Stars to process
+
+        Returns
+        -------
+        list
+            List of coordinates
+        """
+        descriptor_key = self.getDescriptorKey(descriptor)
+        if descriptor_key is None:
+            return descriptor.getSpaceCoords(stars)
+
+        keys = [descriptor_key + self.getStarKey(star) for star in stars]
+        cached = self._load(set(keys))
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        computed = {}
+        if missing:
+            coords = descriptor.getSpaceCoords([stars[i] for i in missing])
+            computed = {keys[i]: coo for i, coo in zip(missing, coords)}
+            self._store(computed)
+
+        return [cached[key] if key in cached else computed[key] for key in keys]
+
+    def getStatistics(self):
+        """
+        Returns
+        -------
+        dict
+            Numbers of hits, misses and evictions, number of cached
+            features ("entries") and their size in bytes ("size")
+        """
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM features").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": entries, "size": size}
+
+    def addStatistics(self, hits=0, misses=0, evictions=0):
+        """
+        Add counts of cache usage measured elsewhere (e.g. by a copy of
+        the cache in another process)
+
+        Parameters
+        ----------
+        hits : int
+            Number of features found in the cache
+
+        misses : int
+            Number of features which had to be computed
+
+        evictions : int
+            Number of evicted features
+        """
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def clear(self):
+        """Remove all cached features and reset statistics"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM features")
+            conn.commit()
+        self.hits = self.misses = self.evictions = 0
+
+    @classmethod
+    def getStarKey(cls, star):
+        """
+        Content hash of the star
+
+        Parameters
+        ----------
+        star : `Star` object
+            Star to hash
+
+        Returns
+        -------
+        str
+            Hex digest of the star's light curves and metadata
+        """
+        digest = hashlib.sha1()
+        more = sorted(star.more.items(), key=lambda item: str(item[0]))
+        digest.update(repr((star.name, star.ra, star.dec, star.starClass, more)).encode())
+        for lc in star.light_curves or []:
+            for arr in (lc.time, lc.mag, lc.err):
+                arr = np.ascontiguousarray(arr)
+                digest.update(arr.dtype.str.encode())
+                digest.update(arr.tobytes())
+            digest.update(repr(sorted(lc.meta.items(), key=lambda item: str(item[0]))).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def getDescriptorKey(cls, descriptor):
+        """
+        Hash of the descriptor class and its constructor parameters
+
+        Parameters
+        ----------
+        descriptor : descriptor object
+            Descriptor to hash
+
+        Returns
+        -------
+        str, NoneType
+            Hex digest of the descriptor or None if the descriptor
+            can not be cached
+        """
+        descriptor_cls = descriptor.__class__
+        fit = getattr(descriptor_cls, "fit", BaseDescriptor.fit)
+        if fit is not BaseDescriptor.fit:
+            return None
+
+        try:
+            names = [name for name in inspect.signature(descriptor_cls.__init__).parameters
+                     if name != "self"]
+        except (TypeError, ValueError):
+            names = []
+
+        params = [(name, cls._describe(getattr(descriptor, name, None))) for name in names]
+        return hashlib.sha1(repr((descriptor_cls.__module__, descriptor_cls.__name__,
+                                  params)).encode()).hexdigest()
+
+    @classmethod
+    def _describe(cls, value):
+        """Deterministic description of a value of descriptor's parameter"""
+        if isinstance(value, Star):
+            return "Star:" + cls.getStarKey(value)
+        if isinstance(value, (list, tuple)):
+            return [cls._describe(val) for val in value]
+        if isinstance(value, dict):
+            return sorted((str(key), cls._describe(val)) for key, val in value.items())
+        if isinstance(value, np.ndarray):
+            return "ndarray:" + hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return repr(value)
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS features "
+                               "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS features_accessed ON features (accessed)")
+            self._conn.commit()
+        return self._conn
+
+    def _load(self, keys):
+        """Load cached features of given keys and mark them as used"""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), self.CHUNK):
+                chunk = keys[start:start + self.CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute("SELECT key, value FROM features WHERE key IN (%s)" % marks,
+                                    chunk).fetchall()
+                found.update((key, pickle.loads(value)) for key, value in rows)
+                conn.execute("UPDATE features SET accessed = ? WHERE key IN (%s)" % marks,
+                             [time.time()] + chunk)
+            conn.commit()
+        return found
+
+    def _store(self, features):
+        """Store features and evict least recently used ones if needed"""
+        now = time.time()
+        rows = []
+        for key, value in features.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, len(blob), now))
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?)", rows)
+
+            excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM features").fetchone()[0] - self.max_size
+            if excess > 0:
+                evicted = []
+                for key, size in conn.execute("SELECT key, size FROM features ORDER BY accessed"):
+                    if excess <= 0:
+                        break
+                    evicted.append(key)
+                    excess -= size
+                conn.executemany("DELETE FROM features WHERE key = ?", [(key,) for key in evicted])
+                self.evictions += len(evicted)
+            conn.commit()
@@ -1,6 +1,9 @@
 
 
-from lcc.utils.data_analysis import to_PAA, normalize
+import functools
+
+from lcc.utils import kernels
+from lcc.utils.data_analysis import to_PAA, to_windows_PAA, normalize
 import numpy as np
 
 
@@ -11,6 +14,13 @@ class SAX(object):
     series of data to a words, which can then be compared with other
     such words in symbolic distance space.
 
+    Words are available as strings (letters from 'a') or integer-coded
+    as `numpy.uint8` arrays (letter indices from 0). Integer words are
+    compared by lookups into `distance_matrix`.
+
+    Transformations and comparisons do not modify the instance, so one
+    instance can be used from many threads at once.
+
     Attributes
     -----------
     word_size : int
@@ -25,6 +35,14 @@ class SAX(object):
 
     beta : list
         Breakpoints for given alphabets size
+
+    distance_matrix : numpy.ndarray
+        Distances of letters (alphabet_size x alphabet_size array)
+
+    ABANDON_BLOCK : int
+        Number of letters scored at once by `match_words` before
+        candidates which cannot beat the best score are abandoned
+        (NumPy backend of `lcc.utils.kernels` only)
     """
 
     MIN_ALPH_SIZE = 3
@@ -32,6 +50,8 @@ class SAX(object):
 
     A_OFFSET = ord('a')
 
+    ABANDON_BLOCK = 16
+
     def __init__(self, word_size=8, alphabet_size=10, scaling_factor=1):
         """
         Parameters
@@ -53,7 +73,8 @@ class SAX(object):
         self.word_size = word_size
         self.alphabet_size = alphabet_size
         self.beta = self._getBreakpoints()[str(int(self.alphabet_size))]
-        self.build_letter_compare_dict()
+        self.distance_matrix, self._squared_distances = _distanceMatrices(tuple(self.beta))
+        self._compare_dict = None
         self.scaling_factor = scaling_factor
 
     def to_letter_rep(self, x):
@@ -73,9 +94,70 @@ class SAX(object):
         list
             Indices
         """
+        word, indices = self.to_int_rep(x)
+        return self.word_to_str(word), indices
+
+    def to_int_rep(self, x):
+        """
+        Function takes a series of data, x, and transforms it
+        to an integer-coded word.
+
+        Parameters
+        ----------
+        x : list, iterable
+            Data series
+
+        Returns
+        -------
+        numpy.ndarray
+            SAX word as uint8 array of letter indices
+        list
+            Indices
+        """
         paaX, indices = to_PAA(normalize(x), self.word_size)
-        self.scaling_factor = np.sqrt(len(x) / self.word_size)
-        return self.alphabetize(paaX), indices
+        return self.alphabetize_int(paaX), indices
+
+    def to_int_windows(self, x, starts, window_len):
+        """
+        Transform windows of the data series into integer-coded words
+        at once. Each word is the same as `to_int_rep` of the window.
+
+        Parameters
+        ----------
+        x : list, iterable
+            Data series
+
+        starts : list, iterable
+            Start indices of windows
+
+        window_len : int
+            Number of values in each window
+
+        Returns
+        -------
+        numpy.ndarray
+            SAX words as uint8 array (one word per row)
+        """
+        paaX = to_windows_PAA(x, starts, window_len, self.word_size)
+        return self.alphabetize_int(paaX)
+
+    def get_scaling_factor(self, x_len):
+        """
+        Scaling factor for words of data series of given length.
+        Dissimilarities of words of data series of different lengths
+        are comparable after scaling by it.
+
+        Parameters
+        ----------
+        x_len : int
+            Number of values of the data series
+
+        Returns
+        -------
+        float
+            Scaling factor
+        """
+        return np.sqrt(x_len / self.word_size)
 
     def alphabetize(self, paaX):
         """
@@ -92,17 +174,25 @@ class SAX(object):
         str
             SAX word
         """
-        alphabetizedX = ''
-        for i in range(0, len(paaX)):
-            letterFound = False
-            for j in range(0, len(self.beta)):
-                if paaX[i] < self.beta[j]:
-                    alphabetizedX += chr(self.A_OFFSET + j)
-                    letterFound = True
-                    break
-            if not letterFound:
-                alphabetizedX += chr(self.A_OFFSET + len(self.beta))
-        return alphabetizedX
+        return self.word_to_str(self.alphabetize_int(paaX))
+
+    def alphabetize_int(self, paaX):
+        """
+        Converts the Piecewise Aggregate Approximation of x
+        to an integer-coded word. Letter of a value is the number
+        of breakpoints which are lower or equal to the value.
+
+        Parameters
+        ---------
+        paaX : list, iterable
+            Data series (list of numbers)
+
+        Returns
+        -------
+        numpy.ndarray
+            SAX word as uint8 array of letter indices
+        """
+        return np.searchsorted(self.beta, paaX, side="right").astype(np.uint8)
 
     def compare_strings(self, sA, sB):
         """
@@ -121,16 +211,151 @@ class SAX(object):
         float
             Dissimilarity of two words
         """
-        if len(sA) != len(sB):
+        return self.compare_words(self.str_to_word(sA), self.str_to_word(sB))
+
+    def compare_words(self, wA, wB):
+        """
+        Compares two integer-coded words based on individual
+        letter distances.
+
+        Parameters
+        ----------
+        wA : numpy.ndarray
+            Word to compare
+
+        wB : numpy.ndarray
+            Word to compare
+
+        Returns
+        -------
+        float
+            Dissimilarity of two words
+        """
+        if len(wA) != len(wB):
+            raise Exception("StringsAreDifferentLength")
+        mindist = np.sum(self._squared_distances[wA, wB])
+        return self.scaling_factor * np.sqrt(mindist)
+
+    def compare_words_matrix(self, wordsA, wordsB, scaling_factors=None):
+        """
+        Compares each of integer-coded words with each of other words.
+        Letters are accumulated one position at a time, so only
+        N x M distances are held in memory.
+
+        Parameters
+        ----------
+        wordsA : numpy.ndarray
+            N words of the same length (2D array, one word per row)
+
+        wordsB : numpy.ndarray
+            M words of the same length as `wordsA`
+
+        scaling_factors : numpy.ndarray, NoneType
+            Scaling factor for each of `wordsB`. If None `scaling_factor`
+            is used for all of them
+
+        Returns
+        -------
+        numpy.ndarray
+            N x M dissimilarities
+        """
+        wordsA, wordsB = np.asarray(wordsA), np.asarray(wordsB)
+        if wordsA.shape[1] != wordsB.shape[1]:
+            raise Exception("StringsAreDifferentLength")
+        if scaling_factors is None:
+            scaling_factors = self.scaling_factor
+
+        mindist = np.zeros((len(wordsA), len(wordsB)))
+        for i in range(wordsA.shape[1]):
+            mindist += self._squared_distances[wordsA[:, i, np.newaxis], wordsB[np.newaxis, :, i]]
+        return np.sqrt(mindist) * scaling_factors
+
+    def match_words(self, word, candidates, best_score=np.inf):
+        """
+        Find the candidate word which is the most similar to the word.
+        Candidates are scored by blocks of `ABANDON_BLOCK` letters at once
+        and candidates whose partial dissimilarity cannot beat the best
+        score are abandoned.
+
+        Parameters
+        ----------
+        word : numpy.ndarray
+            Integer-coded word
+
+        candidates : numpy.ndarray, list
+            Integer-coded words of the same length as `word`
+            (2D array, one word per row)
+
+        best_score : float
+            Only candidates with lower dissimilarity are considered
+
+        Returns
+        -------
+        float
+            Dissimilarity of the best candidate (`best_score` if there
+            is no better candidate)
+
+        int, NoneType
+            Index of the best candidate (the first one if more candidates
+            have the same dissimilarity) or None if there is no candidate
+            better than `best_score`
+        """
+        word = np.asarray(word)
+        candidates = np.asarray(candidates, dtype=np.uint8)
+        if candidates.ndim == 2 and candidates.size and candidates.shape[1] != len(word):
+            raise Exception("StringsAreDifferentLength")
+        try:
+            candidates = candidates.reshape(-1, len(word))
+        except ValueError:
+            raise Exception("StringsAreDifferentLength")
+        if not len(candidates):
+            return best_score, None
+
+        if self.scaling_factor > 0:
+            limit = (best_score / self.scaling_factor) ** 2
+        else:
+            limit = np.inf
+
+        partial, best = kernels.best_match(word, candidates, self._squared_distances,
+                                           limit, self.ABANDON_BLOCK)
+        if best < 0:
+            return best_score, None
+
+        score = self.scaling_factor * np.sqrt(partial)
+        if score < best_score:
+            return score, best
+        return best_score, None
+
+    def match_shifts(self, word, long_word, best_score=np.inf):
+        """
+        Slide the word across the longer word and find the shift with
+        the lowest dissimilarity (see `match_words`)
+
+        Parameters
+        ----------
+        word : numpy.ndarray
+            Integer-coded word
+
+        long_word : numpy.ndarray
+            Integer-coded word which is not shorter than `word`
+
+        best_score : float
+            Only shifts with lower dissimilarity are considered
+
+        Returns
+        -------
+        float
+            Dissimilarity of the best shift (`best_score` if there
+            is no better shift)
+
+        int, NoneType
+            Offset of the best shift in the longer word or None if there
+            is no shift better than `best_score`
+        """
+        if len(word) > len(long_word):
             raise Exception("StringsAreDifferentLength")
-        list_letters_a = [x for x in sA]
-        list_letters_b = [x for x in sB]
-        mindist = 0.0
-        for i in range(0, len(list_letters_a)):
-            mindist += self.compare_letters(
-                list_letters_a[i], list_letters_b[i])**2
-        mindist = self.scaling_factor * np.sqrt(mindist)
-        return mindist
+        windows = np.lib.stride_tricks.sliding_window_view(np.asarray(long_word), len(word))
+        return self.match_words(word, windows, best_score)
 
     def compare_letters(self, la, lb):
         """
@@ -160,18 +385,52 @@ class SAX(object):
         -------
             None
         """
-        number_rep = list(range(0, int(self.alphabet_size)))
-        letters = [chr(x + self.A_OFFSET) for x in number_rep]
-        self.compare_dict = {}
+        letters = [chr(x + self.A_OFFSET) for x in range(int(self.alphabet_size))]
+        # The table is published only when it is complete
+        compare_dict = {}
         for i in range(0, len(letters)):
             for j in range(0, len(letters)):
-                if np.abs(number_rep[i] - number_rep[j]) <= 1:
-                    self.compare_dict[letters[i] + letters[j]] = 0
-                else:
-                    high_num = np.max([number_rep[i], number_rep[j]]) - 1
-                    low_num = np.min([number_rep[i], number_rep[j]])
-                    self.compare_dict[
-                        letters[i] + letters[j]] = self.beta[high_num] - self.beta[low_num]
+                compare_dict[letters[i] + letters[j]] = self.distance_matrix[i, j]
+        self._compare_dict = compare_dict
+
+    @property
+    def compare_dict(self):
+        """Lookup table of letter distances (built on first access)"""
+        if self._compare_dict is None:
+            self.build_letter_compare_dict()
+        return self._compare_dict
+
+    def word_to_str(self, word):
+        """
+        Convert integer-coded word into string
+
+        Parameters
+        ----------
+        word : numpy.ndarray
+            SAX word as array of letter indices
+
+        Returns
+        -------
+        str
+            SAX word
+        """
+        return (np.asarray(word, dtype=np.uint8) + self.A_OFFSET).tobytes().decode("ascii")
+
+    def str_to_word(self, s):
+        """
+        Convert string into integer-coded word
+
+        Parameters
+        ----------
+        s : str
+            SAX word
+
+        Returns
+        -------
+        numpy.ndarray
+            SAX word as uint8 array of letter indices
+        """
+        return np.frombuffer(s.encode("ascii"), dtype=np.uint8) - np.uint8(self.A_OFFSET)
 
     def _sliding_window(self, x, window_size, overlapping_fraction=None):
         """
@@ -233,6 +492,27 @@ class SAX(object):
                 }
 
 
+@functools.lru_cache(maxsize=None)
+def _distanceMatrices(beta):
+    """
+    Distances of letters and their squares for given breakpoints
+    (read-only arrays shared by all `SAX` objects). Neighbouring letters
+    have zero distance, otherwise it is the distance of the nearest
+    breakpoints of the letters.
+    """
+    beta = np.array(beta, dtype=float)
+    letters = np.arange(len(beta) + 1)
+    high = np.maximum.outer(letters, letters)
+    low = np.minimum.outer(letters, letters)
+    dist = beta[np.maximum(high - 1, 0)] - beta[np.minimum(low, len(beta) - 1)]
+    dist[high - low <= 1] = 0
+
+    squared = dist ** 2
+    dist.setflags(write=False)
+    squared.setflags(write=False)
+    return dist, squared
+
+
 class DictionarySizeIsNotSupported(ValueError):
     pass
 
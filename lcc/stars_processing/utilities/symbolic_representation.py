@@ -1,17 +1,291 @@
 import abc
 import logging
+import threading
 
 import numpy as np
 
 from lcc.stars_processing.utilities.sax import SAX
+from lcc.stars_processing.utilities.template_index import TemplateIndex
 
 
 class SymbolicRepresentation(abc.ABC):
     """
     This common class for all descriptors based on symbolic representation
-    of data.
+    of data. Words are integer-coded (see `SAX.to_int_rep`).
+
+    Words of template stars are computed once (when templates are loaded)
+    and kept in a cache. The cache is invalidated when templates are loaded
+    again or when any of attributes listed in `WORD_PARAMS` changes. It has
+    to be invalidated manually (`invalidateWordCache`) after modification
+    of light curves of the templates.
+
+    Subclasses implement `getScaledWord` (descriptors which implement
+    only `getWord` are supported as well, see `getScaledWord`). Words are
+    computed with
+    a new `SAX` instance for each call and the descriptor is not modified
+    by comparisons, so one descriptor can be used from many threads at once.
+
+    If `use_index` attribute is True, coordinates of 'closest' and 'best'
+    methods are computed by `TemplateIndex` searches, which skip templates
+    that can not be among the best ones. The index is used for templates
+    whose words have the same length as the word of inspected star (it is
+    not used for sliding `getWords` comparison).
+
+    Attributes
+    -----------
+    WORD_PARAMS : tuple
+        Names of attributes which words depend on
+
+    index_stats : dict
+        Numbers of template comparisons done ("compared") and skipped
+        ("pruned") by index searches since templates were loaded
     """
 
+    WORD_PARAMS = ()
+
+    def loadCompStars(self, comp_stars):
+        """
+        Load comparative stars for the template sample and compute
+        their words
+
+        Parameters
+        ----------
+        comp_stars : list
+            Stars for the template
+
+        Returns
+        -------
+            None
+        """
+        super().loadCompStars(comp_stars)
+        self.invalidateWordCache()
+        self.index_stats = {"compared": 0, "pruned": 0}
+        self._stats_lock = threading.Lock()
+        for comp_star in self.comp_stars or []:
+            if comp_star.lightCurve:
+                self._getTemplateWord(comp_star)
+
+    def invalidateWordCache(self):
+        """Drop all cached words of the templates"""
+        self._word_cache = {}
+        self._word_cache_params = self._getWordParams()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_word_cache", None)
+        state.pop("_word_cache_params", None)
+        state.pop("_stats_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def getWord(self, star):
+        """
+        Parameters
+        -----------
+        star : `Star` instance
+            Star to process
+
+        Returns
+        --------
+        numpy.ndarray
+            Integer-coded SAX word of the star
+        """
+        return self.getScaledWord(star)[0]
+
+    def getScaledWord(self, star):
+        """
+        Subclasses should override this method. Otherwise the word got from
+        `getWord` (integer-coded or string) is used and it is scaled
+        by the number of values of the star's light curve.
+
+        Parameters
+        -----------
+        star : `Star` instance
+            Star to process
+
+        Returns
+        --------
+        numpy.ndarray
+            Integer-coded SAX word of the star
+
+        float
+            Scaling factor of the word (see `SAX.get_scaling_factor`)
+        """
+        if type(self).getWord is SymbolicRepresentation.getWord:
+            raise NotImplementedError("Descriptor has to implement getScaledWord or getWord")
+
+        word = self.getWord(star)
+        sax = SAX(max(len(word), 1), self.alphabet_size)
+        if isinstance(word, str):
+            word = sax.str_to_word(word)
+        return np.asarray(word, dtype=np.uint8), sax.get_scaling_factor(len(star.lightCurve.mag))
+
+    def _getWordParams(self):
+        return tuple(getattr(self, name, None) for name in self.WORD_PARAMS)
+
+    def _getCachedWord(self, comp_star, key, compute):
+        """
+        Get a value from the cache of template words. It is computed by
+        `compute` function if it is not cached.
+
+        Parameters
+        ----------
+        comp_star : `Star` instance, list
+            Template star (or list of templates for values of all of them)
+
+        key : tuple
+            Key of the value for the template
+
+        compute : callable
+            Function which computes the value
+
+        Returns
+        -------
+            Cached value
+        """
+        if getattr(self, "_word_cache_params", None) != self._getWordParams():
+            self.invalidateWordCache()
+
+        # Template is kept in the cache, so its id cannot be reused
+        key = (id(comp_star),) + key
+        entry = self._word_cache.get(key)
+        if entry is None or entry[0] is not comp_star:
+            entry = (comp_star, compute())
+            self._word_cache[key] = entry
+        return entry[1]
+
+    def _getTemplateWord(self, comp_star):
+        """
+        Get cached word of the template and the scaling factor of its SAX
+        """
+        return self._getCachedWord(comp_star, ("word",), lambda: self.getScaledWord(comp_star))
+
+    def _getTemplateIndex(self, word_len):
+        """
+        Get cached index of templates with words of given length
+
+        Returns
+        -------
+        TemplateIndex
+            Index of the templates
+
+        numpy.ndarray
+            Positions of the indexed templates in `comp_stars`
+        """
+        def compute():
+            positions, words, scaling_factors = [], [], []
+            for j, comp_star in enumerate(self.comp_stars):
+                if comp_star.lightCurve:
+                    word, scaling_factor = self._getTemplateWord(comp_star)
+                    if len(word) == word_len:
+                        positions.append(j)
+                        words.append(word)
+                        scaling_factors.append(scaling_factor)
+            index = TemplateIndex(words, scaling_factors, SAX(word_len, self.alphabet_size))
+            return index, np.array(positions, dtype=int)
+
+        return self._getCachedWord(self.comp_stars, ("index", word_len), compute)
+
+    def _getCoords(self, stars, block_size=None):
+        """
+        Get coordinates of stars. If `use_index` is True, the best templates
+        for 'closest' and 'best' methods are searched in the template index.
+        """
+        meth = self._getMeth()
+        if (not getattr(self, "use_index", False) or meth == "average" or
+                (self.slide and hasattr(self, "getWords"))):
+            return super()._getCoords(stars, block_size)
+
+        templates = [j for j, comp_star in enumerate(self.comp_stars) if comp_star.lightCurve]
+        coords = np.full(len(stars), np.nan)
+        if not templates:
+            return coords
+
+        k = 1 if meth == "closest" else self._getBestN(len(templates))
+        for i, star in enumerate(stars):
+            if not star.lightCurve or k <= 0:
+                continue
+            word = self.getScaledWord(star)[0]
+            index, positions = self._getTemplateIndex(len(word)) if len(word) else (None, [])
+
+            # Templates with words of other lengths are compared one by one
+            scores = []
+            for j in sorted(set(templates) - set(positions)):
+                comp_word, scaling_factor = self._getTemplateWord(self.comp_stars[j])
+                scores.append(self._compareWords(word, comp_word, scaling_factor, star,
+                                                 self.comp_stars[j]))
+
+            if index is not None and len(index):
+                best_score = np.sort(scores)[k - 1] if len(scores) >= k else np.inf
+                stats = {}
+                scores += index.query(word, k, best_score, stats)[0].tolist()
+                with self._stats_lock:
+                    for key, value in stats.items():
+                        self.index_stats[key] += value
+
+            coords[i] = np.mean(np.sort(scores)[:k])
+
+        logging.debug("Index stats: %s", self.index_stats)
+        return coords
+
+    def _compareWords(self, word, comp_word, scaling_factor, star, comp_star):
+        """Compare word of the star with the word of the template"""
+        sax = SAX(len(comp_word), self.alphabet_size, scaling_factor)
+        curve_len = max(len(star.lightCurve.mag), len(comp_star.lightCurve.mag))
+        return self._getDissmilarity(word, comp_word, curve_len, sax)
+
+    def _getSlideWords(self, comp_star, star):
+        """
+        Get the shorter word, words of windows of the longer light curve
+        (see `getWords`) and the scaling factor for their comparison.
+        Subclasses with `getWords` override it to get the scaling factor
+        of the shorter word, otherwise words are not scaled.
+        """
+        one_word, words = self.getWords(comp_star, star)
+        return one_word, words, 1
+
+    def _getDissimilarityBlock(self, stars):
+        """
+        Calculate dissimilarities of the block of stars and all templates.
+        Words of the stars are computed once and words of the same length
+        as template words are compared all at once.
+        """
+        if self.slide and hasattr(self, "getWords"):
+            return super()._getDissimilarityBlock(stars)
+
+        block = np.full((len(stars), len(self.comp_stars)), np.nan)
+        templates = [j for j, comp_star in enumerate(self.comp_stars) if comp_star.lightCurve]
+        rows = [i for i, star in enumerate(stars) if star.lightCurve]
+        if not templates or not rows:
+            return block
+
+        comp_words, scaling_factors = zip(*[self._getTemplateWord(self.comp_stars[j]) for j in templates])
+        words = [self.getScaledWord(stars[i])[0] for i in rows]
+
+        comp_lengths = np.array([len(word) for word in comp_words])
+        lengths = np.array([len(word) for word in words])
+        sax = SAX(1, self.alphabet_size)
+        for length in np.intersect1d(comp_lengths, lengths):
+            if not length:
+                continue
+            same_i = np.flatnonzero(lengths == length)
+            same_j = np.flatnonzero(comp_lengths == length)
+            dissims = sax.compare_words_matrix(np.array([words[i] for i in same_i]),
+                                               np.array([comp_words[j] for j in same_j]),
+                                               np.array([scaling_factors[j] for j in same_j]))
+            block[np.ix_(np.array(rows)[same_i], np.array(templates)[same_j])] = dissims
+
+        # Words of different lengths are compared pair by pair
+        for i, word in zip(rows, words):
+            for j, comp_word, scaling_factor in zip(templates, comp_words, scaling_factors):
+                if len(word) != len(comp_word) or not len(word):
+                    block[i, j] = self._compareWords(word, comp_word, scaling_factor,
+                                                     stars[i], self.comp_stars[j])
+        return block
+
     def compareTwoStars(self, star, comp_star):
         """
         Compare two stars according to a filter implementation
@@ -33,44 +307,41 @@ class SymbolicRepresentation(abc.ABC):
             [len(star.lightCurve.mag), len(comp_star.lightCurve.mag)])
 
         if not self.slide or not hasattr(self, "getWords"):
-            inspected_word = self.getWord(star)
-            comp_word = self.getWord(comp_star)
-            logging.debug("Comparing {0} and {1}".format(inspected_word, comp_word))
-            score = self._getDissmilarity(inspected_word, comp_word, curve_len)
+            inspected_word = self.getScaledWord(star)[0]
+            comp_word, scaling_factor = self._getTemplateWord(comp_star)
+            sax = SAX(len(comp_word), self.alphabet_size, scaling_factor)
+            logging.debug("Comparing %s and %s", inspected_word, comp_word)
+            score = self._getDissmilarity(inspected_word, comp_word, curve_len, sax)
 
         else:
-            one_word, words = self.getWords(comp_star, star)
-            logging.debug("Comparing {0} and {1}".format(one_word, words))
-            score = self._getDissmilaritySlide(one_word, words)
+            one_word, words, scaling_factor = self._getSlideWords(comp_star, star)
+            sax = SAX(len(one_word), self.alphabet_size, scaling_factor)
+            logging.debug("Comparing %s and %s", one_word, words)
+            score = self._getDissmilaritySlide(one_word, words, sax)
 
-        logging.debug("Score is {}".format(score))
+        logging.debug("Score is %s", score)
         return score
 
     def _getWord(self, x, word_size, alphabet_size):
-        self.sax = SAX(word_size, alphabet_size)
-        return self.sax.to_letter_rep(x)[0]
+        """Get integer-coded word of the data series and its scaling factor"""
+        sax = SAX(word_size, alphabet_size)
+        return sax.to_int_rep(x)[0], sax.get_scaling_factor(len(x))
 
-    def _getDissmilaritySlide(self, sliding_word, words):
+    def _getDissmilaritySlide(self, sliding_word, words, sax):
         """
         This method go through string curve of a star and trying to match filter
         sentence pattern.
         """
-        best_score = 1e9
-        for word in words:
-            score = self.sax.compare_strings(word, sliding_word)
-            if score < best_score:
-                best_score = score
-        return best_score
+        return sax.match_words(sliding_word, words, best_score=1e9)[0]
 
-    def _getDissmilarity(self, inspected_word, filter_word, curve_len):
+    def _getDissmilarity(self, inspected_word, filter_word, curve_len, sax):
         """
         This method go through string curve of a star and trying to match filter
         sentence pattern.
         """
-        if not inspected_word or not filter_word:
+        if not len(inspected_word) or not len(filter_word):
             raise Exception("There are no words for comparing")
 
-        shift = 0
         # Case of shorter filter word then star word
         if len(filter_word) < len(inspected_word):
             word_a = filter_word
@@ -79,16 +350,7 @@ class SymbolicRepresentation(abc.ABC):
             word_b = filter_word
             word_a = inspected_word
 
-        a_word_size = len(word_a)
-        b_word_size = len(word_b)
         # Shift shorter word through longer word and look for match
-        best_score = 1e9
-        while a_word_size + shift <= b_word_size:
-            word = word_b[shift:shift + a_word_size]
-            score = self.sax.compare_strings(word, word_a)
-            if score < best_score:
-                best_score = score
-            shift += 1
-            if not self.slide:
-                break
-        return best_score
+        if not self.slide:
+            word_b = word_b[:len(word_a)]
+        return sax.match_shifts(word_a, word_b, best_score=1e9)[0]
@@ -0,0 +1,186 @@
+import threading
+
+import numpy as np
+
+
+class TemplateIndex(object):
+    """
+    Index over integer-coded SAX words of templates for exact search of
+    the most similar templates. Templates are split into leaves of similar
+    words and each leaf keeps the lowest and the highest letter at each
+    position of its words. Distance of a word from these letter ranges is
+    a lower bound (MINDIST) of its dissimilarity from all templates
+    of the leaf, so leaves which can not contain any of the best templates
+    are skipped.
+
+    Attributes
+    -----------
+    words : numpy.ndarray
+        Words of the templates (M x L array)
+
+    scaling_factors : numpy.ndarray
+        Scaling factor of each template
+
+    compared : int
+        Number of templates compared with queried words so far
+
+    pruned : int
+        Number of templates skipped by the lower bound so far
+
+    LEAF_SIZE : int
+        Default maximal number of templates in a leaf
+
+    LEAF_CHUNK : int
+        Number of leaves scored at once before the bound is updated
+    """
+
+    LEAF_SIZE = 16
+    LEAF_CHUNK = 4
+
+    def __init__(self, words, scaling_factors, sax, leaf_size=None):
+        """
+        Parameters
+        -----------
+        words : numpy.ndarray, list
+            Integer-coded words of the same length
+
+        scaling_factors : numpy.ndarray, list
+            Scaling factor of each template
+
+        sax : `SAX` instance
+            SAX with the alphabet of the words
+
+        leaf_size : int, NoneType
+            Maximal number of templates in leaves. If None `LEAF_SIZE`
+            is used
+        """
+        self.words = np.asarray(words, dtype=np.uint8).reshape(len(words), -1)
+        self.scaling_factors = np.asarray(scaling_factors, dtype=float)
+        self.sax = sax
+        self.leaf_size = leaf_size or self.LEAF_SIZE
+        self.compared = 0
+        self.pruned = 0
+        self._stats_lock = threading.Lock()
+
+        self._leaves = []
+        if len(self.words):
+            self._split(np.arange(len(self.words)))
+        self._lo = np.array([self.words[leaf].min(axis=0) for leaf in self._leaves], dtype=np.uint8)
+        self._hi = np.array([self.words[leaf].max(axis=0) for leaf in self._leaves], dtype=np.uint8)
+        self._min_scaling = np.array([self.scaling_factors[leaf].min() for leaf in self._leaves])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_stats_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def query(self, word, k=1, best_score=np.inf, stats=None):
+        """
+        Find `k` templates with the lowest dissimilarity from the word
+
+        Parameters
+        -----------
+        word : numpy.ndarray
+            Integer-coded word of the same length as words of the templates
+
+        k : int
+            Number of templates to find
+
+        best_score : float
+            Only templates with lower dissimilarity are searched for
+
+        stats : dict, NoneType
+            If a dict, numbers of templates compared ("compared") and
+            skipped ("pruned") by this query are stored in it
+
+        Returns
+        --------
+        numpy.ndarray
+            Dissimilarities of found templates in ascending order
+
+        numpy.ndarray
+            Indices of found templates
+        """
+        word = np.asarray(word)
+        if len(word) != self.words.shape[1]:
+            raise Exception("StringsAreDifferentLength")
+        if not len(self.words) or k <= 0:
+            return np.zeros(0), np.zeros(0, dtype=int)
+
+        bounds = self.getLowerBounds(word)
+        order = np.argsort(bounds, kind="stable")
+
+        limit = best_score
+        scores, indices = np.zeros(0), np.zeros(0, dtype=int)
+        for pos in range(0, len(order), self.LEAF_CHUNK):
+            chunk = order[pos:pos + self.LEAF_CHUNK]
+            chunk = chunk[bounds[chunk] < limit]
+            if not len(chunk):
+                break
+
+            members = np.concatenate([self._leaves[leaf] for leaf in chunk])
+            squared = self.sax._squared_distances[self.words[members], word].sum(axis=1)
+            scores = np.concatenate([scores, self.scaling_factors[members] * np.sqrt(squared)])
+            indices = np.concatenate([indices, members])
+
+            if len(scores) >= k:
+                limit = min(best_score, np.partition(scores, k - 1)[k - 1])
+
+        with self._stats_lock:
+            self.compared += len(scores)
+            self.pruned += len(self.words) - len(scores)
+        if stats is not None:
+            stats.update(compared=len(scores), pruned=len(self.words) - len(scores))
+
+        passed = scores < best_score
+        scores, indices = scores[passed], indices[passed]
+        best = np.argsort(scores, kind="stable")[:k]
+        return scores[best], indices[best]
+
+    def getLowerBounds(self, word):
+        """
+        Lower bounds of dissimilarity of the word from templates of each
+        leaf. Letter distances grow with letter difference, so distance
+        from the nearest end of the letter range can not be greater than
+        distance from any letter in the range.
+
+        Parameters
+        -----------
+        word : numpy.ndarray
+            Integer-coded word
+
+        Returns
+        --------
+        numpy.ndarray
+            Lower bound for each leaf
+        """
+        nearest = np.clip(word, self._lo, self._hi)
+        squared = self.sax._squared_distances[word, nearest].sum(axis=1)
+        return self._min_scaling * np.sqrt(squared)
+
+    def _split(self, indices):
+        """
+        Split templates into leaves. Templates are recursively split
+        at the median letter of the position with the widest letter range.
+        """
+        words = self.words[indices]
+        spread = words.max(axis=0).astype(int) - words.min(axis=0)
+        if len(indices) <= self.leaf_size or not spread.any():
+            self._leaves.append(indices)
+            return
+
+        letters = words[:, np.argmax(spread)]
+        median = np.median(letters)
+        left = letters <= median
+        if left.all():
+            left = letters < median
+
+        self._split(indices[left])
+        self._split(indices[~left])
@@ -2,10 +2,7 @@
 There are common functions and decorators mainly for query classes
 """
 import functools
-<<<<<<< HEAD
-=======
 import logging
->>>>>>> 712d124... Proxy requests to prevent blacklisting
 import random
 from functools import wraps
 
@@ -10,6 +10,8 @@ import warnings
 
 import numpy as np
 
+from lcc.utils import kernels
+
 
 def to_PAA(x, bins):
     """
@@ -35,20 +37,81 @@ def to_PAA(x, bins):
         Indices
     """
 
+    x = np.asarray(x)
     n = len(x)
     stepFloat = n / float(bins)
     step = int(math.ceil(stepFloat))
-    frameStart = 0
-    approximation = []
-    indices = []
-    i = 0
-    while frameStart <= n - step:
-        thisFrame = np.array(x[frameStart:int(frameStart + step)])
-        approximation.append(np.mean(thisFrame))
-        indices.append((frameStart, int(frameStart + step)))
-        i += 1
-        frameStart = int(i * stepFloat)
-    return np.array(approximation), indices
+    if step < 1 or n < step:
+        return np.array([]), []
+
+    # Frames start at int(i * stepFloat) as long as whole frame fits in x
+    starts = (np.arange(bins + 2) * stepFloat).astype(int)
+    starts = starts[starts <= n - step]
+
+    frames = np.lib.stride_tricks.sliding_window_view(x, step)[starts]
+    indices = [(start, start + step) for start in starts.tolist()]
+    return frames.mean(axis=1), indices
+
+
+def to_windows_PAA(x, starts, window_len, bins, eps=1e-6):
+    """
+    Piecewise Aggregate Approximation of normalized windows of the data
+    series. The result is the same as `to_PAA(normalize(window), bins)`
+    for each window, but means and standard deviations of all windows
+    and their frames are computed from prefix sums of x and x**2, so
+    the cost does not depend on the length of windows.
+
+    Parameters
+    ----------
+    x : list, array, iterable
+        1D serie of values
+
+    starts : list, array, iterable
+        Start indices of windows
+
+    window_len : int
+        Number of values in each window
+
+    bins : int
+        Dimension of reduced data of each window
+
+    eps : float
+        Windows with lower standard deviation are normalized to zeros
+
+    Returns
+    -------
+    numpy.array
+        Approximated windows (one window per row)
+    """
+    x = np.asarray(x, dtype=float)
+    starts = np.asarray(starts, dtype=int)
+
+    # Frames of the window are placed as in `to_PAA`
+    stepFloat = window_len / float(bins)
+    step = int(math.ceil(stepFloat))
+    if step < 1 or window_len < step or not len(starts):
+        return np.zeros((len(starts), 0))
+
+    offsets = (np.arange(bins + 2) * stepFloat).astype(int)
+    offsets = offsets[offsets <= window_len - step]
+
+    # Centering keeps the prefix sums small, so they do not lose precision
+    x = x - x.mean()
+    sums = np.concatenate([[0.], np.cumsum(x)])
+    squares = np.concatenate([[0.], np.cumsum(x ** 2)])
+
+    means = (sums[starts + window_len] - sums[starts]) / window_len
+    variances = (squares[starts + window_len] - squares[starts]) / window_len - means ** 2
+    stds = np.sqrt(np.maximum(variances, 0))
+
+    frame_starts = starts[:, np.newaxis] + offsets
+    frames = (sums[frame_starts + step] - sums[frame_starts]) / step
+
+    flat = stds < eps
+    stds[flat] = 1
+    paa = (frames - means[:, np.newaxis]) / stds[:, np.newaxis]
+    paa[flat] = 0
+    return paa
 
 
 def to_ekvi_PAA(x, y, bins=None, days_per_bin=None, max_bins=None,
@@ -86,16 +149,15 @@ def to_ekvi_PAA(x, y, bins=None, days_per_bin=None, max_bins=None,
     if 0 < bins <= 1:
         bins = int(len(x) * bins)
 
-    if isinstance(x, list):
-        x = np.array(x)
-        y = np.array(y)
+    x = np.asarray(x)
+    y = np.asarray(y)
 
     if not days_per_bin:
         if not bins:
             bins = len(x)
 
     else:
-        bins = (x[-1] - x[0]) / days_per_bin
+        bins = int((x[-1] - x[0]) / days_per_bin)
 
         if bins > len(x):
             bins = len(x)
@@ -114,23 +176,29 @@ def to_ekvi_PAA(x, y, bins=None, days_per_bin=None, max_bins=None,
     xmax = x.max()
     xmin = x.min()
     half_step = (xmax - xmin) / bins / 2.
-    x_aprox = []
-    y_aprox = []
-    borders = np.linspace(xmin - half_step, xmax + half_step, bins + 1).tolist()
-    for i in range(len(borders) - 1):
-        indx = (x >= borders[i]) & (x < borders[i + 1])
-        if indx.any():
-            if mean_time:
-                x_aprox.append(x[indx].mean())
-            else:
-                x_aprox.append((borders[i + 1] + borders[i]) / 2)
-            y_aprox.append(y[indx].mean())
+    borders = np.linspace(xmin - half_step, xmax + half_step, bins + 1)
+
+    # Index of bin for each value (borders[i] <= x < borders[i + 1]),
+    # values out of borders are dropped
+    indx = np.searchsorted(borders, x, side="right") - 1
+    inside = (indx >= 0) & (indx < bins)
+    indx = indx[inside]
+
+    counts = np.bincount(indx, minlength=bins)
+    centers = (borders[1:] + borders[:-1]) / 2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_aprox = np.bincount(indx, weights=y[inside], minlength=bins) / counts
+        if mean_time:
+            x_aprox = np.bincount(indx, weights=x[inside], minlength=bins) / counts
         else:
-            x_aprox.append((borders[i + 1] + borders[i]) / 2)
-            y_aprox.append(np.nan)
+            x_aprox = centers
+
+    empty = counts == 0
+    x_aprox = np.where(empty, centers, x_aprox)
+    y_aprox[empty] = np.nan
 
-    x, y = np.array(x_aprox), np.array(y_aprox)
-    # assert not np.isnan(y_aprox).any()
+    x, y = x_aprox, y_aprox
     if fix_nans:
         x, y = fix_missing(x, y)
 
@@ -159,9 +227,10 @@ def normalize(x, eps=1e-6):
     """
 
     X = np.asanyarray(x)
-    if X.std() < eps:
+    std = X.std()
+    if std < eps:
         return [0 for _ in X]
-    return (X - X.mean()) / X.std()
+    return (X - X.mean()) / std
 
 
 def abbe(x, n, dropna=True):
@@ -193,7 +262,7 @@ def abbe(x, n, dropna=True):
     return n / (2 * (n - 1.0)) * sum1 / sum2
 
 
-def variogram(x, y, bins=None, log_opt=True):
+def variogram(x, y, bins=None, log_opt=True, chunk_size=4000000):
     """
     Variogram of function shows variability of function in various time steps
 
@@ -211,6 +280,11 @@ def variogram(x, y, bins=None, log_opt=True):
     log_opt : bool
         Option if variogram values return in logarithm values
 
+    chunk_size : int
+        Maximal number of pairs of values kept in memory at once. If there
+        are more pairs, variogram is accumulated in lag bins chunk by chunk
+        (bins contain approximately equal number of pairs)
+
     Returns
     -------
     tuple
@@ -221,31 +295,62 @@ def variogram(x, y, bins=None, log_opt=True):
 
     x = to_PAA(x, bins)[0]
     y = to_PAA(y, bins)[0]
-    sort_opt = True
+
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x, y = x[valid], y[valid]
     n = len(x)
-    vario_x = []
-    vario_y = []
-    for i in range(n):
-        for j in range(n):
-            if i != j and not np.isnan(x[i]) and not np.isnan(y[i]):
-                x_val = abs(x[i] - x[j])
-                y_val = (y[i] - y[j])**2
-
-                if not np.isnan(x_val) and not np.isnan(y_val):
-                    vario_x.append(x_val)
-                    vario_y.append(y_val)
-    vario_x, vario_y = np.array(vario_x), np.array(vario_y)
-
-    if sort_opt:
-        vario_x, vario_y = sort_pairs(vario_x, vario_y)
-    vario_x = to_PAA(vario_x, bins)[0]
-    vario_y = to_PAA(vario_y, bins)[0]
+
+    if n * (n - 1) <= chunk_size:
+        vario_x, vario_y = _variogram_pairs(x, y, bins)
+    else:
+        vario_x, vario_y = _variogram_lag_bins(x, y, bins, chunk_size)
 
     if log_opt:
         vario_x, vario_y = np.log10(vario_x), np.log10(vario_y)
     return vario_x, vario_y
 
 
+def _variogram_pairs(x, y, bins):
+    """
+    Variogram from all pairs of values sorted by their time lags
+    and reduced by PAA
+    """
+    i, j = np.triu_indices(len(x), k=1)
+    vario_x = np.abs(x[i] - x[j])
+    vario_y = (y[i] - y[j])**2
+
+    indx = vario_x.argsort(kind="mergesort")
+
+    # Each pair is taken in both orders
+    vario_x = np.repeat(vario_x[indx], 2)
+    vario_y = np.repeat(vario_y[indx], 2)
+
+    return to_PAA(vario_x, bins)[0], to_PAA(vario_y, bins)[0]
+
+
+def _variogram_lag_bins(x, y, bins, chunk_size, fine_bins_ratio=64):
+    """
+    Variogram accumulated in lag bins without keeping all pairs of values
+    in memory. Borders of lag bins are quantiles of lags estimated from
+    fine histogram of lags, so each bin contains about the same number
+    of pairs (as PAA of sorted pairs does).
+    """
+    max_lag = x.max() - x.min()
+    fine_bins = bins * fine_bins_ratio
+    fine_borders = np.linspace(0, max_lag, fine_bins + 1)
+
+    fine_counts = kernels.lag_bin_sums(x, y, fine_borders[1:-1], chunk_size)[2]
+
+    cum_counts = np.concatenate([[0], np.cumsum(fine_counts)])
+    targets = np.arange(1, bins) * cum_counts[-1] / bins
+    borders = np.interp(targets, cum_counts, fine_borders)
+
+    sum_x, sum_y, counts = kernels.lag_bin_sums(x, y, borders, chunk_size)
+
+    filled = counts > 0
+    return sum_x[filled] / counts[filled], sum_y[filled] / counts[filled]
+
+
 def histogram(xx, yy, bins_num=None, centred=True, normed=True):
     """
     Parameters
@@ -270,6 +375,38 @@ def histogram(xx, yy, bins_num=None, centred=True, normed=True):
     numpy.array
         Number of values in particular ranges
 
+    numpy.array
+        Ranges
+    """
+    # Fix light curve length in case of non-equidistant time steps
+    # between observations
+    return values_histogram(to_ekvi_PAA(xx, yy, bins=len(xx))[1], bins_num, centred, normed)
+
+
+def values_histogram(x, bins_num=None, centred=True, normed=True):
+    """
+    Histogram of values which were already reduced into equidistant
+    time steps (see `histogram`)
+
+    Parameters
+    ----------
+    x : numpy.array
+        Input data (NaN values are ignored)
+
+    bins_num : int
+        Number of values in histogram
+
+    centred : bool
+        If True values will be shifted (mean value into the zero)
+
+    normed : bool
+        If True values will be normed (according to standard deviation)
+
+    Returns
+    -------
+    numpy.array
+        Number of values in particular ranges
+
     numpy.array
         Ranges
     """
@@ -278,9 +415,6 @@ def histogram(xx, yy, bins_num=None, centred=True, normed=True):
             "Number of bins of histogram was not specified. Setting default value.")
         bins_num = 10
 
-    # Fix light curve length in case of non-equidistant time steps
-    # between observations
-    x = to_ekvi_PAA(xx, yy, bins=len(xx))[1]
     # Center values to zero
     if centred:
         x = x - np.nanmean(x)
@@ -350,65 +484,54 @@ def computePrecision(true_pos, false_pos):
     return 0
 
 
-# TODO: Distribute to multiple functions
-def fix_missing(x, y, max_iter=1000, replace_at_borders=True):
-    x, y = x.copy(), y.copy()
-    n_to = len(x)
-    start_from = 0
-    deleted_n = 0
-    first = 0
-    for cc in range(max_iter):
-        if n_to == start_from:
-            break
+def fix_missing(x, y, max_iter=None, replace_at_borders=True):
+    """
+    Fill missing (NaN) values of `y` by linear interpolation between
+    the nearest known neighbours according to `x`
 
-        else:
-            substitute_pos = None
-            for ii in range(start_from, n_to):
-                i = ii - deleted_n
-                if substitute_pos is None:
-                    if np.isnan(y[i]):
-                        if i == first:
-                            if replace_at_borders:
-                                replace_with = None
-                                for sent_i in range(i, n_to):
-                                    if not np.isnan(y[sent_i]):
-                                        replace_with = y[sent_i]
-                                        break
-                                if replace_with is not None:
-                                    y[first:sent_i] = replace_with
-
-
-                            else:
-                                x = np.delete(x, i)
-                                y = np.delete(y, i)
-                                first = i
-                                deleted_n += 1
-                        else:
-                            substitute_pos = i
-                    else:
-                        start_from = i + 1
-
-                elif not np.isnan(y[i]):
-
-                    time_to_left = x[substitute_pos] - x[substitute_pos - 1]
-                    time_to_right = x[i] - x[substitute_pos]
-
-                    w_left = time_to_left / (time_to_left + time_to_right)
-                    w_right = time_to_right / (time_to_left + time_to_right)
-
-                    y[substitute_pos] = w_left * y[substitute_pos - 1] + w_right * y[i]
-
-                    start_from = substitute_pos + 1
-                    substitute_pos = None
-                    break
-
-            if substitute_pos:
-                if not replace_at_borders:
-                    x = x[:substitute_pos]
-                    y = y[:substitute_pos]
-                else:
-                    y[substitute_pos:] = y[substitute_pos - 1]
-                break
+    Parameters
+    ----------
+    x : numpy.array
+        Increasing times
+
+    y : numpy.array
+        Values with missing values
+
+    max_iter : NoneType
+        Deprecated, all gaps are filled in one pass
+
+    replace_at_borders : bool
+        If True missing values at the beginning (end) are replaced by
+        the first (last) known value, otherwise they are dropped
+
+    Returns
+    -------
+    numpy.array
+        Times
+
+    numpy.array
+        Values without missing values
+    """
+    x, y = np.array(x), np.array(y)
+    missing = np.isnan(y)
+
+    if not missing.any():
+        return x, y
+
+    known = np.flatnonzero(~missing)
+    if not len(known):
+        if replace_at_borders:
+            return x, y
+        return x[:0], y[:0]
+
+    if not replace_at_borders:
+        x = x[known[0]:known[-1] + 1]
+        y = y[known[0]:known[-1] + 1]
+        missing = missing[known[0]:known[-1] + 1]
+        known = known - known[0]
+
+    # Values out of known range are replaced by border values
+    y[missing] = np.interp(x[missing], x[known], y[known])
     return x, y
 
 
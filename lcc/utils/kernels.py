@@ -0,0 +1,204 @@
+"""
+There are kernels of hot loops of data processing. They are compiled by
+numba if it is installed, otherwise pure NumPy implementations are used.
+The backend is selected at import time, NumPy backend can be forced by
+setting `LCC_KERNELS` environment variable to "numpy".
+
+Both backends give the same results (up to rounding of sums).
+"""
+
+import os
+
+import numpy as np
+
+try:
+    if os.environ.get("LCC_KERNELS", "").lower() == "numpy":
+        raise ImportError("NumPy kernels are forced")
+    import numba
+except ImportError:
+    numba = None
+
+
+def _best_match_numpy(word, candidates, squared_distances, limit, block):
+    """
+    Candidates are scored by blocks of letters at once and candidates whose
+    partial sum of squared letter distances exceeds the limit are abandoned
+    """
+    n = len(candidates)
+    alive = np.arange(n)
+    partial = np.zeros(n)
+    blocks = [slice(start, start + block) for start in range(0, len(word), block)]
+
+    for i, blk in enumerate(blocks):
+        partial += squared_distances[candidates[alive, blk], word[blk]].sum(axis=1)
+
+        if i == 0 and len(blocks) > 1:
+            # Complete the most promising candidate to get a bound
+            best = np.argmin(partial)
+            total = partial[best] + sum(
+                squared_distances[candidates[alive[best], rest], word[rest]].sum()
+                for rest in blocks[1:])
+            limit = min(limit, total * (1 + 1e-9))
+
+        keep = partial <= limit
+        if not keep.all():
+            alive, partial = alive[keep], partial[keep]
+            if not len(alive):
+                return np.inf, -1
+
+    best = np.argmin(partial)
+    return partial[best], int(alive[best])
+
+
+def _lag_bin_sums_numpy(x, y, borders, chunk_size):
+    """
+    Pairs of values are generated in chunks of at most `chunk_size` pairs
+    """
+    bins = len(borders) + 1
+    sum_x = np.zeros(bins)
+    sum_y = np.zeros(bins)
+    counts = np.zeros(bins)
+
+    n = len(x)
+    rows = max(1, int(chunk_size // n))
+    for fr in range(0, n - 1, rows):
+        to = min(fr + rows, n - 1)
+        i, j = np.nonzero(np.arange(fr, to)[:, None] < np.arange(n)[None, :])
+        i += fr
+        lags, diffs = np.abs(x[i] - x[j]), (y[i] - y[j])**2
+
+        indx = np.searchsorted(borders, lags, side="right")
+        sum_x += np.bincount(indx, weights=lags, minlength=bins)
+        sum_y += np.bincount(indx, weights=diffs, minlength=bins)
+        counts += np.bincount(indx, minlength=bins)
+    return sum_x, sum_y, counts
+
+
+def _best_match_loops(word, candidates, squared_distances, limit, block):
+    """
+    Candidates are scored letter by letter and abandoned as soon as their
+    partial sum of squared letter distances exceeds the limit
+    """
+    best_total = np.inf
+    best = -1
+    for c in range(candidates.shape[0]):
+        total = 0.
+        for i in range(len(word)):
+            total += squared_distances[candidates[c, i], word[i]]
+            if total > limit:
+                break
+        else:
+            if total < best_total:
+                best_total = total
+                best = c
+                limit = min(limit, total)
+    return best_total, best
+
+
+def _lag_bin_sums_loops(x, y, borders, chunk_size):
+    """
+    Pairs of values are visited one by one, so they are not kept in memory
+    """
+    bins = len(borders) + 1
+    sum_x = np.zeros(bins)
+    sum_y = np.zeros(bins)
+    counts = np.zeros(bins)
+
+    n = len(x)
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            lag = abs(x[i] - x[j])
+            k = np.searchsorted(borders, lag, side="right")
+            sum_x[k] += lag
+            sum_y[k] += (y[i] - y[j])**2
+            counts[k] += 1
+    return sum_x, sum_y, counts
+
+
+NUMPY_KERNELS = {"best_match": _best_match_numpy,
+                 "lag_bin_sums": _lag_bin_sums_numpy}
+
+if numba is not None:
+    NUMBA_KERNELS = {"best_match": numba.njit(cache=True)(_best_match_loops),
+                     "lag_bin_sums": numba.njit(cache=True)(_lag_bin_sums_loops)}
+    BACKEND = "numba"
+else:
+    NUMBA_KERNELS = {}
+    BACKEND = "numpy"
+
+KERNELS = NUMBA_KERNELS or NUMPY_KERNELS
+
+
+def best_match(word, candidates, squared_distances, limit=np.inf, block=16):
+    """
+    Find the candidate word with the lowest sum of squared letter distances
+    from the word
+
+    Parameters
+    ----------
+    word : numpy.ndarray
+        Integer-coded word
+
+    candidates : numpy.ndarray
+        Integer-coded words of the same length as `word`
+        (2D array, one word per row)
+
+    squared_distances : numpy.ndarray
+        Squared distances of letters
+
+    limit : float
+        Only candidates with lower or equal sum are considered
+
+    block : int
+        Number of letters scored at once by NumPy backend before
+        candidates which cannot beat the limit are abandoned
+
+    Returns
+    -------
+    float
+        Sum of squared distances of the best candidate (inf if there
+        is no candidate within the limit)
+
+    int
+        Index of the best candidate or -1 if there is no candidate
+        within the limit
+    """
+    score, index = KERNELS["best_match"](word, candidates, squared_distances,
+                                         float(limit), block)
+    return float(score), int(index)
+
+
+def lag_bin_sums(x, y, borders, chunk_size=4000000):
+    """
+    Accumulate time lags and squared differences of all pairs of values
+    (each pair once) in lag bins
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time values
+
+    y : numpy.ndarray
+        Measured values
+
+    borders : numpy.ndarray
+        Increasing inner borders of lag bins (lag equal to a border
+        belongs to the upper bin)
+
+    chunk_size : int
+        Maximal number of pairs of values kept in memory at once
+        by NumPy backend
+
+    Returns
+    -------
+    numpy.ndarray
+        Sums of lags in each of len(borders) + 1 bins
+
+    numpy.ndarray
+        Sums of squared differences in each bin
+
+    numpy.ndarray
+        Numbers of pairs in each bin
+    """
+    return KERNELS["lag_bin_sums"](np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                   np.asarray(borders, dtype=float), chunk_size)
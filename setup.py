@@ -12,6 +12,7 @@ setup(
   install_requires=["numpy", "scipy", "matplotlib", "pandas", "scikit-learn",
                     "kplr", "astroML", "astropy", "requests", "bs4", "pathos", "tqdm", "keras",
                     "redis", "rq"],
+  extras_require={"numba": ["numba"]},
   keywords=['light curves', 'machine-learning', 'astronomy', 'data-mining'],
   entry_points={'console_scripts': ['lcc=lcc.cli.lcc:main']},
   classifiers=[
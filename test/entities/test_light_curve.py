@@ -0,0 +1,100 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from lcc.entities.light_curve import LightCurve
+
+
+def test_clean():
+    x = np.linspace(0, 10, 50)
+    y = np.sin(x)
+    err = np.ones(50) * 0.01
+    y[3] = np.nan
+    x[7] = np.inf
+    err[10] = np.nan
+
+    lc = LightCurve([x, y, err])
+    assert len(lc.time) == len(lc.mag) == len(lc.err) == 47
+    assert np.isfinite(lc.mag).all()
+    assert (lc.mag == np.round(lc.mag, LightCurve.MAG_DECIMALS)).all()
+
+    lc_t = LightCurve(np.array([x, y, err]).T)
+    assert (lc_t.mag == lc.mag).all()
+
+    lc_two = LightCurve([x, y])
+    assert (lc_two.err == 0).all()
+
+
+def test_bad_values():
+    lc = LightCurve(np.array([[1, 2, 3, 4],
+                              [1.5, None, "-99", 2.5],
+                              [0.1, 0.1, 0.1, 0.1]], dtype=object))
+    assert lc.time.tolist() == [1, 4]
+    assert lc.mag.tolist() == [1.5, 2.5]
+
+
+def test_no_copy():
+    data = np.random.random_sample((3, 100))
+    lc = LightCurve(data, round_values=False)
+    assert np.shares_memory(lc.time, data)
+    assert np.shares_memory(lc.mag, data)
+
+
+def test_structured_array():
+    data = np.random.random_sample((3, 100)).astype(">f4")
+    rec = np.rec.fromarrays(data, names="time,mag,err")
+    lc = LightCurve(rec)
+    assert len(lc.time) == 100
+    assert np.allclose(lc.mag, data[1], atol=1e-3)
+
+
+def test_cache():
+    x = np.linspace(0, 10, 100)
+    lc = LightCurve([x, np.sin(x)])
+
+    hist = lc.getHistogram(bins=10)
+    assert lc.getHistogram(10) is hist
+    assert lc.getHistogram(bins=5) is not hist
+    assert lc.getAbbe(bins=20) == lc.getAbbe(20)
+
+    lc.mag = np.cos(x)
+    hist2 = lc.getHistogram(bins=10)
+    assert hist2 is not hist
+    assert lc.getHistogram(bins=10) is hist2
+
+    lc.selfClean()
+    assert lc.getHistogram(bins=10) is not hist2
+
+    for i in range(LightCurve.CACHE_SIZE + 5):
+        lc.getVariogram(bins=i + 5)
+    assert len(lc._cache) == LightCurve.CACHE_SIZE
+
+
+def test_compact_layout():
+    x = np.linspace(0, 10, 100)
+    lc = LightCurve([x, np.sin(x), np.full(100, 0.01)])
+    lc2 = LightCurve([x, np.cos(x)])
+    assert not hasattr(lc, "__dict__")
+
+    # Default metadata are shared and read-only until they are modified
+    assert not lc.hasOwnMeta() and lc._meta is lc2._meta
+    assert lc.meta["color"] == LightCurve.DEFAULT_META["color"]
+    assert dict(lc.meta) and not lc.hasOwnMeta() and lc.meta is lc2.meta
+    with pytest.raises(TypeError):
+        lc.meta["color"] = "V"
+    lc.updateMeta(color="V")
+    assert lc.hasOwnMeta() and lc2.meta["color"] == LightCurve.DEFAULT_META["color"]
+    assert not lc2.hasOwnMeta()
+
+    lc32 = LightCurve([x, np.sin(x), np.full(100, 0.01)], float32=True)
+    assert lc32.time.dtype == np.float64
+    assert lc32.mag.dtype == lc32.err.dtype == np.float32
+    assert np.allclose(lc32.mag, lc.mag, atol=1e-6)
+    lc32.selfClean()
+    assert lc32.mag.dtype == np.float32
+
+    restored = pickle.loads(pickle.dumps(lc))
+    assert restored.meta["color"] == "V"
+    assert np.array_equal(restored.mag, lc.mag)
+    assert not pickle.loads(pickle.dumps(LightCurve([x, x]))).hasOwnMeta()
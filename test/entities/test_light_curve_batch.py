@@ -0,0 +1,88 @@
+import numpy as np
+
+from lcc.entities.light_curve_batch import LightCurveBatch
+from lcc.entities.star import Star
+
+
+def set_up(n_stars=50):
+    stars = []
+    for i in range(n_stars):
+        n = np.random.randint(10, 200)
+        x = np.sort(np.random.random_sample(n) * 100)
+        x[n // 2:] += 50
+        star = Star(name="Star_{}".format(i))
+        star.putLightCurve([x, np.random.random_sample(n), np.ones(n) * 0.1])
+        stars.append(star)
+    stars.insert(3, Star(name="Without_lc"))
+    return stars
+
+
+def test_views():
+    stars = set_up()
+    batch = LightCurveBatch.fromStars(stars)
+
+    assert len(batch) == len(stars)
+    assert batch.getLightCurve(3) is None
+    assert batch.getStar(3).lightCurve is None
+
+    star = batch.getStar(10)
+    assert star.name == stars[10].name
+    assert (star.lightCurve.mag == stars[10].lightCurve.mag).all()
+    assert np.shares_memory(star.lightCurve.mag, batch.mag)
+
+    sub = batch[5:15]
+    assert len(sub) == 10
+    assert (sub.getLightCurve(0).time == stars[5].lightCurve.time).all()
+
+    every_other = batch[::2]
+    assert every_other.getStar(2).name == stars[4].name
+
+
+def test_reductions():
+    stars = set_up()
+    batch = LightCurveBatch.fromStars(stars)
+
+    means = batch.getMeanMag()
+    stds = batch.getStdMag()
+    abbes = batch.getAbbe()
+    abbes_binned = batch.getAbbe(bins=20)
+
+    assert np.isnan([means[3], stds[3], abbes[3]]).all()
+    for i, star in enumerate(stars):
+        if star.lightCurve:
+            assert np.isclose(means[i], star.lightCurve.getMeanMag())
+            assert np.isclose(stds[i], star.lightCurve.getStdMag())
+            assert np.isclose(abbes[i], star.lightCurve.getAbbe())
+            assert np.isclose(abbes_binned[i], star.lightCurve.getAbbe(bins=20))
+
+
+def test_histogram():
+    stars = set_up()
+    batch = LightCurveBatch.fromStars(stars)
+
+    for centred in [False, True]:
+        hists, ranges = batch.getHistogram(bins=10, centred=centred, normed=False)
+        normed_hists, _ = batch.getHistogram(bins=10, centred=centred, normed=True)
+        assert hists.shape == (len(stars), 9)
+        assert ranges.shape == (len(stars), 10)
+        assert np.isnan(hists[3]).all() and np.isnan(normed_hists[3]).all()
+
+        for i, star in enumerate(stars):
+            if star.lightCurve:
+                ref_hist, ref_ranges = star.lightCurve.getHistogram(bins=10, centred=centred,
+                                                                    normed=False)
+                assert np.allclose(ranges[i], ref_ranges)
+                assert hists[i].sum() == len(star.lightCurve.mag)
+
+                # Values on inner borders can fall into the neighbouring bin
+                values = star.lightCurve.getEkviPAA()[1]
+                if centred:
+                    values = values - np.nanmean(values)
+                on_border = np.isclose(values[:, None], ref_ranges[None, 1:-1],
+                                       rtol=0, atol=1e-9).sum()
+                assert np.abs(hists[i] - ref_hist).sum() <= 2 * on_border
+
+                if not on_border:
+                    assert np.array_equal(hists[i], ref_hist)
+                    ref_normed, _ = star.lightCurve.getHistogram(bins=10, centred=centred)
+                    assert np.allclose(normed_hists[i], ref_normed)
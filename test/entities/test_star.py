@@ -0,0 +1,201 @@
+import copyreg
+import pickle
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pytest
+from astropy.coordinates.sky_coordinate import SkyCoord
+
+from lcc.entities.light_curve import LightCurve
+from lcc.entities.star import Star
+
+
+def test_coordinates():
+    star = Star(coo=(10.5, -20.1))
+    assert star.ra == 10.5
+    assert star.dec == -20.1
+    assert star._coo is None
+    assert isinstance(star.coo, SkyCoord)
+    assert np.isclose(star.coo.ra.degree, 10.5)
+
+    star = Star(coo=("10h00m00s", "+10d00m00s", ("hourangle", "deg")))
+    assert np.isclose(star.ra, 150)
+    assert np.isclose(star.dec, 10)
+
+    star = Star(coo=SkyCoord(1, 2, unit="deg"))
+    assert (star.ra, star.dec) == (1, 2)
+
+    assert Star(coo=(None, 2)).coo is None
+    assert Star().ra is None
+
+
+def test_coordinates_degrees():
+    star = Star(coo=("10:00:00", "+10:00:00"))
+    assert np.isclose(star.ra, 10) and np.isclose(star.dec, 10)
+
+    assert Star(coo=(-10, 5)).ra == 350
+    assert Star(coo=(370, 10)).ra == 10
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        star = Star(coo=(10, 100))
+    assert caught
+    assert star.ra is None and star.coo is None
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        stars = Star.createStars([-10, 370, 10, 10], [5, 10, 100, 20])
+    assert caught
+    assert [st.ra for st in stars] == [350, 10, None, 10]
+    assert stars[2].coo is None
+
+    stars = Star.createStars(["10:00:00", "20:00:00"], ["+10:00:00", "-10:00:00"])
+    assert np.allclose([st.ra for st in stars], [10, 20])
+    assert np.allclose([st.dec for st in stars], [10, -10])
+
+    # Invalid rows don't drop coordinates of other stars
+    with warnings.catch_warnings(record=True):
+        warnings.simplefilter("always")
+        stars = Star.createStars(["05 23 34.5", "", "06 00 00"], ["+01 00 00", "", "+02 00 00"],
+                                 unit=("hourangle", "deg"))
+        assert stars[1].ra is None and stars[1].coo is None
+        assert np.allclose([stars[0].ra, stars[2].ra], [80.89375, 90])
+        assert np.allclose([stars[0].dec, stars[2].dec], [1, 2])
+
+        stars = Star.createStars(["10.5", "abc", "20"], ["1", "2", "3"])
+        assert [(st.ra, st.dec) for st in stars] == [(10.5, 1), (None, None), (20, 3)]
+
+
+def test_create_stars():
+    n = 1000
+    ra = np.random.random_sample(n) * 360
+    dec = np.random.random_sample(n) * 180 - 90
+    dec[5] = np.nan
+
+    stars = Star.createStars(ra, dec, names=["star_%i" % i for i in range(n)])
+    assert len(stars) == n
+    assert stars[3].ra == ra[3]
+    assert stars[3].name == "star_3"
+    assert stars[5].coo is None
+
+    stars = Star.createStars(ra / 15., dec, unit=("hourangle", "deg"))
+    assert np.isclose(stars[3].ra, ra[3])
+
+
+def test_compact_layout():
+    star = Star(ident={"OgleII": {"name": "LMC_SC1_1"}}, coo=(10.5, -30.2))
+    star.putLightCurve([np.linspace(0, 1, 10), np.ones(10)])
+    assert not hasattr(star, "__dict__")
+
+    restored = pickle.loads(pickle.dumps(star))
+    assert restored == star and restored.name == "LMC_SC1_1"
+    assert (restored.ra, restored.dec) == (10.5, -30.2)
+    assert np.array_equal(restored.lightCurve.mag, star.lightCurve.mag)
+
+
+def _bytes_per_star(n=200, m=500, **kwargs):
+    rng = np.random.RandomState(0)
+    data = [np.array([np.sort(rng.uniform(0, 1000, m)), rng.normal(17, .1, m),
+                      rng.uniform(.01, .05, m)]) for _ in range(n)]
+    tracemalloc.start()
+    try:
+        stars = []
+        for i, lc in enumerate(data):
+            star = Star(ident={"OgleII": {"name": "LMC_SC1_%i" % i}}, coo=(80., -69.))
+            star.putLightCurve(LightCurve(lc, **kwargs))
+            stars.append(star)
+        return tracemalloc.get_traced_memory()[0] / n
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_per_star():
+    arrays = 3 * 500 * 8
+    default = _bytes_per_star()
+    compact = _bytes_per_star(float32=True)
+    assert default < arrays + 1300
+    assert compact < default - 500 * 2 * 4 + 100
+
+
+def test_pickle_protocols():
+    star = Star(ident={"OgleII": {"name": "LMC_SC1_1", "db_ident": {"starid": 1}}},
+                coo=(10.5, -30.2), more={"v_mag": 16.2}, starClass="cepheid")
+    star.putLightCurve(LightCurve([np.linspace(0, 1, 10), np.ones(10)], float32=True))
+    star.coo.to_string()
+
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        restored = pickle.loads(pickle.dumps(star, protocol=protocol))
+        assert restored.ident == star.ident and restored.more == star.more
+        assert restored.starClass == "cepheid" and restored._coo is None
+        assert restored.getDistance(star).degree < 1e-9
+        assert restored.lightCurve.mag.dtype == np.float32
+        assert np.array_equal(restored.lightCurve.time, star.lightCurve.time)
+
+    # Arrays are transferred out-of-band
+    buffers = []
+    data = pickle.dumps(star, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 3 and len(data) < 400
+    restored = pickle.loads(data, buffers=buffers)
+    restored.lightCurve.mag[0] = 2
+    assert restored.lightCurve.mag[0] == 2
+
+
+class _LegacyPickle(object):
+    """Object pickled as `cls` with its `__dict__` state (as before `__reduce_ex__`)"""
+
+    def __init__(self, cls, state):
+        self.cls = cls
+        self.state = state
+
+    def __reduce_ex__(self, protocol):
+        return copyreg._reconstructor, (self.cls, object, None), self.state
+
+
+def _round_trip(obj, repeat=20):
+    """Best time of dumping and loading the object and size of its pickle"""
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.loads(data)
+        times.append(time.perf_counter() - t)
+    return min(times), len(data)
+
+
+@pytest.mark.benchmark
+def test_pickle_benchmark():
+    rng = np.random.RandomState(0)
+    lc = np.array([np.sort(rng.uniform(0, 3000, 1000)), rng.normal(17, .1, 1000),
+                   rng.uniform(.01, .05, 1000)])
+    ident = {"OgleII": {"name": "LMC_SC1_1", "db_ident": {"field": "LMC_SC1", "starid": 1}}}
+    more = {"v_mag": 16.2, "i_mag": 15.8}
+
+    star = Star(ident=ident, coo=(80.5, -69.2), more=more)
+    star.putLightCurve(LightCurve(lc))
+
+    legacy_lc = _LegacyPickle(LightCurve, {"time": star.lightCurve.time, "mag": star.lightCurve.mag,
+                                           "err": star.lightCurve.err,
+                                           "meta": dict(LightCurve.DEFAULT_META)})
+    legacy = _LegacyPickle(Star, {"ident": ident, "more": more, "light_curves": [legacy_lc],
+                                  "starClass": None, "_name": None,
+                                  "_coo": SkyCoord(80.5, -69.2, unit="deg")})
+    restored = pickle.loads(pickle.dumps(legacy))
+    assert abs(restored.ra - 80.5) < 1e-9
+    assert np.array_equal(restored.lightCurve.mag, star.lightCurve.mag)
+
+    new_time, new_size = _round_trip(star)
+    legacy_time, legacy_size = _round_trip(legacy)
+    print("Round trip: %.1f us (%i B), legacy: %.1f us (%i B)" % (
+        new_time * 1e6, new_size, legacy_time * 1e6, legacy_size))
+    assert new_size < legacy_size
+    assert new_time < legacy_time
+
+
+def test_legacy_state():
+    star = Star.__new__(Star)
+    star.__setstate__({"ident": {"OgleII": {"name": "LMC_SC1_1"}}, "more": {},
+                       "light_curves": [], "starClass": None, "_name": None,
+                       "_coo": SkyCoord(10.5, -30.2, unit="deg")})
+    assert star.name == "LMC_SC1_1" and abs(star.ra - 10.5) < 1e-9
@@ -0,0 +1,57 @@
+import numpy as np
+from astropy.coordinates.sky_coordinate import SkyCoord
+
+from lcc.db_tier.base_query import StarsCatalogue
+from lcc.entities.star import Star
+from lcc.entities.star_index import StarIndex
+
+
+def set_up(n=2000):
+    ra = 150 + np.random.random_sample(n) * 2
+    dec = -30 + np.random.random_sample(n) * 2
+    stars = Star.createStars(ra, dec, names=["star_%i" % i for i in range(n)])
+    stars.append(Star(name="without_coo"))
+    return stars, SkyCoord(ra, dec, unit="deg")
+
+
+def test_query_radius():
+    stars, coo = set_up()
+    index = StarIndex(stars)
+
+    center = SkyCoord(151, -29, unit="deg")
+    found, distances = index.queryRadius(151, -29, 0.3, with_distances=True)
+
+    sep = center.separation(coo).degree
+    assert [st.name for st in found] == [stars[i].name for i in np.flatnonzero(sep < 0.3)]
+    assert np.allclose(distances, sep[sep < 0.3])
+
+    nearest, dist = index.queryNearest(151, -29, k=3)
+    assert [st.name for st in nearest] == [stars[i].name for i in np.argsort(sep)[:3]]
+    assert np.allclose(dist, np.sort(sep)[:3])
+
+
+def test_cone_search():
+    stars, coo = set_up()
+    center = SkyCoord(151, -29, unit="deg")
+    sep = center.separation(coo).degree
+
+    passed = StarsCatalogue.coneSearch(None, center, stars, 0.1)
+    assert len(passed) == (sep < 0.1).sum() + 1
+    assert passed[-1].name == "without_coo"
+
+    nearest = StarsCatalogue.coneSearch(None, center, stars[:-1], 0.1, nearest=True)
+    assert nearest[0].name == stars[np.argmin(sep)].name
+
+
+def test_crossmatch():
+    stars, _ = set_up(500)
+    stars = stars[:-1]
+    shifted = [Star(name=st.name + "_shifted", coo=(st.ra + Star.EPS / 10., st.dec)) for st in stars[:100]]
+    far = [Star(coo=(st.ra + 0.01, st.dec)) for st in stars[100:150]]
+
+    matches = StarIndex(stars).crossmatch(shifted + far)
+    assert len(matches) == 100
+    assert all(st.name + "_shifted" == other.name for st, other, _ in matches)
+
+    unique = StarIndex(stars + shifted).removeDuplicates()
+    assert len(unique) == len(stars)
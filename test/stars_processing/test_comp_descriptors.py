@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -6,6 +7,25 @@ from lcc.entities.star import Star
 from lcc.stars_processing.descriptors.curves_shape_descr import CurvesShapeDescr
 from lcc.stars_processing.descriptors.hist_shape_descr import HistShapeDescr
 from lcc.stars_processing.descriptors.variogram_shape_descr import VariogramShapeDescr
+from lcc.stars_processing.utilities.base_descriptor import BaseDescriptor
+from lcc.stars_processing.utilities.compare import ComparativeBase
+from lcc.stars_processing.utilities.sax import SAX
+from lcc.stars_processing.utilities.symbolic_representation import SymbolicRepresentation
+
+
+class LegacyHistShape(SymbolicRepresentation, ComparativeBase, BaseDescriptor):
+    """Descriptor which implements only string `getWord`"""
+
+    def __init__(self, comp_stars, bins, alphabet_size):
+        self.bins = bins
+        self.alphabet_size = alphabet_size
+        self.slide = False
+        self.meth = "average"
+        self.loadCompStars(comp_stars)
+
+    def getWord(self, star):
+        x = star.lightCurve.getHistogram(bins=self.bins)[0]
+        return SAX(self.bins, self.alphabet_size).to_letter_rep(x)[0]
 
 
 class TestComparative(unittest.TestCase):
@@ -31,11 +51,80 @@ class TestComparative(unittest.TestCase):
         assert hist.getSpaceCoords(
             [self.star3])[0] > hist.getSpaceCoords([self.star1])[0]
 
+    def testLegacyGetWord(self):
+        legacy = LegacyHistShape([self.star2], 10, 5)
+        hist = HistShapeDescr([self.star2], 10, 5)
+        word, scaling_factor = legacy.getScaledWord(self.star3)
+        np.testing.assert_array_equal(word, hist.getWord(self.star3))
+        self.assertAlmostEqual(scaling_factor, np.sqrt(600 / 10.))
+        assert legacy.getSpaceCoords(
+            [self.star3])[0] > legacy.getSpaceCoords([self.star1])[0]
+
     def testVarioShape(self):
         vario = VariogramShapeDescr([self.star2], 10, 5)
         assert vario.getSpaceCoords(
             [self.star3]) > vario.getSpaceCoords([self.star1])
 
+    def testTemplateWordCache(self):
+        lcdes = CurvesShapeDescr([self.star2, self.star3], 0.6, 10)
+        self.assertEqual(len(lcdes._word_cache), 2)
+        cached = lcdes._getTemplateWord(self.star2)[0]
+        self.assertIs(lcdes._getTemplateWord(self.star2)[0], cached)
+
+        coords = lcdes.getSpaceCoords([self.star1, self.star3])
+        self.assertEqual(coords, lcdes.getSpaceCoords([self.star1, self.star3]))
+
+        lcdes.alphabet_size = 5
+        self.assertIsNot(lcdes._getTemplateWord(self.star2)[0], cached)
+        self.assertEqual(lcdes.getSpaceCoords([self.star1, self.star3]),
+                         CurvesShapeDescr([self.star2, self.star3], 0.6, 5).getSpaceCoords([self.star1, self.star3]))
+
+    def testDissimilarityMatrix(self):
+        stars = [self.star1, self.star2, self.star3, Star()]
+        templates = [self.star3, self.star1, self.star2]
+        for descr in [HistShapeDescr(templates, 10, 5, meth="best2"),
+                      VariogramShapeDescr(templates, 10, 5, meth="closest"),
+                      CurvesShapeDescr(templates, 0.6, 10, slide=None)]:
+            matrix = descr.getDissimilarityMatrix(stars, block_size=2)
+            self.assertEqual(matrix.shape, (4, 3))
+            self.assertTrue(np.isnan(matrix[3]).all())
+            for i, star in enumerate(stars[:3]):
+                for j, comp_star in enumerate(templates):
+                    self.assertAlmostEqual(matrix[i, j], descr.compareTwoStars(star, comp_star))
+                self.assertAlmostEqual(descr.getSpaceCoords(stars)[i], descr.getFeatures(star))
+
+    def testTemplateIndex(self):
+        x = np.linspace(1, 10, 100)
+        templates = [self.star1, self.star2, self.star3]
+        for shift in np.linspace(0, 3, 30):
+            star = Star()
+            star.putLightCurve([x, np.sin(x * (1 + shift / 10) + shift)])
+            templates.append(star)
+
+        stars = [self.star1, self.star3, Star()] + templates[5:10]
+        for meth in ["closest", "best3"]:
+            plain = HistShapeDescr(templates, 10, 5, meth=meth)
+            indexed = HistShapeDescr(templates, 10, 5, meth=meth, use_index=True)
+            np.testing.assert_allclose(indexed.getSpaceCoords(stars), plain.getSpaceCoords(stars))
+            self.assertEqual(sum(indexed.index_stats.values()), 7 * len(templates))
+
+    def testConcurrentCoords(self):
+        x = np.linspace(1, 30, 300)
+        stars = []
+        for shift in np.linspace(0, 3, 24):
+            star = Star()
+            star.putLightCurve([x[:100 + int(shift * 60)], np.sin(x * (1 + shift / 10))[:100 + int(shift * 60)]])
+            stars.append(star)
+
+        templates = [self.star1, self.star2, self.star3]
+        for descr in [CurvesShapeDescr(templates, 0.6, 10),
+                      HistShapeDescr(templates, 10, 5, meth="closest", use_index=True),
+                      VariogramShapeDescr(templates, 10, 5)]:
+            expected = [descr.getSpaceCoords([star])[0] for star in stars]
+            with ThreadPoolExecutor(8) as pool:
+                coords = list(pool.map(lambda star: descr.getSpaceCoords([star])[0], stars * 4))
+            np.testing.assert_allclose(coords, expected * 4)
+
 
 if __name__ == "__main__":
     unittest.main()
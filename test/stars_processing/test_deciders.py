@@ -1,6 +1,7 @@
 import numpy as np
 
 import lcc.stars_processing.deciders.supervised_deciders as dec
+from lcc.stars_processing.deciders.custom_decider import CustomDecider
 from lcc.stars_processing.deciders.neuron_decider import NeuronDecider
 
 
@@ -23,3 +24,41 @@ def test():
         eee[dec.__class__.__name__] = np.mean(p1) - np.mean(p2)
         assert np.mean(p1) - np.mean(p2) > 0.95
 
+
+
+def test_threshold_statistics():
+    search_sample = np.random.random_sample((100, 7))
+    others_sample = np.random.random_sample((100, 7)) + 0.2
+    decider = dec.LDADec()
+    decider.learn(search_sample, others_sample)
+
+    right = decider.evaluate(search_sample)
+    wrong = decider.evaluate(others_sample)
+    curve = decider.getThresholdStatistics(search_sample, others_sample)
+    assert np.all(np.diff(curve["threshold"]) > 0)
+
+    for i, thr in enumerate(curve["threshold"][::17]):
+        tp = sum(prob >= thr for prob in right)
+        tn = sum(prob < thr for prob in wrong)
+        assert curve["true_pos"][i * 17] == tp and curve["true_neg"][i * 17] == tn
+
+        stat = decider.getStatistic(search_sample, others_sample, thr)
+        assert stat["true_positive_rate"] == round(tp / 100., 3)
+        assert stat["false_positive_rate"] == round(1 - tn / 100., 3)
+        assert stat["precision"] == round(tp / (tp + 100 - tn), 3)
+
+    best = decider.getBestCoord(others_sample)
+    assert np.isclose(decider.evaluate([best])[0], wrong.max())
+    assert decider.filter(others_sample, 0.5) == [prob >= 0.5 for prob in wrong]
+
+
+def test_custom_decider():
+    coords = [[1, 5, 8], [1.5, 5.1, 7.9], [2, 6, -1], [5, 4, 0], [3, np.nan, 3]]
+    decider = CustomDecider([(1, 10), (5, None), (None, 8)])
+    decider.learn(coords, coords)
+    assert decider.evaluate(coords).tolist() == [0, 1, 1, 0, 0]
+
+    # Zero bound means no limit as well and coordinates without limits
+    # are not compared at all
+    assert CustomDecider([(0, None), (None, 0), (None, None)]).evaluate(coords).tolist() == [1, 1, 1, 1, 1]
+    assert CustomDecider([(None, None), (None, 5.5), (None, None)]).evaluate(coords).tolist() == [1, 1, 0, 1, 0]
@@ -37,6 +37,38 @@ class TestDescriptors(unittest.TestCase):
         sk_values = skewness_descr(bins=30).getSpaceCoords(self.stars)
         assert not np.isnan(sk_values).all()
 
+    def testBatchFeatures(self):
+        stars = self.stars + [Star(), Star(coo=(10.5, -20.25))]
+        for i, star in enumerate(stars):
+            star.more = {"b_mag": 12 + i / 10., "v_mag": str(11 + i / 7.), "pm_ra": i}
+        stars[0].more["b_mag"] = None
+
+        descriptors = [self.descriptors["AbbeValueDescr"](),
+                       self.descriptors["AbbeValueDescr"](bins=10),
+                       self.descriptors["KurtosisDescr"](),
+                       self.descriptors["KurtosisDescr"](bins=30, absolute=True),
+                       self.descriptors["SkewnessDescr"](bins=30),
+                       self.descriptors["CurveDensityDescr"](),
+                       self.descriptors["PropertyDescr"](["pm_ra", "v_mag", "u_mag"], ifnot=0),
+                       self.descriptors["ColorIndexDescr"]([("b_mag", "v_mag"), ("pm_ra", "v_mag")]),
+                       self.descriptors["PositionDescriptor"]()]
+        for descr in descriptors:
+            coords = descr.getSpaceCoords(stars)
+
+            expected = []
+            for star in stars:
+                if getattr(descr, "LC_NEEDED", False) and not star.lightCurve:
+                    expected.append(descr._getNoneFeatures())
+                else:
+                    expected.append(descr.getFeatures(star))
+
+            self.assertEqual(len(coords), len(expected))
+            for coo, exp in zip(coords, expected):
+                if exp is None or (isinstance(exp, list) and None in exp):
+                    self.assertEqual(coo, exp)
+                else:
+                    np.testing.assert_allclose(coo, exp, rtol=1e-6, equal_nan=True)
+
     def testComparative(self):
         logging.debug("Starting comparative test")
         descr = self.descriptors["HistShapeDescr"](self.stars[:4], 10, 10)
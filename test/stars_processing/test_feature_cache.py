@@ -0,0 +1,111 @@
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from lcc.entities.star import Star
+from lcc.stars_processing.deciders.custom_decider import CustomDecider
+from lcc.stars_processing.descriptors.abbe_value_descr import AbbeValueDescr
+from lcc.stars_processing.descriptors.curve_descr import CurveDescr
+from lcc.stars_processing.descriptors.curves_shape_descr import CurvesShapeDescr
+from lcc.stars_processing.stars_filter import StarsFilter
+from lcc.stars_processing.tools.params_estim import ParamsEstimator
+from lcc.stars_processing.utilities.feature_cache import FeatureCache
+
+
+class CountingAbbe(AbbeValueDescr):
+    calls = 0
+
+    def getSpaceCoords(self, stars):
+        CountingAbbe.calls += len(stars)
+        return super().getSpaceCoords(stars)
+
+
+def _stars(n, seed=0):
+    rng = np.random.RandomState(seed)
+    x = np.linspace(0, 10, 100)
+    stars = []
+    for i in range(n):
+        star = Star(name="Star_{}".format(i))
+        star.putLightCurve([x, np.sin(x * (1 + i / 10.)) + rng.random_sample(100)])
+        stars.append(star)
+    return stars
+
+
+def test_feature_cache():
+    stars = _stars(20)
+    with tempfile.TemporaryDirectory() as path:
+        cache = FeatureCache(os.path.join(path, "cache", "features.sqlite"))
+        expected = AbbeValueDescr(bins=30).getSpaceCoords(stars)
+
+        CountingAbbe.calls = 0
+        assert cache.getSpaceCoords(CountingAbbe(bins=30), stars[:10]) == expected[:10]
+        assert cache.getSpaceCoords(CountingAbbe(bins=30), stars) == expected
+        assert CountingAbbe.calls == 20
+
+        # Cache is persistent and keyed by parameters and content of stars
+        cache = pickle.loads(pickle.dumps(FeatureCache(cache.path)))
+        assert cache.getSpaceCoords(CountingAbbe(bins=30), stars) == expected
+        assert CountingAbbe.calls == 20
+        assert cache.getSpaceCoords(CountingAbbe(bins=20), stars[:5]) == \
+            AbbeValueDescr(bins=20).getSpaceCoords(stars[:5])
+        assert CountingAbbe.calls == 25
+
+        stars[0].lightCurve.mag = stars[0].lightCurve.mag[::-1]
+        cache.getSpaceCoords(CountingAbbe(bins=30), stars)
+        assert CountingAbbe.calls == 26
+
+        stats = cache.getStatistics()
+        assert stats["hits"] == 39 and stats["misses"] == 6 and stats["entries"] == 26
+
+        # Features depending on the training sample are not cached
+        assert FeatureCache.getDescriptorKey(CurveDescr(bins=10)) is None
+        templates = _stars(3, seed=1)
+        assert FeatureCache.getDescriptorKey(CurvesShapeDescr(templates, 0.5, 8)) == \
+            FeatureCache.getDescriptorKey(CurvesShapeDescr(_stars(3, seed=1), 0.5, 8))
+        assert FeatureCache.getDescriptorKey(CurvesShapeDescr(templates, 0.5, 8)) != \
+            FeatureCache.getDescriptorKey(CurvesShapeDescr(templates[:2], 0.5, 8))
+
+
+def test_feature_cache_eviction():
+    stars = _stars(50)
+    with tempfile.TemporaryDirectory() as path:
+        cache = FeatureCache(os.path.join(path, "features.sqlite"), max_size=1000)
+        for i in range(0, 50, 10):
+            cache.getSpaceCoords(AbbeValueDescr(), stars[i:i + 10])
+
+        stats = cache.getStatistics()
+        assert 0 < stats["size"] <= 1000
+        assert stats["evictions"] == 50 - stats["entries"]
+
+        # The least recently used features were evicted
+        cache.getSpaceCoords(AbbeValueDescr(), stars[-5:])
+        assert cache.getStatistics()["hits"] == 5
+
+
+def test_stars_filter_cache():
+    stars = _stars(10)
+    with tempfile.TemporaryDirectory() as path:
+        filt = StarsFilter([CountingAbbe()], [], FeatureCache(os.path.join(path, "features.sqlite")))
+        CountingAbbe.calls = 0
+        coords = filt.getSpaceCoordinates(stars)
+        np.testing.assert_allclose(filt.getSpaceCoordinates(stars).values, coords.values)
+        assert CountingAbbe.calls == 10
+
+        assert pickle.loads(pickle.dumps(filt)).feature_cache is None
+
+
+def test_params_estim_cache():
+    with tempfile.TemporaryDirectory() as path:
+        cache = FeatureCache(os.path.join(path, "features.sqlite"))
+        est = ParamsEstimator(_stars(10), _stars(10, seed=1), [AbbeValueDescr], [CustomDecider],
+                              [{"AbbeValueDescr": {"bins": 20}}, {"AbbeValueDescr": {"bins": 20}}],
+                              static_params={"CustomDecider": {"boundaries": [(None, 0.5)]}},
+                              multiproc=2, feature_cache=cache)
+        est.evaluateCombinations()
+
+        # Usage of the cache in worker processes is counted as well
+        stats = cache.getStatistics()
+        assert stats["hits"] + stats["misses"] == 40
+        assert stats["entries"] == 20
@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+
+from lcc.entities.star import Star
+from lcc.stars_processing.deciders.custom_decider import CustomDecider
+from lcc.stars_processing.descriptors.abbe_value_descr import AbbeValueDescr
+from lcc.stars_processing.descriptors.property_desc import PropertyDescr
+from lcc.stars_processing.filters_cascade import FiltersCascade
+from lcc.stars_processing.stars_filter import StarsFilter
+
+
+class SlowAbbe(AbbeValueDescr):
+    inspected = 0
+
+    def getSpaceCoords(self, stars, batch=None):
+        SlowAbbe.inspected += len(stars)
+        time.sleep(0.001 * len(stars))
+        return super().getSpaceCoords(stars)
+
+
+def _filter(descriptor, boundaries):
+    filt = StarsFilter([descriptor], [CustomDecider(boundaries)])
+    filt.learn([], [])
+    return filt
+
+
+def test_cascade():
+    x = np.linspace(0, 10, 100)
+    stars = [Star(name="Star_{}".format(i), more={"v_mag": i}) for i in range(50)]
+    for st in stars:
+        st.putLightCurve([x, np.cos(x) + np.random.random_sample(100)])
+
+    expensive = _filter(SlowAbbe(), [(None, 10)])
+    cheap = _filter(PropertyDescr(["v_mag"]), [(None, 4.5)])
+    expected = [st.name for st in cheap.filterStars(expensive.filterStars(stars))]
+
+    cascade = FiltersCascade([expensive, cheap])
+    SlowAbbe.inspected = 0
+    for _ in range(3):
+        assert [st.name for st in cascade.filterStars(stars)] == expected
+
+    # The expensive filter which rejects nothing goes last after measuring
+    assert cascade.getOrder() == [1, 0]
+    assert SlowAbbe.inspected == 50 + 2 * 5
+
+    stats = cascade.getStatistics()
+    assert stats["inspected"].tolist() == [150, 60]
+    assert stats["passed"].tolist() == [15, 60]
+    np.testing.assert_allclose(stats["pass_rate"], [0.1, 1])
+    assert stats["time_per_star"].iloc[0] < stats["time_per_star"].iloc[1]
+
+    fixed = FiltersCascade([expensive, cheap], reorder=False)
+    fixed.filterStars(stars)
+    fixed.filterStars(stars)
+    assert fixed.getOrder() == [0, 1]
+    assert fixed.getStatistics()["inspected"].tolist() == [100, 100]
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from lcc.stars_processing.utilities.sax import SAX
+
+
+def _alphabetize_letters(beta, paa):
+    word = ""
+    for value in paa:
+        for j, breakpoint in enumerate(beta):
+            if value < breakpoint:
+                word += chr(SAX.A_OFFSET + j)
+                break
+        else:
+            word += chr(SAX.A_OFFSET + len(beta))
+    return word
+
+
+def test_int_words():
+    rng = np.random.RandomState(0)
+    for alphabet_size in range(SAX.MIN_ALPH_SIZE, SAX.MAX_ALPH_SIZE + 1):
+        sax = SAX(8, alphabet_size)
+        paa = np.concatenate([rng.normal(size=50), sax.beta])
+
+        word = sax.alphabetize_int(paa)
+        assert word.dtype == np.uint8
+        assert sax.word_to_str(word) == _alphabetize_letters(sax.beta, paa)
+        assert np.array_equal(sax.str_to_word(sax.word_to_str(word)), word)
+
+        for i in range(alphabet_size):
+            for j in range(alphabet_size):
+                expected = 0
+                if abs(i - j) > 1:
+                    expected = sax.beta[max(i, j) - 1] - sax.beta[min(i, j)]
+                assert sax.distance_matrix[i, j] == expected
+
+
+def test_compare_words():
+    sax = SAX(20, 7)
+    x = np.sin(np.linspace(0, 10, 200))
+    y = np.cos(np.linspace(0, 10, 200))
+    word_x, word_y = sax.to_int_rep(x)[0], sax.to_int_rep(y)[0]
+
+    letters_x, letters_y = sax.to_letter_rep(x)[0], sax.to_letter_rep(y)[0]
+    expected = sax.scaling_factor * np.sqrt(sum(sax.compare_letters(a, b) ** 2
+                                                for a, b in zip(letters_x, letters_y)))
+    assert np.isclose(sax.compare_words(word_x, word_y), expected)
+    assert np.isclose(sax.compare_strings(letters_x, letters_y), expected)
+    assert sax.compare_words(word_x, word_x) == 0
+
+
+def test_match_shifts():
+    rng = np.random.RandomState(0)
+    sax = SAX(40, 10, scaling_factor=1.5)
+    for short_len, long_len in [(5, 5), (10, 40), (40, 300)]:
+        word = rng.randint(0, 10, short_len).astype(np.uint8)
+        long_word = rng.randint(0, 10, long_len).astype(np.uint8)
+
+        scores = [sax.compare_words(long_word[shift:shift + short_len], word)
+                  for shift in range(long_len - short_len + 1)]
+        score, offset = sax.match_shifts(word, long_word)
+        assert np.isclose(score, min(scores)) and offset == int(np.argmin(scores))
+
+        # No shift can beat a score lower than the best one
+        assert sax.match_shifts(word, long_word, best_score=min(scores) / 2) == (min(scores) / 2, None)
+
+    long_word[100:140] = word
+    assert sax.match_shifts(word, long_word) == (0, 100)
+
+
+def test_match_words_lengths():
+    sax = SAX(4, 5)
+    word = np.array([0, 1, 2, 3], dtype=np.uint8)
+    assert sax.match_words(word, [word, word[::-1]])[0] == 0
+    assert sax.match_words(word, np.concatenate([word, word]))[0] == 0
+
+    # Rows of different length are rejected even if they could be reshaped
+    with pytest.raises(Exception):
+        sax.match_words(word, np.zeros((2, 8), dtype=np.uint8))
@@ -5,7 +5,10 @@ import numpy as np
 from lcc.stars_processing.deciders import LDADec, QDADec
 
 from lcc.entities.star import Star
-from lcc.stars_processing.descriptors.abbe_value_descr import AbbeValueDescr
+from lcc.stars_processing.deciders.custom_decider import CustomDecider
+from lcc.stars_processing.descriptors import (AbbeValueDescr, CurveDensityDescr, CurveDescr,
+                                              HistShapeDescr, KurtosisDescr, PropertyDescr,
+                                              SkewnessDescr)
 from lcc.stars_processing.stars_filter import StarsFilter
 
 
@@ -64,3 +67,64 @@ def test_filtering():
     with open(os.path.join(os.path.dirname(__file__), "../resources/test_filter.pickle"), "wb") as fi:
         pickle.dump(filt, fi)
 
+
+
+def test_shared_intermediates():
+    x = np.linspace(0, 10, 100)
+    stars = [Star(name="Star_{}".format(i)) for i in range(20)]
+    for i, st in enumerate(stars):
+        st.putLightCurve([x, np.cos(x * (1 + i / 10.)) + np.random.random_sample(100)])
+
+    descriptors = [AbbeValueDescr(), KurtosisDescr(bins=30), SkewnessDescr(bins=30),
+                   CurveDensityDescr(), CurveDescr(bins=10), HistShapeDescr(stars[-3:], 10, 5)]
+    expected = [descr.getSpaceCoords(stars) for descr in descriptors]
+    expected = [np.hstack(coo) for coo in zip(*expected)]
+
+    filt = StarsFilter(descriptors, [])
+    np.testing.assert_allclose(filt._getSpaceCoordinates(stars), expected)
+
+    # Each distinct product is computed once
+    assert list(filt.timings) == ["LightCurveBatch", "LightCurveBatch.getEkviPAA(None)",
+                                  "LightCurveBatch.getEkviPAA(30)", "LightCurve.getEkviPAA(None)",
+                                  "AbbeValueDescr", "KurtosisDescr", "SkewnessDescr",
+                                  "CurveDensityDescr", "CurveDescr", "HistShapeDescr"]
+    lc = stars[0].lightCurve
+    assert lc.getEkviPAA()[1] is lc.getEkviPAA(len(lc.time))[1]
+
+
+def test_coordinates_array():
+    x = np.linspace(0, 10, 100)
+    stars = [Star(name="Star_{}".format(i), more={"v_mag": 10 + i}) for i in range(6)]
+    for st in stars[:4]:
+        st.putLightCurve([x, np.cos(x) + np.random.random_sample(100)])
+    stars[1].more["v_mag"] = np.nan
+
+    filt = StarsFilter([AbbeValueDescr(), PropertyDescr(["v_mag"])], CustomDecider([(None, None), (10.5, None)]))
+    filt.learn([], [])
+
+    coords, valid = filt.getSpaceCoordinatesArray(stars)
+    assert coords.shape == (6, 2)
+    assert valid.tolist() == [True, False, True, True, False, False]
+    assert filt.getSpaceCoordinates(stars).index.tolist() == ["Star_0", "Star_2", "Star_3"]
+
+    assert [st.name for st in filt.filterStars(stars)] == ["Star_2", "Star_3"]
+    assert filt.evaluateStars(stars).tolist() == [0, 1, 1]
+    df = filt.getAllPredictions(stars, with_features=True, check_passing=True)
+    assert df.columns.tolist() == ["Abbe value", "v_mag", "CustomDecider", "passed_CustomDecider", "passed"]
+    assert df["passed"].tolist() == [False, True, True]
+
+
+def test_threshold_curve():
+    stars = [Star(name="Star_{}".format(i), more={"v_mag": i}) for i in range(20)]
+    filt = StarsFilter([PropertyDescr(["v_mag"])], [CustomDecider([(None, 7.5)]),
+                                                    CustomDecider([(2.5, None)])])
+    filt.learn([], [])
+
+    curve = filt.getThresholdCurve(stars[:10], stars[10:])
+    assert curve["threshold"].tolist() == [0, 1]
+    assert curve["true_pos"].tolist() == [10, 7.5]
+
+    fp, tp = filt.getROC(stars[:10], stars[10:], n=5)
+    for i, thr in enumerate(np.linspace(0.01, 0.99, 5)):
+        stat = filt.getStatistic(stars[:10], stars[10:], thr)
+        assert (fp[i], tp[i]) == (stat["false_positive_rate"], stat["true_positive_rate"])
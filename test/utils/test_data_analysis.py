@@ -1,5 +1,25 @@
+import time
+
 import numpy as np
-from lcc.utils.data_analysis import to_PAA, to_ekvi_PAA, compute_bins, fix_missing
+import pytest
+from lcc.utils.data_analysis import (to_PAA, to_windows_PAA, to_ekvi_PAA, compute_bins,
+                                     fix_missing, variogram, normalize)
+
+
+def _to_ekvi_PAA_masks(x, y, bins, mean_time=True):
+    """Reference implementation masking values of each bin separately"""
+    half_step = (x.max() - x.min()) / bins / 2.
+    borders = np.linspace(x.min() - half_step, x.max() + half_step, bins + 1)
+    x_aprox, y_aprox = [], []
+    for i in range(bins):
+        indx = (x >= borders[i]) & (x < borders[i + 1])
+        if indx.any():
+            x_aprox.append(x[indx].mean() if mean_time else (borders[i + 1] + borders[i]) / 2)
+            y_aprox.append(y[indx].mean())
+        else:
+            x_aprox.append((borders[i + 1] + borders[i]) / 2)
+            y_aprox.append(np.nan)
+    return np.array(x_aprox), np.array(y_aprox)
 
 
 def test_to_PAA():
@@ -10,6 +30,25 @@ def test_to_PAA():
         assert len(to_PAA(x, bins)[0]) == bins
 
 
+def test_to_windows_PAA():
+    for _ in range(50):
+        n = np.random.randint(100, 2000)
+        x = 15 + np.random.random_sample(n)
+        x[:20] = 15.5
+
+        window_len = np.random.randint(20, n // 2)
+        bins = np.random.randint(5, 20)
+        starts = np.arange(0, n - window_len + 1, np.random.randint(1, window_len))
+
+        paa = to_windows_PAA(x, starts, window_len, bins)
+        assert paa.shape == (len(starts), bins)
+        for start, row in zip(starts, paa):
+            expected = to_PAA(normalize(x[start:start + window_len]), bins)[0]
+            assert np.allclose(row, expected, atol=1e-8)
+
+    assert np.allclose(to_windows_PAA(np.ones(100), [0, 20], 40, 8), 0)
+
+
 def test_to_ekvi_PAA1():
     n = 100
     x = np.linspace(0, 1, n)
@@ -58,6 +97,45 @@ def test_to_ekvi_PAA1():
         assert abs(y_ekv3.mean() - y.mean()) / (y_ekv3.mean() + y.mean()) < thr
 
 
+def test_to_ekvi_PAA_binning():
+    for _ in range(50):
+        n = np.random.randint(30, 700)
+        x = np.sort(np.round(np.random.random_sample(n) * 100, 1))
+        x[n // 2:] += 200
+        y = np.random.random_sample(n)
+
+        for bins in [np.random.randint(5, 30), n]:
+            for mean_time in [True, False]:
+                x_ref, y_ref = _to_ekvi_PAA_masks(x, y, bins, mean_time)
+                x_ekv, y_ekv = to_ekvi_PAA(x, y, bins, fix_nans=False, mean_time=mean_time)
+
+                assert np.allclose(x_ekv, x_ref)
+                assert np.allclose(y_ekv, y_ref, equal_nan=True)
+
+
+def _best_time(fu, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fu()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+@pytest.mark.benchmark
+def test_to_ekvi_PAA_scaling():
+    n1, n2 = 2000, 32000
+    times = []
+    for n in [n1, n2]:
+        x = np.sort(np.random.random_sample(n))
+        y = np.random.random_sample(n)
+        times.append(_best_time(lambda: to_ekvi_PAA(x, y, n, fix_nans=False)))
+
+    # O(n log n) algorithm is about 16 times slower, quadratic one
+    # (e.g. a loop over bins) would be 256 times slower
+    assert times[1] / times[0] < 4 * n2 / n1
+
+
 def test_compute_bins():
     x1 = [1, 2, 3, 8, 9, 10]
     x2 = [1, 2, 3, 4, 5, 6]
@@ -92,3 +170,32 @@ def test_fix_missing():
     assert res2[1][-2] == res2[1][-1]
 
     # assert res1[0] == res2[0]
+
+
+def test_fix_missing_interpolation():
+    n = 50000
+    x = np.cumsum(np.random.random_sample(n)) + 1
+    y = 3 * x - 2
+    missing = np.random.random_sample(n) < 0.3
+    missing[[0, -1]] = False
+    y_missing = y.copy()
+    y_missing[missing] = np.nan
+
+    xx, yy = fix_missing(x, y_missing)
+
+    assert len(xx) == n
+    assert np.allclose(yy, y)
+
+
+def test_variogram():
+    x = np.sort(np.random.random_sample(500)) * 100
+    y = np.sin(x / 10.)
+
+    bins = 300
+    vario_x, vario_y = variogram(x, y, bins, log_opt=False)
+    vario_x2, vario_y2 = variogram(x, y, bins, log_opt=False, chunk_size=10000)
+
+    assert len(vario_x) == len(vario_y) == bins
+    assert (np.diff(vario_x) >= 0).all()
+    assert np.allclose(vario_x2, vario_x, rtol=0.05)
+    assert abs(np.polyfit(vario_x, vario_y, 1)[0] - np.polyfit(vario_x2, vario_y2, 1)[0]) < 1e-3
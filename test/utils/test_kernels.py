@@ -0,0 +1,90 @@
+import numpy as np
+
+from lcc.utils import kernels
+from lcc.stars_processing.utilities.sax import SAX
+from lcc.utils.data_analysis import to_PAA, to_windows_PAA, normalize
+
+
+def _backends():
+    return [kernels.NUMPY_KERNELS] + ([kernels.NUMBA_KERNELS] if kernels.NUMBA_KERNELS else [])
+
+
+def _random_curve(rng, n):
+    x = np.sort(rng.random_sample(n)) * rng.randint(10, 1000)
+    y = np.sin(x / rng.randint(1, 50)) + rng.normal(scale=0.3, size=n)
+    return x, y
+
+
+def test_backend():
+    assert kernels.BACKEND in ("numba", "numpy")
+    assert (kernels.BACKEND == "numba") == bool(kernels.NUMBA_KERNELS)
+
+
+def test_best_match_backends():
+    rng = np.random.RandomState(0)
+    for _ in range(30):
+        sax = SAX(8, rng.randint(3, 21))
+        word_len = rng.randint(1, 60)
+        word = rng.randint(0, sax.alphabet_size, word_len).astype(np.uint8)
+        candidates = rng.randint(0, sax.alphabet_size, (rng.randint(1, 300), word_len)).astype(np.uint8)
+
+        sums = sax._squared_distances[candidates, word].sum(axis=1)
+        for limit in [np.inf, np.median(sums), sums.min() / 2]:
+            for backend in _backends():
+                score, index = backend["best_match"](word, candidates, sax._squared_distances,
+                                                     limit, SAX.ABANDON_BLOCK)
+                if sums.min() > limit:
+                    assert index == -1
+                else:
+                    assert np.isclose(score, sums.min()) and np.isclose(sums[index], sums.min())
+
+        # Windows of a longer word are strided view
+        long_word = rng.randint(0, sax.alphabet_size, 500).astype(np.uint8)
+        windows = np.lib.stride_tricks.sliding_window_view(long_word, word_len)
+        results = [backend["best_match"](word, windows, sax._squared_distances, np.inf, 16)
+                   for backend in _backends()]
+        assert all(np.isclose(score, results[0][0]) for score, _ in results)
+
+
+def test_lag_bin_sums_backends():
+    rng = np.random.RandomState(1)
+    for _ in range(20):
+        x, y = _random_curve(rng, rng.randint(2, 300))
+        borders = np.sort(rng.random_sample(rng.randint(0, 30))) * (x.max() - x.min())
+
+        i, j = np.triu_indices(len(x), k=1)
+        lags = np.abs(x[i] - x[j])
+        indx = np.searchsorted(borders, lags, side="right")
+        expected_counts = np.bincount(indx, minlength=len(borders) + 1)
+
+        for backend in _backends():
+            sum_x, sum_y, counts = backend["lag_bin_sums"](x, y, borders, 1000)
+            assert np.array_equal(counts, expected_counts)
+            assert np.allclose(sum_x, np.bincount(indx, weights=lags, minlength=len(borders) + 1))
+            assert np.allclose(sum_y, np.bincount(indx, weights=(y[i] - y[j]) ** 2,
+                                                  minlength=len(borders) + 1))
+
+
+def test_sax_words_backends():
+    rng = np.random.RandomState(2)
+    for _ in range(20):
+        mag = _random_curve(rng, rng.randint(200, 1000))[1]
+        window_len = rng.randint(20, 100)
+        starts = np.arange(0, len(mag) - window_len + 1, 7)
+
+        sax = SAX(10, 7)
+        words = sax.to_int_windows(mag, starts, window_len)
+        for start, word in zip(starts, words):
+            paa = to_PAA(normalize(mag[start:start + window_len]), 10)[0]
+            assert np.array_equal(word, sax.alphabetize_int(paa))
+
+        word = words[0][:5]
+        for backend in _backends():
+            kernels.KERNELS = backend
+            try:
+                score, offset = sax.match_shifts(word, words.ravel())
+            finally:
+                kernels.KERNELS = kernels.NUMBA_KERNELS or kernels.NUMPY_KERNELS
+            assert score == 0 and np.array_equal(words.ravel()[offset:offset + 5], word)
+        assert np.allclose(to_windows_PAA(mag, starts, window_len, 10)[0],
+                           to_PAA(normalize(mag[:window_len]), 10)[0])